@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+PromptHub Benchmark
+
+Generates synthetic prompt corpora that follow templates/prompt-template.md and
+times each stage of validation and indexing separately, so that changes to the
+scripts can be compared across commits.
+
+Usage:
+    python scripts/benchmark.py                          # 1k, 10k and 100k prompts
+    python scripts/benchmark.py --sizes 1000 5000 -o bench.json
+    python scripts/benchmark.py --body-words 800 --tags 6 --invalid-share 0.25
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from catalog import PromptCatalog
+from generate_index import IndexGenerator
+from prompt_loader import find_prompt_files
+from prompt_parser import parse_prompt
+from validate_prompt import PromptValidator
+
+
+CATEGORIES = PromptValidator.VALID_CATEGORIES
+DIFFICULTIES = PromptValidator.VALID_DIFFICULTIES
+MODELS = ["Claude", "GPT-4", "Gemini", "Llama", "Mistral", "All Models"]
+CHECKS = PromptValidator.CHECKS
+
+# Ways a synthetic file can be broken when it is generated as invalid
+DEFECTS = ["missing_section", "bad_date", "bad_category", "placeholder", "bad_filename", "no_code_block"]
+
+
+class CorpusGenerator:
+    """Writes synthetic prompt files following the prompt template"""
+
+    def __init__(
+        self,
+        body_words: int = 300,
+        tags_per_prompt: int = 4,
+        invalid_share: float = 0.1,
+        seed: int = 0
+    ):
+        self.body_words = body_words
+        self.tags_per_prompt = tags_per_prompt
+        self.invalid_share = invalid_share
+        self.random = random.Random(seed)
+        self.vocabulary = [self._word() for _ in range(5000)]
+        self.tag_pool = [self._word() for _ in range(max(50, tags_per_prompt * 20))]
+
+    def _word(self) -> str:
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        return "".join(self.random.choice(letters) for _ in range(self.random.randint(3, 10)))
+
+    def _sentence(self, words: int) -> str:
+        return " ".join(self.random.choice(self.vocabulary) for _ in range(words)).capitalize() + "."
+
+    def _paragraph(self, words: int) -> str:
+        sentences = []
+        while words > 0:
+            length = min(words, self.random.randint(8, 20))
+            sentences.append(self._sentence(length))
+            words -= length
+        return " ".join(sentences)
+
+    def render(self, index: int, defect: Optional[str] = None) -> str:
+        """Render the text of one synthetic prompt"""
+        rand = self.random
+        title = f"Synthetic Prompt {index}"
+        category = rand.choice(CATEGORIES) if defect != "bad_category" else "Gardening"
+        added = date(2023, 1, 1) + timedelta(days=rand.randint(0, 900))
+        date_added = added.isoformat() if defect != "bad_date" else added.strftime("%d/%m/%Y")
+        tags = " ".join(f"`#{tag}`" for tag in rand.sample(self.tag_pool, self.tags_per_prompt))
+        models = ", ".join(rand.sample(MODELS, rand.randint(1, 3)))
+        variables = [f"VARIABLE_{i}" for i in range(rand.randint(1, 4))]
+
+        prompt_body = self._paragraph(self.body_words)
+        prompt_body += "\n\n" + "\n".join(f"{name}: {{{name}}}" for name in variables)
+        if defect == "placeholder":
+            prompt_body += "\n[TODO]"
+
+        sections = {
+            "Metadata": "\n".join([
+                f"- **Category**: {category}",
+                f"- **Difficulty**: {rand.choice(DIFFICULTIES)}",
+                f"- **Model Compatibility**: {models}",
+                f"- **Tags**: {tags}",
+                f"- **Author**: @author{rand.randint(1, 500)}",
+                f"- **Date Added**: {date_added}",
+                "- **Version**: 1.0",
+            ]),
+            "Description": self._paragraph(rand.randint(25, 60)),
+            "Use Case": "\n".join(f"- {self._sentence(10)}" for _ in range(3)),
+            "The Prompt": prompt_body if defect == "no_code_block" else f"```\n{prompt_body}\n```",
+            "Variables to Customize": "\n".join(
+                f"- `{{{name}}}`: {self._sentence(8)}" for name in variables
+            ),
+            "Example Input/Output": "\n".join([
+                "### Example 1",
+                "",
+                "**Input:**",
+                "```",
+                self._paragraph(40),
+                "```",
+                "",
+                "**Output:**",
+                "```",
+                self._paragraph(80),
+                "```",
+            ]),
+            "Performance Notes": "### Strengths\n" + "\n".join(
+                f"- {self._sentence(8)}" for _ in range(3)
+            ),
+            "Related Prompts": f"- [Synthetic Prompt {max(0, index - 1)}](synthetic-prompt-{max(0, index - 1)}.md)",
+            "Version History": f"### v1.0 ({added.isoformat()})\n- Initial version",
+        }
+        if defect == "missing_section":
+            del sections[rand.choice(["Use Case", "Performance Notes", "Related Prompts"])]
+
+        lines = [f"# {title}", ""]
+        for heading, body in sections.items():
+            lines.extend([f"## {heading}", body, ""])
+        return "\n".join(lines)
+
+    def generate(self, directory: Path, count: int):
+        """Write count prompts spread over per-category folders"""
+        for category in CATEGORIES:
+            (directory / category.lower()).mkdir(parents=True, exist_ok=True)
+        for index in range(count):
+            defect = None
+            if self.random.random() < self.invalid_share:
+                defect = self.random.choice(DEFECTS)
+            name = f"synthetic-prompt-{index}.md"
+            if defect == "bad_filename":
+                name = f"Synthetic_Prompt_{index}.md"
+            folder = directory / self.random.choice(CATEGORIES).lower()
+            (folder / name).write_text(self.render(index, defect), encoding='utf-8')
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process in KiB, if the platform reports it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def deep_sizeof(obj) -> int:
+    """Approximate bytes held by an object graph, counting shared objects once"""
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (type, types.ModuleType, types.FunctionType)):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        stack.extend(gc.get_referents(current))
+    return total
+
+
+def benchmark_corpus(corpus_dir: str) -> Dict:
+    """Time every stage over one corpus (run in a fresh process for clean memory numbers)"""
+    corpus = Path(corpus_dir)
+    stages: Dict[str, float] = {}
+    checks: Dict[str, float] = {check: 0.0 for check in CHECKS}
+
+    start = time.perf_counter()
+    filepaths = find_prompt_files(corpus)
+    stages["discover"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    contents = [filepath.read_text(encoding='utf-8') for filepath in filepaths]
+    stages["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed_prompts = [parse_prompt(content) for content in contents]
+    stages["parse"] = time.perf_counter() - start
+    del contents
+
+    invalid = 0
+    start = time.perf_counter()
+    for filepath, parsed in zip(filepaths, parsed_prompts):
+        result = PromptValidator(filepath, parsed=parsed, profile=True).validate()
+        for check, seconds in result.timings.items():
+            checks[check] += seconds
+        if not result.is_valid:
+            invalid += 1
+    stages["validate"] = time.perf_counter() - start
+
+    generator = IndexGenerator(corpus)
+    start = time.perf_counter()
+    prompts = [
+        generator.metadata_from_parsed(filepath, parsed)
+        for filepath, parsed in zip(filepaths, parsed_prompts)
+    ]
+    stages["extract_metadata"] = time.perf_counter() - start
+    del parsed_prompts
+
+    start = time.perf_counter()
+    catalog = PromptCatalog.from_prompts(prompts)
+    stages["build_catalog"] = time.perf_counter() - start
+    memory = {
+        "metadata_list_bytes": deep_sizeof(prompts),
+        "catalog_bytes": deep_sizeof(catalog),
+    }
+    del prompts
+
+    start = time.perf_counter()
+    generator.set_prompts(catalog)
+    index_content = generator.render_index()
+    stages["render_index"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    (corpus / "INDEX.md").write_text(index_content, encoding='utf-8')
+    stages["write_index"] = time.perf_counter() - start
+
+    return {
+        "files": len(filepaths),
+        "invalid_files": invalid,
+        "stages": {name: round(seconds, 6) for name, seconds in stages.items()},
+        "checks": {name: round(seconds, 6) for name, seconds in checks.items()},
+        "total_seconds": round(sum(stages.values()), 6),
+        "metadata_memory": memory,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the repository, if available"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark PromptHub validation and indexing.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+        help="Corpus sizes to benchmark (default: 1000 10000 100000)"
+    )
+    parser.add_argument("--body-words", type=int, default=300, help="Words in each prompt body (default: 300)")
+    parser.add_argument("--tags", type=int, default=4, help="Tags per prompt (default: 4)")
+    parser.add_argument(
+        "--invalid-share", type=float, default=0.1,
+        help="Share of generated files with a defect (default: 0.1)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument(
+        "--corpus-dir", type=Path,
+        help="Keep generated corpora here instead of a temporary directory"
+    )
+    parser.add_argument("-o", "--output", type=Path, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    work_dir = args.corpus_dir or Path(tempfile.mkdtemp(prefix="prompthub-bench-"))
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "parameters": {
+            "body_words": args.body_words,
+            "tags": args.tags,
+            "invalid_share": args.invalid_share,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+
+    try:
+        for size in args.sizes:
+            corpus = work_dir / f"corpus-{size}"
+            if corpus.exists():
+                shutil.rmtree(corpus)
+            print(f"Generating {size} prompts in {corpus}...", flush=True)
+            start = time.perf_counter()
+            CorpusGenerator(args.body_words, args.tags, args.invalid_share, args.seed).generate(corpus, size)
+            generate_seconds = time.perf_counter() - start
+
+            # A fresh process per corpus keeps peak memory figures independent
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                result = pool.apply(benchmark_corpus, (str(corpus),))
+            result["generate_seconds"] = round(generate_seconds, 6)
+            report["results"].append(result)
+
+            stages = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in result["stages"].items())
+            print(f"  {result['files']} files: {stages}")
+            memory = result["metadata_memory"]
+            print(
+                f"  metadata: {memory['metadata_list_bytes'] // 1024} KiB as PromptMetadata objects, "
+                f"{memory['catalog_bytes'] // 1024} KiB as a catalog"
+            )
+            print(f"  peak RSS: {result['peak_rss_kb']} KiB", flush=True)
+
+            if args.corpus_dir is None:
+                shutil.rmtree(corpus)
+    finally:
+        if args.corpus_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding='utf-8')
+        print(f"✓ Results written to: {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
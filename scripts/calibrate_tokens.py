@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+PromptHub Token Estimate Calibration
+
+Measures how far token_estimate's counts are from a real tokenizer's, so the
+error quoted in token_estimate stays reproducible and the patterns can be
+re-tuned against a newer tokenizer.
+
+Each prompt file contributes the code block of its "The Prompt" section, as
+the index counts it. Any other file is split into samples of consecutive
+paragraphs of up to --sample-chars characters. The report gives the ratio of
+estimated to real tokens over all samples, and the spread of the per-sample
+error.
+
+The reference tokenizer is either a tokenizer.json file, read with the
+`tokenizers` package, or a tiktoken encoding. Neither is needed by anything
+else in PromptHub, so they are only imported here.
+
+Usage:
+    python scripts/calibrate_tokens.py prompts/ docs/ --tokenizer-json tokenizer.json
+    python scripts/calibrate_tokens.py prompts/ --tiktoken o200k_base
+"""
+
+import argparse
+import statistics
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from prompt_parser import parse_prompt
+from token_estimate import estimate_tokens
+
+
+SAMPLE_EXTENSIONS = {".md", ".txt", ".py"}
+DEFAULT_SAMPLE_CHARS = 2000
+
+
+def split_samples(text: str, sample_chars: int) -> Iterator[str]:
+    """Group consecutive paragraphs into samples of up to sample_chars characters"""
+    sample: List[str] = []
+    size = 0
+    for paragraph in text.split("\n\n"):
+        if sample and size + len(paragraph) > sample_chars:
+            yield "\n\n".join(sample)
+            sample, size = [], 0
+        sample.append(paragraph)
+        size += len(paragraph) + 2
+    if sample and "".join(sample).strip():
+        yield "\n\n".join(sample)
+
+
+def file_samples(filepath: Path, sample_chars: int) -> List[str]:
+    """A prompt's code block, or the paragraphs of any other file"""
+    text = filepath.read_text(encoding='utf-8')
+    if filepath.suffix == ".md":
+        blocks = parse_prompt(text).code_blocks_in("## The Prompt")
+        if blocks:
+            return [blocks[0].text]
+    return list(split_samples(text, sample_chars))
+
+
+def collect_samples(paths: List[Path], sample_chars: int) -> List[str]:
+    samples = []
+    for path in paths:
+        filepaths = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for filepath in filepaths:
+            if filepath.suffix not in SAMPLE_EXTENSIONS or not filepath.is_file():
+                continue
+            try:
+                samples.extend(file_samples(filepath, sample_chars))
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Warning: Skipping {filepath}: {e}", file=sys.stderr)
+    return [sample for sample in samples if sample.strip()]
+
+
+def load_tokenizer(args: argparse.Namespace) -> Callable[[str], int]:
+    """Return a function counting a text's tokens with the reference tokenizer"""
+    if args.tokenizer_json:
+        from tokenizers import Tokenizer
+        tokenizer = Tokenizer.from_file(str(args.tokenizer_json))
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+    import tiktoken
+    encoding = tiktoken.get_encoding(args.tiktoken)
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def calibrate(samples: List[str], count_tokens: Callable[[str], int]) -> Dict[str, float]:
+    """Compare estimates with real counts; errors are relative to the real count"""
+    pairs: List[Tuple[int, int]] = [(estimate_tokens(sample), count_tokens(sample)) for sample in samples]
+    pairs = [(estimated, actual) for estimated, actual in pairs if actual]
+    errors = sorted((estimated - actual) / actual for estimated, actual in pairs)
+    absolute = sorted(abs(error) for error in errors)
+    return {
+        "samples": len(pairs),
+        "tokens": sum(actual for _, actual in pairs),
+        "ratio": sum(estimated for estimated, _ in pairs) / sum(actual for _, actual in pairs),
+        "median_error": statistics.median(errors),
+        "median_abs_error": statistics.median(absolute),
+        "p90_abs_error": absolute[int(0.9 * (len(absolute) - 1))],
+        "max_abs_error": absolute[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare token estimates with a reference tokenizer")
+    parser.add_argument("paths", nargs="+", type=Path, help="Prompt files, other text files, or directories of them")
+    reference = parser.add_mutually_exclusive_group(required=True)
+    reference.add_argument("--tokenizer-json", type=Path, help="Reference tokenizer in tokenizer.json format")
+    reference.add_argument("--tiktoken", metavar="ENCODING", help="Reference tiktoken encoding, e.g. o200k_base")
+    parser.add_argument(
+        "--sample-chars", type=int, default=DEFAULT_SAMPLE_CHARS,
+        help=f"Maximum characters per sample of a file that is not a prompt (default: {DEFAULT_SAMPLE_CHARS})"
+    )
+    args = parser.parse_args()
+
+    try:
+        count_tokens = load_tokenizer(args)
+    except ImportError as e:
+        print(f"Error: The reference tokenizer needs a package that is not installed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    samples = collect_samples(args.paths, args.sample_chars)
+    if not samples:
+        print("Error: No samples found", file=sys.stderr)
+        sys.exit(1)
+
+    result = calibrate(samples, count_tokens)
+    print(f"Samples:              {result['samples']} ({result['tokens']} tokens)")
+    print(f"Estimated / real:     {result['ratio']:.3f}")
+    print(f"Median error:         {result['median_error']:+.1%}")
+    print(f"Median |error|:       {result['median_abs_error']:.1%}")
+    print(f"90th pct |error|:     {result['p90_abs_error']:.1%}")
+    print(f"Max |error|:          {result['max_abs_error']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
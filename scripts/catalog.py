@@ -0,0 +1,176 @@
+"""
+PromptHub Catalog
+
+Compact, column-oriented store for the metadata of every prompt, used by
+IndexGenerator in place of a list of PromptMetadata objects.
+
+Low-cardinality fields (category, difficulty, models, author, date added and
+tags) are interned once in a shared string table and stored per prompt as
+integer codes in typed arrays. Titles, paths and descriptions are kept in
+shared UTF-8 buffers addressed by offset. Iterating the catalog yields
+lightweight CatalogEntry views with the same attributes as PromptMetadata,
+so code that renders the index works on either.
+"""
+
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List
+
+
+class StringTable:
+    """Interns repeated strings as small integer codes"""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+
+class TextBuffer:
+    """Stores many strings in one UTF-8 buffer addressed by offset"""
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('Q', [0])
+
+    def append(self, text: str):
+        self.data += text.encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, index: int) -> str:
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+
+class CatalogEntry:
+    """Read-only view of one prompt in a catalog, with the attributes of PromptMetadata"""
+
+    __slots__ = ("catalog", "index")
+
+    def __init__(self, catalog: "PromptCatalog", index: int):
+        self.catalog = catalog
+        self.index = index
+
+    @property
+    def title(self) -> str:
+        return self.catalog.titles[self.index]
+
+    @property
+    def filepath(self) -> Path:
+        return Path(self.catalog.paths[self.index])
+
+    @property
+    def category(self) -> str:
+        return self.catalog.strings[self.catalog.categories[self.index]]
+
+    @property
+    def difficulty(self) -> str:
+        return self.catalog.strings[self.catalog.difficulties[self.index]]
+
+    @property
+    def models(self) -> str:
+        return self.catalog.strings[self.catalog.models[self.index]]
+
+    @property
+    def tags(self) -> List[str]:
+        catalog = self.catalog
+        start, end = catalog.tag_offsets[self.index], catalog.tag_offsets[self.index + 1]
+        return [catalog.strings[code] for code in catalog.tag_codes[start:end]]
+
+    @property
+    def description(self) -> str:
+        return self.catalog.descriptions[self.index]
+
+    @property
+    def author(self) -> str:
+        return self.catalog.strings[self.catalog.authors[self.index]]
+
+    @property
+    def date_added(self) -> str:
+        return self.catalog.strings[self.catalog.dates[self.index]]
+
+    @property
+    def tokens(self) -> int:
+        return self.catalog.tokens[self.index]
+
+    @property
+    def related(self) -> List[str]:
+        catalog = self.catalog
+        start, end = catalog.related_offsets[self.index], catalog.related_offsets[self.index + 1]
+        return [catalog.strings[code] for code in catalog.related_codes[start:end]]
+
+
+class PromptCatalog:
+    """Column-oriented collection of prompt metadata"""
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.titles = TextBuffer()
+        self.paths = TextBuffer()
+        self.descriptions = TextBuffer()
+        self.categories = array('I')
+        self.difficulties = array('I')
+        self.models = array('I')
+        self.authors = array('I')
+        self.dates = array('I')
+        self.tokens = array('I')
+        self.tag_codes = array('I')
+        self.tag_offsets = array('I', [0])
+        self.related_codes = array('I')
+        self.related_offsets = array('I', [0])
+        # Iteration order, as positions into the columns
+        self.order = array('I')
+
+    @classmethod
+    def from_prompts(cls, prompts: Iterable) -> "PromptCatalog":
+        """Build a catalog from PromptMetadata records (or entries of another catalog)"""
+        catalog = cls()
+        for prompt in prompts:
+            catalog.append(prompt)
+        return catalog
+
+    def append(self, prompt):
+        """Add a prompt's metadata at the end of the catalog"""
+        code = self.strings.code
+        self.order.append(len(self.categories))
+        self.titles.append(prompt.title)
+        self.paths.append(str(prompt.filepath))
+        self.descriptions.append(prompt.description)
+        self.categories.append(code(prompt.category))
+        self.difficulties.append(code(prompt.difficulty))
+        self.models.append(code(prompt.models))
+        self.authors.append(code(prompt.author))
+        self.dates.append(code(prompt.date_added))
+        self.tokens.append(prompt.tokens)
+        self.tag_codes.extend(code(tag) for tag in prompt.tags)
+        self.tag_offsets.append(len(self.tag_codes))
+        self.related_codes.extend(code(item) for item in prompt.related)
+        self.related_offsets.append(len(self.related_codes))
+
+    def sort(self, key: Callable[[CatalogEntry], object], reverse: bool = False):
+        """Reorder iteration without moving any column data"""
+        self.order = array('I', sorted(
+            self.order, key=lambda index: key(CatalogEntry(self, index)), reverse=reverse
+        ))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, position: int) -> CatalogEntry:
+        return CatalogEntry(self, self.order[position])
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        for index in self.order:
+            yield CatalogEntry(self, index)
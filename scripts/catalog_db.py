@@ -0,0 +1,340 @@
+"""
+PromptHub Catalog Database
+
+Persists prompt metadata in a local SQLite database so other tools can run
+filtered queries against the catalog without parsing any markdown. Prompts
+are stored one row each, with a tag join table and indexes on category,
+difficulty, date added and tag.
+
+The database is updated incrementally: files whose stat info is unchanged are
+skipped, files whose content hash is unchanged only get their stat info
+refreshed, and everything else is re-extracted and upserted.
+
+CatalogIndexGenerator renders INDEX.md from the database, computing the
+statistics, "Recently Added" list, category tables and tag counts with SQL
+queries and aggregates.
+
+Usage:
+    python scripts/prompthub.py index --catalog-db .prompthub-cache/catalog.sqlite
+    python scripts/prompthub.py query --tag python --catalog-db .prompthub-cache/catalog.sqlite
+
+    sqlite3 .prompthub-cache/catalog.sqlite \\
+        "SELECT title FROM prompts JOIN prompt_tags ON prompt_id = id WHERE tag = 'python'"
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from file_cache import CACHE_DIR, RACY_WINDOW_NS, content_hash
+from generate_index import (
+    CATEGORIES, DIFFICULTY_ORDER, IndexGenerator, PromptMetadata
+)
+from git_changes import worktree_tree
+from lazy import lazy_import
+from prompt_loader import find_prompt_files, load_prompts
+from prompt_parser import ParsedPrompt
+
+sqlite3 = lazy_import("sqlite3")
+
+
+DEFAULT_CATALOG_PATH = CACHE_DIR / "catalog.sqlite"
+CATALOG_VERSION = "3"
+
+# Columns shared by PromptMetadata and the prompts table, in order
+METADATA_COLUMNS = [
+    "title", "category", "difficulty", "models", "author", "date_added", "description", "tokens"
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS prompts (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    title TEXT NOT NULL,
+    category TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    models TEXT NOT NULL,
+    author TEXT NOT NULL,
+    date_added TEXT NOT NULL,
+    description TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    tags TEXT NOT NULL,
+    related TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prompt_tags (
+    prompt_id INTEGER NOT NULL REFERENCES prompts(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (prompt_id, tag)
+);
+CREATE INDEX IF NOT EXISTS prompts_category ON prompts (category COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS prompts_difficulty ON prompts (difficulty COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS prompts_date_added ON prompts (date_added);
+CREATE INDEX IF NOT EXISTS prompt_tags_tag ON prompt_tags (tag COLLATE NOCASE);
+"""
+
+# Filters accepted by CatalogDatabase.query and the columns they match
+QUERY_FILTERS = {
+    "category": "p.category = ? COLLATE NOCASE",
+    "difficulty": "p.difficulty = ? COLLATE NOCASE",
+    "author": "ltrim(p.author, '@') = ltrim(?, '@') COLLATE NOCASE",
+    "model": "instr(lower(p.models), lower(?)) > 0",
+    "tag": "EXISTS (SELECT 1 FROM prompt_tags t WHERE t.prompt_id = p.id AND t.tag = ltrim(?, '#') COLLATE NOCASE)",
+}
+
+SELECT_COLUMNS = "p.path, " + ", ".join(f"p.{column}" for column in METADATA_COLUMNS) + ", p.tags, p.related"
+SELECT_PROMPTS = f"SELECT {SELECT_COLUMNS} FROM prompts p"
+
+DIFFICULTY_RANK = "CASE p.difficulty " + " ".join(
+    f"WHEN '{difficulty}' THEN {rank}" for difficulty, rank in DIFFICULTY_ORDER.items()
+) + " ELSE 999 END"
+
+
+def row_to_metadata(row: tuple) -> PromptMetadata:
+    """Rebuild metadata from a row selected with SELECT_COLUMNS"""
+    path, *values, tags, related = row
+    fields = dict(zip(METADATA_COLUMNS, values))
+    return PromptMetadata(
+        filepath=Path(path), tags=tags.split(), related=related.split("\n") if related else [], **fields
+    )
+
+
+class CatalogDatabase:
+    """Prompt metadata persisted in SQLite; the database is opened on first use"""
+
+    def __init__(self, db_path: Path = DEFAULT_CATALOG_PATH):
+        self.db_path = db_path
+        self._conn: Optional["sqlite3.Connection"] = None
+
+    @property
+    def conn(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path))
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            # Python's lower() so SQL ordering matches the in-memory generator exactly
+            self._conn.create_function("py_lower", 1, str.lower, deterministic=True)
+            self._conn.executescript(SCHEMA)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row and row[0] != CATALOG_VERSION:
+                # Extraction or schema changed: start over
+                self._conn.executescript("DROP TABLE prompt_tags; DROP TABLE prompts;")
+                self._conn.executescript(SCHEMA)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (CATALOG_VERSION,)
+            )
+            self._conn.commit()
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def update(
+        self,
+        filepaths: Iterable[Path],
+        extract: Callable[[Path, ParsedPrompt], PromptMetadata],
+        root: Optional[Path] = None,
+        changed: Optional[Set[str]] = None,
+        tree: Optional[str] = None
+    ) -> int:
+        """Upsert new and modified prompts; return the number of changed rows
+
+        Rows for files under root that are not in filepaths are removed. With
+        changed (absolute paths), stored files outside it are trusted without a
+        stat, if the database was last updated from tree (the git tree id of
+        the prompts at the diff's ref).
+        """
+        conn = self.conn
+        row = conn.execute("SELECT value FROM meta WHERE key = 'tree'").fetchone()
+        if tree is None or row is None or row[0] != tree:
+            # Updated from other content than the ref's: check every file
+            changed = None
+        stamps = {
+            path: (prompt_id, mtime_ns, size, digest)
+            for prompt_id, path, mtime_ns, size, digest in conn.execute(
+                "SELECT id, path, mtime_ns, size, digest FROM prompts"
+            )
+        }
+        # Stat info of files modified just now is not trusted on the next run
+        racy_limit_ns = time.time_ns() - RACY_WINDOW_NS
+        seen = set()
+        # filepath -> (key, mtime_ns, size, digest) for files that need extracting
+        pending: Dict[Path, Tuple[str, int, int, str]] = {}
+
+        for filepath in filepaths:
+            key = os.path.abspath(filepath)
+            seen.add(key)
+            if changed is not None and key in stamps and key not in changed:
+                continue
+            stat = os.stat(filepath)
+            mtime_ns = stat.st_mtime_ns if stat.st_mtime_ns < racy_limit_ns else -1
+            stamp = stamps.get(key)
+            if stamp and stamp[1] == stat.st_mtime_ns and stamp[2] == stat.st_size:
+                continue
+
+            digest = content_hash(Path(filepath).read_bytes())
+            if stamp and stamp[3] == digest:
+                conn.execute(
+                    "UPDATE prompts SET mtime_ns = ?, size = ? WHERE id = ?",
+                    (mtime_ns, stat.st_size, stamp[0])
+                )
+                continue
+            pending[filepath] = (key, mtime_ns, stat.st_size, digest)
+
+        updated = 0
+        failed = False
+        for filepath, parsed, error in load_prompts(pending):
+            if error is not None:
+                print(f"Warning: Failed to process {filepath}: {error}")
+                failed = True
+                continue
+            try:
+                metadata = extract(filepath, parsed)
+            except Exception as e:
+                print(f"Warning: Failed to process {filepath}: {e}")
+                failed = True
+                continue
+            self._upsert(pending[filepath], metadata)
+            updated += 1
+
+        if root is not None:
+            prefix = os.path.abspath(root).rstrip(os.sep) + os.sep
+            for key, (prompt_id, _, _, _) in stamps.items():
+                if key.startswith(prefix) and key not in seen:
+                    conn.execute("DELETE FROM prompts WHERE id = ?", (prompt_id,))
+                    updated += 1
+        # Rows of files that failed to extract were left as they were, matching no tree
+        tree = worktree_tree(root) if root is not None and not failed else None
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('tree', ?)", (tree,))
+
+        conn.commit()
+        return updated
+
+    def _upsert(self, stamp: Tuple[str, int, int, str], metadata: PromptMetadata):
+        """Insert or update one prompt row and its tags, keeping its id"""
+        conn = self.conn
+        tags = list(dict.fromkeys(metadata.tags))
+        values = [getattr(metadata, column) for column in METADATA_COLUMNS]
+        columns = ["path", "mtime_ns", "size", "digest"] + METADATA_COLUMNS + ["tags", "related"]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+        prompt_id = conn.execute(
+            f"INSERT INTO prompts ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(path) DO UPDATE SET {updates} RETURNING id",
+            (*stamp, *values, " ".join(tags), "\n".join(metadata.related))
+        ).fetchone()[0]
+        conn.execute("DELETE FROM prompt_tags WHERE prompt_id = ?", (prompt_id,))
+        conn.executemany(
+            "INSERT INTO prompt_tags (prompt_id, tag) VALUES (?, ?)",
+            [(prompt_id, tag) for tag in tags]
+        )
+
+    def prompts(self, where: str = "", params: tuple = (), order: str = "py_lower(p.title)",
+                limit: Optional[int] = None) -> List[PromptMetadata]:
+        """Select prompts as PromptMetadata records"""
+        sql = SELECT_PROMPTS
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [row_to_metadata(row) for row in self.conn.execute(sql, params)]
+
+    def query(self, limit: Optional[int] = None, **filters: List[str]) -> List[Dict[str, str]]:
+        """Return prompts matching every filter term as dicts, newest first"""
+        clauses = []
+        params = []
+        for field, terms in filters.items():
+            if field not in QUERY_FILTERS:
+                raise ValueError(f"Unknown filter: {field}. Must be one of: {', '.join(QUERY_FILTERS)}")
+            for term in terms or []:
+                clauses.append(QUERY_FILTERS[field])
+                params.append(term.strip())
+
+        order = "CASE WHEN p.date_added = 'Unknown' THEN 1 ELSE 0 END, p.date_added DESC, py_lower(p.title)"
+        return [
+            {
+                "title": prompt.title,
+                "path": os.path.relpath(prompt.filepath),
+                "category": prompt.category,
+                "difficulty": prompt.difficulty,
+                "models": prompt.models,
+                "author": prompt.author,
+                "date_added": prompt.date_added,
+                "description": prompt.description,
+            }
+            for prompt in self.prompts(" AND ".join(clauses), tuple(params), order, limit)
+        ]
+
+    def count_by(self, column: str) -> List[Tuple[str, int]]:
+        """Count prompts per value of a column, most common first"""
+        return self.conn.execute(
+            f"SELECT {column}, COUNT(*) FROM prompts p GROUP BY {column} "
+            f"ORDER BY COUNT(*) DESC, MIN(py_lower(p.title))"
+        ).fetchall()
+
+    def tag_counts(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Count prompts per tag, most common first"""
+        sql = "SELECT tag, COUNT(*) FROM prompt_tags GROUP BY tag ORDER BY COUNT(*) DESC, py_lower(tag)"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.conn.execute(sql).fetchall()
+
+
+class CatalogIndexGenerator(IndexGenerator):
+    """Index generator that keeps its prompts in a CatalogDatabase and renders with SQL"""
+
+    def __init__(self, prompts_dir: Path = None, db: Optional[CatalogDatabase] = None):
+        super().__init__(prompts_dir)
+        self.db = db or CatalogDatabase()
+
+    def collect_prompts(self, changed: Optional[Set[str]] = None, tree: Optional[str] = None):
+        """Bring the database up to date with the prompts directory"""
+        updated = self.db.update(
+            find_prompt_files(self.prompts_dir), self.metadata_from_parsed, self.prompts_dir, changed, tree
+        )
+        print(f"✓ Catalog database updated ({updated} changed prompts): {self.db.db_path}")
+        # Still loaded for the inverted index and reference counts; the INDEX.md sections below query the database
+        self.prompts = self.db.prompts()
+        self._reference_counts = None
+
+    def group_by_category(self, categories: List[str] = None) -> Dict[str, List[PromptMetadata]]:
+        """Select each category's prompts, sorted by difficulty, then title"""
+        return {
+            category: self.db.prompts("instr(p.category, ?) > 0", (category,), f"{DIFFICULTY_RANK}, py_lower(p.title)")
+            for category in categories or CATEGORIES
+        }
+
+    def group_by_tag(self) -> Dict[str, List[PromptMetadata]]:
+        """Select each lowercased tag's prompts, sorted by title"""
+        groups: Dict[str, List[PromptMetadata]] = {}
+        rows = self.db.conn.execute(
+            f"SELECT py_lower(t.tag), {SELECT_COLUMNS} FROM prompts p "
+            "JOIN prompt_tags t ON t.prompt_id = p.id ORDER BY py_lower(p.title), p.id"
+        )
+        for tag, *row in rows:
+            group = groups.setdefault(tag, [])
+            if not group or group[-1].filepath != Path(row[0]):
+                group.append(row_to_metadata(tuple(row)))
+        return groups
+
+    def generate_tags_section(self) -> str:
+        """Generate tag cloud section"""
+        return self.format_tags_section(self.db.tag_counts(30))
+
+    def generate_statistics(self) -> str:
+        """Generate statistics section"""
+        total = self.db.conn.execute("SELECT COUNT(*) FROM prompts").fetchone()[0]
+        return self.format_statistics(total, self.db.count_by("category"), self.db.count_by("difficulty"))
+
+    def generate_recent_section(self, limit: int = 10) -> str:
+        """Generate recently added prompts section"""
+        recent = self.db.prompts(
+            "p.date_added != 'Unknown'", (), "p.date_added DESC, py_lower(p.title)", limit
+        )
+        return self.format_recent_section(recent)
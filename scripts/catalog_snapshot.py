@@ -0,0 +1,241 @@
+"""
+PromptHub Catalog Snapshot
+
+Binary copy of the inverted index, written next to it whenever the index is
+written, for the lookups editors and pre-commit hooks run constantly. Loading
+the JSON index parses every document row and posting list; the snapshot is
+memory-mapped instead, and a query only decodes the posting lists of its own
+terms and the rows it returns.
+
+File layout:
+
+    magic                 8 bytes
+    header length         8 bytes, little-endian
+    header                marshal: versions, working directory, prompts directory, its
+                          subdirectories and prompt files, tree signature, row offsets and,
+                          per filter field, term -> (offset, count)
+    data                  posting lists as arrays of 32-bit row ids, then one
+                          marshal blob per document row
+
+The snapshot records the stat signature of the prompts tree it was built from:
+the path and mtime of every directory under the prompts directory, and the
+path, mtime and size of every prompt file in them. Checking it takes one stat
+per recorded directory and file, without listing any directory: adding,
+removing or renaming a prompt or a directory (including the atomic saves most
+editors do) changes the mtime of a recorded directory, and an edit that
+rewrites a file in place, such as changing a prompt's tags, changes the file's
+own mtime. Either invalidates the snapshot.
+
+Document paths in the index are relative to the working directory the index
+was built from, so that directory is recorded too and the prompts directory is
+resolved against it, not against the directory a query happens to run in.
+
+marshal's format is tied to the Python version, so a snapshot written by
+another version is treated like a missing one.
+
+The validation rule set is deliberately not part of the snapshot. Reading
+validation_rules.json takes about 0.2 ms and its needle matcher compiles
+lazily in about 0.3 ms on first use. Hashing the rules file to key a cached
+copy, then reading and unpickling that copy, would cost about as much as it
+saved.
+
+Usage:
+    from catalog_snapshot import CatalogSnapshot, snapshot_path
+
+    snapshot = CatalogSnapshot.load(snapshot_path(Path(".prompthub-cache/inverted-index.json")))
+    if snapshot.is_current():
+        snapshot.query(tag=["python"])
+"""
+
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from inverted_index import INDEX_VERSION, InvertedIndex
+from prompt_loader import SKIPPED_FILES
+
+
+SNAPSHOT_VERSION = 3
+MAGIC = b"PHSNAP\x00\x01"
+LENGTH = struct.Struct("<Q")
+
+
+def snapshot_path(index_path: Path) -> Path:
+    """Where the snapshot of an inverted index is kept"""
+    return index_path.with_suffix(".snapshot")
+
+
+def list_tree(prompts_dir: Path) -> Tuple[List[str], List[str]]:
+    """Return prompts_dir and every directory below it, and the prompt files in them, relative to prompts_dir"""
+    directories = []
+    files = []
+    pending = ["."]
+    while pending:
+        relative = pending.pop()
+        directories.append(relative)
+        try:
+            with os.scandir(os.path.join(prompts_dir, relative)) as entries:
+                for entry in entries:
+                    path = os.path.normpath(os.path.join(relative, entry.name))
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(path)
+                    elif entry.name.endswith(".md") and entry.name.upper() not in SKIPPED_FILES:
+                        files.append(path)
+        except OSError:
+            continue
+    return sorted(directories), sorted(files)
+
+
+def tree_signature(prompts_dir: Path, directories: List[str], files: List[str]) -> str:
+    """Hash the mtime of the given directories and the mtime and size of the files ("" if one is missing)
+
+    The paths themselves are recorded next to the signature, so only the stat values are hashed.
+    """
+    stat = os.stat
+    base = os.path.join(prompts_dir, "")
+    values = array('q')
+    try:
+        for relative in directories:
+            values.append(stat(base + relative).st_mtime_ns)
+        for relative in files:
+            info = stat(base + relative)
+            values.append(info.st_mtime_ns)
+            values.append(info.st_size)
+    except OSError:
+        return ""
+    return hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+
+
+def write_snapshot(index: InvertedIndex, path: Path, prompts_dir: Path):
+    """Write the snapshot of an index built from the prompts under prompts_dir"""
+    data = bytearray()
+    postings: Dict[str, Dict[str, Tuple[int, int]]] = {}
+    for field, field_postings in index.postings.items():
+        entries = postings[field] = {}
+        for term, ids in field_postings.items():
+            entries[term] = (len(data), len(ids))
+            data += array('I', ids).tobytes()
+
+    offsets = array('Q')
+    for doc in index.docs:
+        offsets.append(len(data))
+        data += marshal.dumps(doc)
+    offsets.append(len(data))
+
+    directories, files = list_tree(prompts_dir)
+    header = marshal.dumps({
+        "version": SNAPSHOT_VERSION,
+        "index_version": INDEX_VERSION,
+        "python": tuple(sys.version_info[:2]),
+        "root": str(Path.cwd().resolve()),
+        "prompts_dir": str(prompts_dir),
+        "directories": directories,
+        "files": files,
+        "signature": tree_signature(prompts_dir, directories, files),
+        "offsets": offsets.tobytes(),
+        "postings": postings,
+    })
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(LENGTH.pack(len(header)))
+        f.write(header)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class SnapshotPostings:
+    """One field's posting lists, decoded from the snapshot on lookup"""
+
+    def __init__(self, buffer: mmap.mmap, base: int, entries: Dict[str, Tuple[int, int]]):
+        self.buffer = buffer
+        self.base = base
+        self.entries = entries
+
+    def get(self, term: str, default=None):
+        entry = self.entries.get(term)
+        if entry is None:
+            return default
+        offset, count = entry
+        start = self.base + offset
+        ids = array('I')
+        ids.frombytes(self.buffer[start:start + 4 * count])
+        return ids
+
+
+class SnapshotDocs:
+    """Document rows, decoded from the snapshot on access"""
+
+    def __init__(self, buffer: mmap.mmap, base: int, offsets: array):
+        self.buffer = buffer
+        self.base = base
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, doc_id: int) -> list:
+        start, end = self.offsets[doc_id], self.offsets[doc_id + 1]
+        return marshal.loads(self.buffer[self.base + start:self.base + end])
+
+
+class CatalogSnapshot(InvertedIndex):
+    """An inverted index served from a memory-mapped snapshot"""
+
+    def __init__(self, buffer: mmap.mmap, header: dict, base: int):
+        offsets = array('Q')
+        offsets.frombytes(header["offsets"])
+        super().__init__(
+            SnapshotDocs(buffer, base, offsets),
+            {field: SnapshotPostings(buffer, base, entries) for field, entries in header["postings"].items()}
+        )
+        # The working directory the index was built from, and the prompts directory as given there
+        self.root = Path(header["root"])
+        self.prompts_dir = Path(header["prompts_dir"])
+        self.directories = header["directories"]
+        self.files = header["files"]
+        self.signature = header["signature"]
+
+    @classmethod
+    def load(cls, path: Path) -> "CatalogSnapshot":
+        """Map a snapshot; raises ValueError if it was written by another version"""
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        prefix = len(MAGIC) + LENGTH.size
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a catalog snapshot: {path}")
+        (header_length,) = LENGTH.unpack(buffer[len(MAGIC):prefix])
+        header = marshal.loads(buffer[prefix:prefix + header_length])
+        expected = (SNAPSHOT_VERSION, INDEX_VERSION, tuple(sys.version_info[:2]))
+        if (header.get("version"), header.get("index_version"), header.get("python")) != expected:
+            raise ValueError(f"Catalog snapshot {path} was written by another version")
+        return cls(buffer, header, prefix + header_length)
+
+    @property
+    def prompts_path(self) -> Path:
+        """The prompts directory the snapshot was built from, independent of the current directory"""
+        return self.root / self.prompts_dir
+
+    def is_current(self) -> bool:
+        """Whether the prompts tree is unchanged since the snapshot was written"""
+        return bool(self.signature) and tree_signature(self.prompts_path, self.directories, self.files) == self.signature
+
+    def can_rebuild(self) -> bool:
+        """Whether rebuilding from here would index the same prompts under the same paths"""
+        return self.prompts_path.is_dir() and Path.cwd().resolve() == self.root
+
+
+def load_snapshot(index_path: Path) -> Optional[CatalogSnapshot]:
+    """Load the snapshot of an inverted index, or None if it is missing or unusable"""
+    try:
+        return CatalogSnapshot.load(snapshot_path(index_path))
+    except (OSError, ValueError, EOFError, TypeError, AttributeError, struct.error):
+        return None
@@ -0,0 +1,251 @@
+"""
+PromptHub Cross-References
+
+Corpus-level check of the links in each prompt's "Related Prompts" section.
+
+Every list item in the section is a reference: markdown links must be
+relative and are resolved against the prompt's file, and items without a
+link are matched against prompt titles (the text before any " - description",
+case-insensitive). The corpus is indexed once by normalized path and by title,
+so each reference is resolved with a dictionary lookup and no filesystem
+calls. External links (http:, mailto:, ...) and in-page anchors are ignored.
+
+The check reports dangling references and orphan prompts that no other prompt
+lists. The reverse graph also gives the "referenced by" counts shown in
+INDEX.md. Related items are cached per file and content hash, so unchanged
+prompts are not re-read, and `prompthub.py all` takes them from the index
+metadata its own scan extracted. When the changed files are known (--changed-since),
+the others use their cached items unchecked, and only warnings in the
+neighborhood of the change are reported.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from file_cache import CACHE_DIR, FileCache, fingerprint
+from lazy import lazy_pattern
+from prompt_loader import map_prompts
+from prompt_parser import ParsedPrompt
+
+
+ITEM_PATTERN = lazy_pattern(r'^[ \t]*(?:[-*+]|\d+[.)])[ \t]+(.*\S)', re.MULTILINE)
+LINK_PATTERN = lazy_pattern(r'\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+EXTERNAL_PATTERN = lazy_pattern(r'^[A-Za-z][A-Za-z0-9+.-]*:')
+# Separates a title reference from its description: "Title - why it's related"
+DESCRIPTION_SEPARATOR = lazy_pattern(r'\s+[-–—:]\s+')
+
+# (path, title, related items) for one prompt
+ReferenceRecord = Tuple[str, str, List[str]]
+
+
+def related_items(parsed: ParsedPrompt) -> List[str]:
+    """Return the list items of the "Related Prompts" section"""
+    return ITEM_PATTERN.findall(parsed.section_body("## Related Prompts") or "")
+
+
+def parse_item(item: str) -> List[Tuple[str, str]]:
+    """Split a related item into ("link", target) and ("title", title) references"""
+    targets = LINK_PATTERN.findall(item)
+    if targets:
+        return [
+            ("link", target) for target in targets
+            if not target.startswith("#") and not EXTERNAL_PATTERN.match(target)
+        ]
+    title = DESCRIPTION_SEPARATOR.split(item, 1)[0].strip("*_` ")
+    return [("title", title)] if title else []
+
+
+def reference_record(filepath: Path, parsed: Optional[ParsedPrompt]) -> ReferenceRecord:
+    """Return the file's path, title and related items (no items if it could not be read)"""
+    if parsed is None:
+        return str(filepath), filepath.stem, []
+    return str(filepath), parsed.title or filepath.stem, related_items(parsed)
+
+
+class ReferenceGraph:
+    """Related Prompts references of a corpus, resolved against its paths and titles"""
+
+    def __init__(self, records: Iterable[ReferenceRecord]):
+        records = sorted(records, key=lambda record: record[0])
+        # Normalized path -> path as given, and lowercased title -> path
+        self.paths: Dict[str, str] = {}
+        self.titles: Dict[str, str] = {}
+        for path, title, _ in records:
+            self.paths[os.path.normpath(path)] = path
+            self.titles.setdefault(title.casefold(), path)
+
+        self.references: Dict[str, List[str]] = {}
+        self.referenced_by: Dict[str, List[str]] = {}
+        self.dangling: Dict[str, List[Tuple[str, str]]] = {}
+        for path, _, items in records:
+            targets = self.references[path] = []
+            for item in items:
+                for kind, value in parse_item(item):
+                    target = self.resolve(path, kind, value)
+                    if target is None:
+                        self.dangling.setdefault(path, []).append((kind, value))
+                    elif target != path and target not in targets:
+                        targets.append(target)
+                        self.referenced_by.setdefault(target, []).append(path)
+
+    def resolve(self, source: str, kind: str, value: str) -> Optional[str]:
+        """Return the path a reference from source points to, or None"""
+        if kind == "title":
+            return self.titles.get(value.casefold())
+        target = self.link_target(source, value)
+        return self.paths.get(target) if target is not None else None
+
+    @staticmethod
+    def link_target(source: str, value: str) -> Optional[str]:
+        """Normalized path a relative link from source points to (None for absolute links)"""
+        target = unquote(value.split("#", 1)[0])
+        if os.path.isabs(target):
+            # Links must be relative to the prompt so they work wherever the repository is viewed
+            return None
+        return os.path.normpath(os.path.join(os.path.dirname(source), target))
+
+    def neighborhood(self, changed: Iterable[str], removed: Iterable[ReferenceRecord] = ()) -> Set[str]:
+        """Prompts whose references or orphan status a change can affect
+
+        That is the changed prompts, the prompts they reference and are
+        referenced by, the prompts a removed prompt referenced, and the
+        prompts left pointing at a removed prompt's path or title.
+        """
+        affected = set()
+        for path in changed:
+            affected.add(path)
+            affected.update(self.references.get(path, ()))
+            affected.update(self.referenced_by.get(path, ()))
+
+        removed = list(removed)
+        for path, _, items in removed:
+            for item in items:
+                for kind, value in parse_item(item):
+                    target = self.resolve(path, kind, value)
+                    if target is not None:
+                        affected.add(target)
+
+        removed_paths = {os.path.normpath(path) for path, _, _ in removed}
+        removed_titles = {title.casefold() for _, title, _ in removed}
+        for path, references in self.dangling.items():
+            for kind, value in references:
+                if kind == "title" and value.casefold() in removed_titles:
+                    affected.add(path)
+                elif kind == "link" and self.link_target(path, value) in removed_paths:
+                    affected.add(path)
+        return affected
+
+    def orphans(self) -> List[str]:
+        """Prompts that no other prompt references"""
+        return [path for path in self.paths.values() if path not in self.referenced_by]
+
+    def reference_counts(self) -> Dict[str, int]:
+        """Number of other prompts referencing each prompt, by normalized path"""
+        return {os.path.normpath(path): len(sources) for path, sources in self.referenced_by.items()}
+
+    def warnings(self) -> Dict[str, List[str]]:
+        """Dangling reference and orphan warnings keyed by file path"""
+        warnings: Dict[str, List[str]] = {}
+        for path, references in self.dangling.items():
+            for kind, value in references:
+                if kind == "link":
+                    message = f"Related Prompts link does not point to a prompt: {value}"
+                else:
+                    message = f"Related Prompts entry does not match any prompt title: {value}"
+                warnings.setdefault(path, []).append(message)
+        # A single prompt has nothing to be referenced by
+        if len(self.paths) > 1:
+            for path in self.orphans():
+                warnings.setdefault(path, []).append("No other prompt lists this one under Related Prompts")
+        return warnings
+
+
+def open_reference_cache(cache_dir: Path = CACHE_DIR) -> FileCache:
+    """Load the on-disk cache of related items"""
+    scripts_dir = Path(__file__).resolve().parent
+    return FileCache(
+        cache_dir / "references.pickle",
+        fingerprint(scripts_dir / "cross_references.py", scripts_dir / "prompt_parser.py")
+    ).load()
+
+
+def load_reference_records(
+    filepaths: List[Path],
+    jobs: int = 1,
+    cache: Optional[FileCache] = None,
+    changed: Optional[Set[str]] = None,
+    known: Optional[Dict[str, Tuple[str, List[str]]]] = None
+) -> List[ReferenceRecord]:
+    """Extract (or fetch from the cache) the title and related items of every file
+
+    Files whose absolute path is not in changed are taken from the cache
+    unchecked, if it was recorded from the diff's ref (see FileCache.expect_tree).
+    known maps paths to the (title, related items) already extracted in this
+    run, e.g. from index metadata; those files are not parsed again.
+    """
+    records: List[ReferenceRecord] = []
+    pending = {}
+    for filepath in filepaths:
+        if known is not None and str(filepath) in known:
+            title, items = value = known[str(filepath)]
+            records.append((str(filepath), title, items))
+            if cache is not None:
+                cached, state = cache.lookup(filepath)
+                if cached != value:
+                    cache.store(state, value)
+            continue
+        if cache is None:
+            pending[str(filepath)] = None
+            continue
+        if changed is not None and cache.key_for(filepath) not in changed:
+            cached = cache.cached(filepath)
+            if cached is not None:
+                title, items = cached
+                records.append((str(filepath), title, items))
+                continue
+        cached, state = cache.lookup(filepath)
+        if cached is None:
+            pending[str(filepath)] = state
+        else:
+            title, items = cached
+            records.append((str(filepath), title, items))
+
+    for path, title, items in map_prompts(reference_record, [Path(p) for p in pending], jobs):
+        records.append((path, title, items))
+        if cache is not None:
+            cache.store(pending[path], (title, items))
+    return records
+
+
+def reference_warnings(
+    filepaths: List[Path],
+    jobs: int = 1,
+    cache: Optional[FileCache] = None,
+    changed: Optional[Set[str]] = None,
+    removed: Iterable[Path] = (),
+    known: Optional[Dict[str, Tuple[str, List[str]]]] = None
+) -> Dict[str, List[str]]:
+    """Return dangling reference and orphan warnings keyed by file path
+
+    With changed (absolute paths), only warnings in the neighborhood of the
+    changed and removed files are returned. The titles of removed files are
+    looked up in the cache, so they must be read before the cache is pruned.
+    known is passed on to load_reference_records.
+    """
+    records = load_reference_records(filepaths, jobs, cache, changed, known)
+    graph = ReferenceGraph(records)
+    warnings = graph.warnings()
+    if changed is None:
+        return warnings
+
+    removed_records = []
+    for filepath in removed:
+        cached = cache.stored_value(filepath) if cache is not None else None
+        title, items = cached if cached is not None else (filepath.stem, [])
+        removed_records.append((str(filepath), title, items))
+    changed_paths = [path for path, _, _ in records if os.path.abspath(path) in changed]
+    affected = graph.neighborhood(changed_paths, removed_records)
+    return {path: messages for path, messages in warnings.items() if path in affected}
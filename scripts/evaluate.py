@@ -0,0 +1,501 @@
+"""
+PromptHub Evaluation Harness
+
+Runs every prompt against a set of test cases through an HTTP model endpoint,
+concurrently, and records the responses with latency statistics.
+
+Prompts are parsed like the index does and "The Prompt" is compiled with
+prompt_template. Test cases come from a JSONL file, one object per line
+shaped like the test cases in docs/evaluation-guide.md:
+
+    {"name": "simple-syntax-error", "input": {"CODE_BLOCK": "...", ...}, "expected": "..."}
+
+A test case with a "prompt" field only applies to the prompt with that title
+or path suffix; the others apply to every prompt. Each rendered prompt is
+POSTed as JSON ({"prompt": ..., "prompt_path": ..., "test": ...}) to the
+endpoint, and whatever it returns is recorded.
+
+Requests go through a keep-alive connection pool (one connection per
+concurrent request), a token bucket caps the request rate, and connection
+errors, timeouts, 429 and 5xx responses are retried with exponential backoff
+(honouring Retry-After). Successful responses are cached in SQLite by
+endpoint, prompt hash and test input, so re-running a release only sends the
+pairs that changed.
+
+Results are streamed as NDJSON as they complete; a summary with latency
+percentiles and throughput goes to stderr.
+
+Usage:
+    python scripts/prompthub.py evaluate prompts/ tests.jsonl --endpoint http://127.0.0.1:8080/generate
+    python scripts/prompthub.py evaluate prompts/ tests.jsonl --endpoint URL -c 32 --rate 20 -o results.jsonl
+"""
+
+import hashlib
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+from urllib.parse import urlsplit
+
+from file_cache import CACHE_DIR, content_hash
+from generate_index import IndexGenerator
+from lazy import lazy_import
+from prompt_loader import find_prompt_files, load_prompts
+from prompt_template import CompiledTemplate, compile_template
+
+# Imported on first use, so the other prompthub commands do not load the event loop
+asyncio = lazy_import("asyncio")
+sqlite3 = lazy_import("sqlite3")
+ssl = lazy_import("ssl")
+
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_CACHE_PATH = CACHE_DIR / "evaluations.sqlite"
+
+# Statuses worth another attempt
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+# Cached results are committed in batches of this many
+CACHE_COMMIT_EVERY = 100
+
+PERCENTILES = [50, 90, 95, 99]
+
+# (status, headers, body)
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class TokenBucket:
+    """Allows rate acquisitions per second on average, with bursts of up to burst"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, at most size in use at a time"""
+
+    def __init__(self, url: str, size: int, timeout: float = DEFAULT_TIMEOUT):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Endpoint must be an http:// or https:// URL: {url}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def post(self, body: bytes) -> Response:
+        """POST a JSON body to the endpoint"""
+        async with self._slots:
+            reused = bool(self._idle)
+            connection = self._idle.pop() if reused else await self._connect()
+            try:
+                response, keep_alive = await asyncio.wait_for(self._exchange(connection, body), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self._close(connection)
+                if not reused:
+                    raise
+                # The server dropped an idle connection; one fresh attempt does not count as a retry
+                connection = await self._connect()
+                try:
+                    response, keep_alive = await asyncio.wait_for(self._exchange(connection, body), self.timeout)
+                except BaseException:
+                    self._close(connection)
+                    raise
+            except BaseException:
+                self._close(connection)
+                raise
+
+            if keep_alive:
+                self._idle.append(connection)
+            else:
+                self._close(connection)
+            return response
+
+    async def _connect(self) -> Tuple["asyncio.StreamReader", "asyncio.StreamWriter"]:
+        return await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout
+        )
+
+    async def _exchange(
+        self, connection: Tuple["asyncio.StreamReader", "asyncio.StreamWriter"], body: bytes
+    ) -> Tuple[Response, bool]:
+        """Send one request and read its response; return it and whether the connection can be reused"""
+        reader, writer = connection
+        writer.write(
+            f"POST {self.path} HTTP/1.1\r\n"
+            f"Host: {self.host_header}\r\n"
+            "Content-Type: application/json\r\n"
+            "Accept: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n"
+            "\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        version, status, *_ = status_line.decode('latin-1').split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            data = await reader.read()
+            keep_alive = False
+        return (int(status), headers, data), keep_alive
+
+    @staticmethod
+    def _close(connection: Tuple["asyncio.StreamReader", "asyncio.StreamWriter"]):
+        connection[1].close()
+
+    async def close(self):
+        while self._idle:
+            self._close(self._idle.pop())
+
+
+class ResultCache:
+    """Successful responses in SQLite, keyed by endpoint, prompt hash and test input"""
+
+    def __init__(self, db_path: Path = DEFAULT_CACHE_PATH):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, status INTEGER NOT NULL, response TEXT NOT NULL)"
+        )
+        self.pending = 0
+
+    @staticmethod
+    def key(endpoint: str, prompt_hash: str, test_input: dict) -> str:
+        data = json.dumps([endpoint, prompt_hash, test_input], sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[int, str]]:
+        return self.conn.execute("SELECT status, response FROM results WHERE key = ?", (key,)).fetchone()
+
+    def put(self, key: str, status: int, response: str):
+        self.conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", (key, status, response))
+        self.pending += 1
+        if self.pending >= CACHE_COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+
+@dataclass
+class EvaluationPrompt:
+    """A prompt compiled for evaluation"""
+    path: str
+    title: str
+    template: CompiledTemplate
+    digest: str
+
+
+@dataclass
+class TestCase:
+    """One line of the test cases file"""
+    name: str
+    input: Dict[str, object]
+    expected: Optional[object] = None
+    # Title or path suffix of the only prompt this case applies to
+    prompt: Optional[str] = None
+
+    def applies_to(self, prompt: EvaluationPrompt) -> bool:
+        if self.prompt is None:
+            return True
+        return self.prompt.casefold() == prompt.title.casefold() or prompt.path.endswith(self.prompt)
+
+
+@dataclass
+class EvaluationStats:
+    """Counters and latencies of one evaluation run"""
+    sent: int = 0
+    cached: int = 0
+    failed: int = 0
+    skipped: int = 0
+    retries: int = 0
+    # Seconds from the first attempt to the final response of each sent pair, retries included
+    latencies: List[float] = field(default_factory=list)
+
+    def percentile(self, percent: float) -> float:
+        """Nearest-rank percentile of the request latencies, in seconds"""
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        rank = max(1, -(-len(ordered) * percent // 100))
+        return ordered[int(rank) - 1]
+
+    def print_summary(self, elapsed: float):
+        total = self.sent + self.cached + self.failed + self.skipped
+        print(f"\nEvaluated {total} prompt/test pairs in {elapsed:.2f}s", file=sys.stderr)
+        print(
+            f"  {self.sent} answered, {self.cached} from cache, {self.failed} failed, "
+            f"{self.skipped} skipped, {self.retries} retries",
+            file=sys.stderr
+        )
+        if self.latencies:
+            percentiles = ", ".join(f"p{p} {self.percentile(p) * 1000:.0f} ms" for p in PERCENTILES)
+            print(f"  Latency: {percentiles}", file=sys.stderr)
+            print(f"  Throughput: {len(self.latencies) / elapsed:.1f} requests/s", file=sys.stderr)
+
+
+def load_test_cases(path: Path) -> List[TestCase]:
+    """Read test cases from a JSONL file"""
+    cases = []
+    with open(path, encoding='utf-8') as stream:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            case = json.loads(line)
+            if not isinstance(case, dict) or not isinstance(case.get("input", {}), dict):
+                raise ValueError(f"Line {line_number}: expected an object with an \"input\" object")
+            cases.append(TestCase(
+                name=str(case.get("name", line_number)),
+                input=case.get("input", {}),
+                expected=case.get("expected"),
+                prompt=case.get("prompt")
+            ))
+    return cases
+
+
+def load_evaluation_prompts(path: Path) -> List[EvaluationPrompt]:
+    """Parse and compile a prompt file or every prompt in a directory"""
+    filepaths = [path] if path.is_file() else find_prompt_files(path)
+    generator = IndexGenerator()
+    prompts = []
+    for filepath, parsed, error in load_prompts(filepaths):
+        try:
+            if error is not None:
+                raise error
+            template = compile_template(parsed)
+            title = generator.metadata_from_parsed(filepath, parsed).title
+        except Exception as e:
+            print(f"Warning: Skipping {filepath}: {e}", file=sys.stderr)
+            continue
+        prompts.append(EvaluationPrompt(
+            str(filepath), title, template, content_hash(template.source.encode('utf-8'))
+        ))
+    return prompts
+
+
+def decode_response(data: bytes) -> object:
+    """Return the response body as JSON if it is JSON, else as text"""
+    text = data.decode('utf-8', errors='replace')
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def backoff_delay(attempt: int, headers: Optional[Dict[str, str]] = None) -> float:
+    """Seconds to wait before the next attempt: Retry-After if given, else jittered exponential backoff"""
+    retry_after = (headers or {}).get("retry-after", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), BACKOFF_MAX)
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class Evaluator:
+    """Sends prompt/test pairs to an endpoint with bounded concurrency, rate limiting, retries and caching"""
+
+    def __init__(
+        self,
+        endpoint: str,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: Optional[float] = None,
+        retries: int = DEFAULT_RETRIES,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: Optional[ResultCache] = None
+    ):
+        self.endpoint = endpoint
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retries = retries
+        self.timeout = timeout
+        self.cache = cache
+        self.stats = EvaluationStats()
+
+    def pairs(self, prompts: List[EvaluationPrompt], cases: List[TestCase]) -> Iterator[Tuple[EvaluationPrompt, TestCase]]:
+        for prompt in prompts:
+            for case in cases:
+                if case.applies_to(prompt):
+                    yield prompt, case
+
+    async def run(self, prompts: List[EvaluationPrompt], cases: List[TestCase], stream: TextIO):
+        """Evaluate every applicable pair, writing one NDJSON record per pair as it completes"""
+        pool = ConnectionPool(self.endpoint, self.concurrency, self.timeout)
+        bucket = TokenBucket(self.rate) if self.rate else None
+        pairs = self.pairs(prompts, cases)
+
+        async def worker():
+            # Workers share one iterator, so pairs are generated only as fast as they are sent
+            for prompt, case in pairs:
+                record = await self.evaluate(pool, bucket, prompt, case)
+                stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+                stream.flush()
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            await pool.close()
+
+    async def evaluate(
+        self, pool: ConnectionPool, bucket: Optional[TokenBucket], prompt: EvaluationPrompt, case: TestCase
+    ) -> dict:
+        """Evaluate one prompt/test pair and return its result record"""
+        record = {"prompt": prompt.path, "title": prompt.title, "test": case.name}
+        if case.expected is not None:
+            record["expected"] = case.expected
+
+        missing = prompt.template.missing(case.input)
+        if missing:
+            self.stats.skipped += 1
+            record["error"] = f"Missing variables: {', '.join(missing)}"
+            return record
+
+        key = None
+        if self.cache is not None:
+            key = ResultCache.key(self.endpoint, prompt.digest, case.input)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats.cached += 1
+                record.update(status=cached[0], response=json.loads(cached[1]), cached=True)
+                return record
+
+        body = json.dumps({
+            "prompt": prompt.template.render(case.input),
+            "prompt_path": prompt.path,
+            "test": case.name,
+        }, ensure_ascii=False).encode('utf-8')
+
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            if bucket is not None:
+                await bucket.acquire()
+            headers = None
+            try:
+                status, headers, data = await pool.post(body)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                status, error = None, f"{type(e).__name__}: {e}"
+            else:
+                if status not in RETRY_STATUSES:
+                    break
+                error = f"HTTP {status}"
+            if attempt < self.retries:
+                self.stats.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, headers))
+        else:
+            self.stats.failed += 1
+            record.update(status=status, error=error, attempts=self.retries + 1)
+            return record
+
+        latency = time.perf_counter() - start
+        self.stats.latencies.append(latency)
+        response = decode_response(data)
+        record.update(status=status, response=response, latency_ms=round(latency * 1000, 1), attempts=attempt + 1)
+        if 200 <= status < 300:
+            self.stats.sent += 1
+            if self.cache is not None:
+                self.cache.put(key, status, json.dumps(response, ensure_ascii=False))
+        else:
+            self.stats.failed += 1
+        return record
+
+
+def run_evaluation(
+    prompts_path: Path,
+    tests_path: Path,
+    endpoint: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: Optional[float] = None,
+    retries: int = DEFAULT_RETRIES,
+    timeout: float = DEFAULT_TIMEOUT,
+    use_cache: bool = True,
+    cache_path: Path = DEFAULT_CACHE_PATH,
+    output_path: Optional[Path] = None
+) -> int:
+    """Evaluate prompts against test cases and return the exit code (1 if any pair failed)"""
+    if not prompts_path.exists():
+        print(f"Error: Path does not exist: {prompts_path}", file=sys.stderr)
+        return 1
+    try:
+        cases = load_test_cases(tests_path)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot read test cases from {tests_path}: {e}", file=sys.stderr)
+        return 1
+
+    prompts = load_evaluation_prompts(prompts_path)
+    evaluator = Evaluator(
+        endpoint, max(1, concurrency), rate, retries, timeout, ResultCache(cache_path) if use_cache else None
+    )
+    start = time.perf_counter()
+    stream = open(output_path, "w", encoding='utf-8') if output_path else sys.stdout
+    try:
+        asyncio.run(evaluator.run(prompts, cases, stream))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output_path:
+            stream.close()
+        if evaluator.cache is not None:
+            evaluator.cache.close()
+
+    evaluator.stats.print_summary(time.perf_counter() - start)
+    if output_path:
+        print(f"✓ Results written to: {output_path}", file=sys.stderr)
+    return 1 if evaluator.stats.failed else 0
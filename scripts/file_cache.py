@@ -0,0 +1,198 @@
+"""
+PromptHub File Cache
+
+Persistent per-file cache used by the validation and indexing scripts so that
+unchanged prompts are not re-read or re-parsed on every run.
+
+Entries are keyed by file path and remember the file's mtime, size and content
+hash. A matching mtime/size is trusted without reading the file; otherwise the
+file is hashed and the entry is reused if the content is unchanged. The whole
+cache is discarded when its fingerprint (the rules that produced the values)
+changes.
+
+A cache brought up to date with a clean git checkout also records the tree id
+of the prompts it was built from. A --changed-since run only takes entries of
+files outside the diff unchecked (see cached) if that tree is the ref's.
+"""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+
+from lazy import lazy_import
+
+# Not needed by commands that never touch a cache
+pickle = lazy_import("pickle")
+
+
+CACHE_DIR = Path(".prompthub-cache")
+CACHE_VERSION = 2
+
+# Files modified this close to the time they were cached may change again
+# within the same mtime tick, so their stat info is not trusted on the next run
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def content_hash(data: bytes) -> str:
+    """Return a short, stable digest of file contents"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def fingerprint(*parts: Any) -> str:
+    """Build a fingerprint from rule values and (for Path parts) source files"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(CACHE_VERSION).encode())
+    for part in parts:
+        if isinstance(part, Path):
+            digest.update(part.read_bytes())
+        else:
+            digest.update(repr(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+@dataclass
+class FileState:
+    """Stat and content information gathered while looking up a file"""
+    key: str
+    mtime_ns: int
+    size: int
+    digest: Optional[str] = None
+
+
+class FileCache:
+    """Content-hash cache of per-file values persisted with pickle"""
+
+    def __init__(self, cache_path: Path, fingerprint: str):
+        self.cache_path = cache_path
+        self.fingerprint = fingerprint
+        # key -> (mtime_ns, size, digest, value)
+        self.entries: Dict[str, Tuple[int, int, str, Any]] = {}
+        # Git tree id of the prompts the loaded entries were recorded from, if known
+        self.tree: Optional[str] = None
+        # The tree save() records: store() clears it until record_tree() sets it again
+        self._saved_tree: Optional[str] = None
+        # Whether entries may be used unchecked (see expect_tree)
+        self.trusted = False
+        self.seen: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self._started_ns = time.time_ns()
+        self._dirty = False
+
+    def load(self) -> "FileCache":
+        """Load entries from disk, ignoring missing, corrupt or stale caches"""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                stored_fingerprint, tree, entries = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError, TypeError):
+            return self
+
+        if stored_fingerprint == self.fingerprint:
+            self.entries = entries
+            self.tree = self._saved_tree = tree
+        else:
+            self._dirty = True
+        return self
+
+    @staticmethod
+    def key_for(filepath: Path) -> str:
+        return os.path.abspath(filepath)
+
+    def lookup(self, filepath: Path) -> Tuple[Any, FileState]:
+        """Return (cached value or None, file state) for a file"""
+        key = self.key_for(filepath)
+        self.seen.add(key)
+        stat = os.stat(filepath)
+        state = FileState(key=key, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, state
+
+        mtime_ns, size, digest, value = entry
+        if mtime_ns == state.mtime_ns and size == state.size:
+            self.hits += 1
+            return value, state
+
+        # Stat changed: fall back to comparing content hashes
+        state.digest = content_hash(Path(filepath).read_bytes())
+        if digest == state.digest:
+            self.hits += 1
+            self.store(state, value)
+            return value, state
+
+        self.misses += 1
+        return None, state
+
+    def expect_tree(self, tree: Optional[str]):
+        """Allow cached() in a diff against a ref with this prompts tree id, if the entries were recorded from it"""
+        self.trusted = tree is not None and tree == self.tree
+
+    def record_tree(self, tree: Optional[str]):
+        """Record the git tree the entries now match, after every file under it was looked up"""
+        if tree != self._saved_tree:
+            self._saved_tree = tree
+            self._dirty = True
+
+    def cached(self, filepath: Path) -> Any:
+        """Return the stored value for a file a diff says is unchanged, without checking it
+
+        Returns None unless expect_tree() was given the tree the entries were
+        recorded from, so the caller falls back to lookup().
+        """
+        if not self.trusted:
+            return None
+        self.seen.add(self.key_for(filepath))
+        value = self.stored_value(filepath)
+        if value is not None:
+            self.hits += 1
+        return value
+
+    def stored_value(self, filepath: Path) -> Any:
+        """Return the stored value for a file, if any, without marking it as seen"""
+        entry = self.entries.get(self.key_for(filepath))
+        return entry[3] if entry is not None else None
+
+    def stored_digest(self, filepath: Path) -> Optional[str]:
+        """Return the content hash recorded for a file, if any, without checking the file"""
+        entry = self.entries.get(self.key_for(filepath))
+        return entry[2] if entry is not None else None
+
+    def store(self, state: FileState, value: Any):
+        """Record the value computed for a file"""
+        if state.digest is None:
+            state.digest = content_hash(Path(state.key).read_bytes())
+        mtime_ns = state.mtime_ns
+        if mtime_ns >= self._started_ns - RACY_WINDOW_NS:
+            mtime_ns = -1
+        self.entries[state.key] = (mtime_ns, state.size, state.digest, value)
+        # The entries no longer match the recorded tree until record_tree() says they do
+        self._saved_tree = None
+        self._dirty = True
+
+    def prune(self, root: Path):
+        """Evict entries under root that were not looked up in this run"""
+        prefix = self.key_for(root).rstrip(os.sep) + os.sep
+        stale = [
+            key for key in self.entries
+            if key.startswith(prefix) and key not in self.seen
+        ]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self._dirty = True
+
+    def save(self):
+        """Write the cache to disk atomically if anything changed"""
+        if not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(self.cache_path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((self.fingerprint, self._saved_tree, self.entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
@@ -6,14 +6,54 @@ Automatically generates an INDEX.md file with all prompts organized by category.
 
 Usage:
     python scripts/generate_index.py
+    python scripts/generate_index.py --incremental  # reuse stored metadata for unchanged files
+    python scripts/generate_index.py --sharded  # root INDEX.md plus paginated pages under index/
+    python scripts/generate_index.py --changed-since HEAD~1  # only re-extract what changed since a commit
+
+Besides INDEX.md, a prebuilt inverted index for `prompthub.py query` is written
+to .prompthub-cache/inverted-index.json (see --inverted-index), and the BM25
+index for `prompthub.py search` is updated in .prompthub-cache/search.sqlite
+(see --search-index). --json-export also writes a static JSON API for web
+clients (see json_export).
 """
 
+import argparse
+import math
+import os
 import re
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 
+from catalog import PromptCatalog
+from catalog_snapshot import snapshot_path, write_snapshot
+from cross_references import ReferenceGraph, related_items
+from file_cache import CACHE_DIR, FileCache, fingerprint
+from git_changes import changed_prompts, worktree_tree
+from inverted_index import DEFAULT_INDEX_PATH, InvertedIndex
+from json_export import DEFAULT_EXPORT_DIR, EXPORT_VERSION, ROW_FIELDS, JsonExport
+from lazy import lazy_pattern
+from prompt_loader import add_loader_arguments, find_prompt_files, load_prompt, load_prompts, set_read_ahead
+from prompt_parser import ParsedPrompt
+from search_index import DEFAULT_SEARCH_PATH, SearchDocument, SearchIndex
+from token_estimate import prompt_tokens
+
+
+CATEGORIES = ["Coding", "Writing", "Analysis", "Creative", "Education", "Research"]
+DIFFICULTY_ORDER = {"Beginner": 1, "Intermediate": 2, "Advanced": 3}
+DIFFICULTY_EMOJI = {"Beginner": "🟢", "Intermediate": "🟡", "Advanced": "🔴"}
+
+# Sharded output: pages live under this directory, at most PAGE_SIZE prompts each
+SHARD_DIR = Path("index")
+PAGE_SIZE = 100
+# Lists the pages written under the shard directory, so later runs only remove their own files
+PAGE_MANIFEST = ".pages"
+
+# The generation time line, which changes on every render
+TIMESTAMP_PATTERN = lazy_pattern(r'^\*Last updated: [^*\n]*\*$', re.MULTILINE)
+
 
 @dataclass
 class PromptMetadata:
@@ -27,32 +67,115 @@ class PromptMetadata:
     description: str
     author: str
     date_added: str
+    # Estimated size of the prompt's code block, see token_estimate
+    tokens: int = 0
+    # List items of the Related Prompts section, see cross_references
+    related: List[str] = field(default_factory=list)
+
+
+def metadata_to_record(metadata: PromptMetadata) -> dict:
+    """Convert metadata to a plain dict for the metadata store"""
+    # Records are stored as plain dicts so the store does not depend on class pickling
+    record = asdict(metadata)
+    del record["filepath"]
+    return record
+
+
+def metadata_from_record(filepath: Path, record: dict) -> PromptMetadata:
+    """Rebuild metadata from a stored record"""
+    return PromptMetadata(filepath=filepath, **record)
+
+
+def index_body(content: str) -> str:
+    """Return index markdown without its "Last updated" line, for change detection"""
+    return TIMESTAMP_PATTERN.sub("", content, count=1)
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write content unless the file already holds it (ignoring the "Last updated" line)"""
+    try:
+        if index_body(path.read_text(encoding='utf-8')) == index_body(content):
+            return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+    return True
+
+
+def remove_stale_pages(shard_dir: Path, pages: Dict[Path, str]) -> int:
+    """Delete pages the previous run wrote under shard_dir that were not rendered this time
+    
+    The pages written are listed in shard_dir's manifest, so files that were not
+    generated (notes, a README) are never touched.
+    """
+    manifest_path = shard_dir / PAGE_MANIFEST
+    try:
+        previous = set(manifest_path.read_text(encoding='utf-8').splitlines())
+    except (OSError, UnicodeDecodeError):
+        previous = set()
+    current = sorted(
+        Path(os.path.relpath(path, shard_dir)).as_posix()
+        for path in pages if shard_dir in path.parents
+    )
+    
+    removed = 0
+    for name in sorted(previous.difference(current)):
+        try:
+            (shard_dir / name).unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    write_if_changed(manifest_path, "".join(f"{name}\n" for name in current))
+    return removed
+
+
+def metadata_fingerprint() -> str:
+    """Fingerprint of the extraction code, used to invalidate stored metadata"""
+    scripts_dir = Path(__file__).resolve().parent
+    return fingerprint(
+        scripts_dir / "generate_index.py",
+        scripts_dir / "prompt_parser.py",
+        scripts_dir / "token_estimate.py",
+        scripts_dir / "cross_references.py"
+    )
+
+
+def open_metadata_store(cache_dir: Path = CACHE_DIR) -> FileCache:
+    """Load the on-disk store of extracted metadata records"""
+    return FileCache(cache_dir / "index.pickle", metadata_fingerprint()).load()
 
 
 class IndexGenerator:
     """Generates index of all prompts"""
     
-    def __init__(self, prompts_dir: Path = None):
+    def __init__(self, prompts_dir: Path = None, store: Optional[FileCache] = None):
         self.prompts_dir = prompts_dir or Path("prompts")
-        self.prompts: List[PromptMetadata] = []
+        self.prompts = PromptCatalog()
+        # Persisted metadata records; when set, only new or modified files are re-extracted
+        self.store = store
+        self._reference_counts: Optional[Dict[str, int]] = None
+    
+    @classmethod
+    def with_metadata_store(cls, prompts_dir: Path = None, cache_dir: Path = CACHE_DIR) -> "IndexGenerator":
+        """Create a generator backed by the on-disk metadata store"""
+        return cls(prompts_dir, open_metadata_store(cache_dir))
     
     def extract_metadata(self, filepath: Path) -> PromptMetadata:
         """Extract metadata from a prompt file"""
-        content = filepath.read_text(encoding='utf-8')
-        
-        # Extract title (first h1)
-        title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-        title = title_match.group(1).strip() if title_match else filepath.stem
+        return self.metadata_from_parsed(filepath, load_prompt(filepath))
+    
+    def metadata_from_parsed(self, filepath: Path, parsed: ParsedPrompt) -> PromptMetadata:
+        """Extract metadata from an already parsed prompt"""
+        # Title is the first h1
+        title = parsed.title or filepath.stem
         
         # Extract metadata fields
         def extract_field(field_name: str, default: str = "Unknown") -> str:
-            pattern = rf'\*\*{field_name}\*\*:\s*(.+)'
-            match = re.search(pattern, content)
-            if match:
-                value = match.group(1).strip()
+            value = parsed.metadata.get(field_name)
+            if value:
                 # Remove brackets and extra formatting
-                value = re.sub(r'[\[\]]', '', value)
-                return value
+                return re.sub(r'[\[\]]', '', value)
             return default
         
         category = extract_field("Category")
@@ -62,17 +185,13 @@ class IndexGenerator:
         date_added = extract_field("Date Added", "Unknown")
         
         # Extract tags
-        tags_match = re.search(r'\*\*Tags\*\*:\s*(.+)', content)
-        tags = []
-        if tags_match:
-            tags_text = tags_match.group(1)
-            tags = re.findall(r'`#(\w+)`', tags_text)
+        tags = re.findall(r'`#(\w+)`', parsed.metadata.get("Tags", ""))
         
         # Extract description
-        desc_match = re.search(r'## Description\s+(.+?)(?=##)', content, re.DOTALL)
         description = "No description available."
-        if desc_match:
-            description = desc_match.group(1).strip()
+        desc_body = parsed.section_body("## Description")
+        if desc_body and desc_body.strip():
+            description = desc_body.strip()
             # Take first sentence or first 150 chars
             description = description.split('.')[0] + '.'
             if len(description) > 150:
@@ -87,75 +206,172 @@ class IndexGenerator:
             tags=tags,
             description=description,
             author=author,
-            date_added=date_added
+            date_added=date_added,
+            tokens=prompt_tokens(parsed),
+            related=related_items(parsed)
         )
     
-    def collect_prompts(self):
-        """Collect all prompts from the prompts directory"""
-        self.prompts = []
-        
-        for filepath in self.prompts_dir.rglob("*.md"):
-            # Skip README and other documentation
-            if filepath.name.upper() in ["README.MD", "INDEX.MD"]:
+    def collect_prompts(self, changed: Optional[Set[str]] = None, tree: Optional[str] = None):
+        """Collect all prompts from the prompts directory
+        
+        With changed (absolute paths, see git_changes), the stored metadata of
+        every other file is used without checking the file, if the store was
+        recorded from tree (the git tree id of the prompts at the diff's ref).
+        """
+        prompts = PromptCatalog()
+        if self.store is not None:
+            self.store.expect_tree(tree)
+        
+        # Stored metadata is used for unchanged files; the rest are read ahead and parsed
+        pending = {}
+        failed = False
+        for filepath in find_prompt_files(self.prompts_dir):
+            if self.store is None:
+                pending[filepath] = None
                 continue
-            
+            if changed is not None and self.store.key_for(filepath) not in changed:
+                record = self.store.cached(filepath)
+                if record is not None:
+                    prompts.append(metadata_from_record(filepath, record))
+                    continue
+            try:
+                record, state = self.store.lookup(filepath)
+            except Exception as e:
+                print(f"Warning: Failed to process {filepath}: {e}")
+                failed = True
+                continue
+            if record is not None:
+                prompts.append(metadata_from_record(filepath, record))
+            else:
+                pending[filepath] = state
+        
+        for filepath, parsed, error in load_prompts(pending):
             try:
-                metadata = self.extract_metadata(filepath)
-                self.prompts.append(metadata)
+                if error is not None:
+                    raise error
+                metadata = self.metadata_from_parsed(filepath, parsed)
+                if self.store is not None:
+                    self.store.store(pending[filepath], metadata_to_record(metadata))
+                prompts.append(metadata)
             except Exception as e:
                 print(f"Warning: Failed to process {filepath}: {e}")
+                failed = True
+        
+        if self.store is not None:
+            # Drop records for removed files and persist the rest
+            self.store.prune(self.prompts_dir)
+            # Records of files that failed were left as they were, matching no tree
+            self.store.record_tree(None if failed else worktree_tree(self.prompts_dir))
+            self.store.save()
         
+        self.set_prompts(prompts)
+    
+    def set_prompts(self, prompts: Iterable[PromptMetadata]):
+        """Use already collected prompts (a list of PromptMetadata or a PromptCatalog)"""
+        if not isinstance(prompts, PromptCatalog):
+            prompts = PromptCatalog.from_prompts(prompts)
         # Sort by title
-        self.prompts.sort(key=lambda p: p.title.lower())
+        prompts.sort(key=lambda p: p.title.lower())
+        self.prompts = prompts
+        self._reference_counts = None
+    
+    @property
+    def reference_counts(self) -> Dict[str, int]:
+        """How many other prompts list each prompt under Related Prompts, by normalized path"""
+        if self._reference_counts is None:
+            graph = ReferenceGraph((str(p.filepath), p.title, p.related) for p in self.prompts)
+            self._reference_counts = graph.reference_counts()
+        return self._reference_counts
+    
+    @reference_counts.setter
+    def reference_counts(self, counts: Dict[str, int]):
+        """Use counts kept up to date elsewhere (see watch)"""
+        self._reference_counts = counts
+    
+    def group_by_category(self, categories: List[str] = None) -> Dict[str, List[PromptMetadata]]:
+        """Group prompts by category in a single pass, each group sorted by difficulty, then title"""
+        categories = categories or CATEGORIES
+        groups: Dict[str, List[PromptMetadata]] = {category: [] for category in categories}
+        for prompt in self.prompts:
+            for category in categories:
+                if category in prompt.category:
+                    groups[category].append(prompt)
+        
+        for category_prompts in groups.values():
+            category_prompts.sort(key=lambda p: (
+                DIFFICULTY_ORDER.get(p.difficulty, 999),
+                p.title.lower()
+            ))
+        return groups
+    
+    def group_by_tag(self) -> Dict[str, List[PromptMetadata]]:
+        """Group prompts by lowercased tag in a single pass, each group sorted by title"""
+        groups: Dict[str, List[PromptMetadata]] = {}
+        for prompt in self.prompts:
+            for tag in dict.fromkeys(tag.lower() for tag in prompt.tags):
+                groups.setdefault(tag, []).append(prompt)
+        return groups
+    
+    def relative_path(self, prompt: PromptMetadata) -> Path:
+        """A prompt's path relative to the working directory, where possible"""
+        # If filepath is already relative, use it; otherwise make it relative
+        if prompt.filepath.is_absolute():
+            try:
+                return prompt.filepath.relative_to(Path.cwd())
+            except ValueError:
+                # If we can't make it relative, just use the filename
+                return prompt.filepath
+        return prompt.filepath
     
-    def generate_category_section(self, category: str) -> str:
-        """Generate markdown section for a category"""
-        category_prompts = [p for p in self.prompts if category in p.category]
+    def prompt_link(self, prompt: PromptMetadata, base_dir: Optional[Path] = None) -> str:
+        """Markdown link to a prompt, relative to base_dir (default: the working directory)"""
+        rel_path = self.relative_path(prompt)
+        if base_dir is not None:
+            rel_path = Path(os.path.relpath(rel_path, base_dir))
+        return f"[{prompt.title}]({rel_path.as_posix()})"
+    
+    def prompt_table(self, prompts: List[PromptMetadata], base_dir: Optional[Path] = None) -> List[str]:
+        """Table rows listing prompts with their difficulty, models, size, references and description"""
+        lines = [
+            "| Prompt | Difficulty | Models | Tokens | Referenced By | Description |",
+            "|--------|-----------|---------|--------|---------------|-------------|"
+        ]
+        lines.extend(self.prompt_row(prompt, base_dir) for prompt in prompts)
+        return lines
+    
+    def prompt_row(self, prompt: PromptMetadata, base_dir: Optional[Path] = None) -> str:
+        """One prompt's row in a prompt table"""
+        # Format difficulty with emoji
+        difficulty = f"{DIFFICULTY_EMOJI.get(prompt.difficulty, '⚪')} {prompt.difficulty}"
+        
+        # Truncate description if too long
+        desc = prompt.description
+        if len(desc) > 100:
+            desc = desc[:97] + "..."
+        
+        tokens = f"~{prompt.tokens:,}" if prompt.tokens else "-"
+        referenced_by = self.reference_counts.get(os.path.normpath(prompt.filepath), 0)
+        
+        return (
+            f"| {self.prompt_link(prompt, base_dir)} | {difficulty} | {prompt.models} | {tokens} "
+            f"| {referenced_by} | {desc} |"
+        )
+    
+    def generate_category_section(
+        self, category: str, category_prompts: Optional[List[PromptMetadata]] = None
+    ) -> str:
+        """Generate markdown section for a category
+        
+        Pass the category's group from group_by_category() to avoid scanning every prompt.
+        """
+        if category_prompts is None:
+            category_prompts = self.group_by_category([category])[category]
         
         if not category_prompts:
             return ""
         
-        # Sort by difficulty, then title
-        difficulty_order = {"Beginner": 1, "Intermediate": 2, "Advanced": 3}
-        category_prompts.sort(key=lambda p: (
-            difficulty_order.get(p.difficulty, 999),
-            p.title.lower()
-        ))
-        
         lines = [f"### {category}\n"]
-        
-        # Create table
-        lines.append("| Prompt | Difficulty | Models | Description |")
-        lines.append("|--------|-----------|---------|-------------|")
-        
-        for prompt in category_prompts:
-            # Create relative link
-            # If filepath is already relative, use it; otherwise make it relative
-            if prompt.filepath.is_absolute():
-                try:
-                    rel_path = prompt.filepath.relative_to(Path.cwd())
-                except ValueError:
-                    # If we can't make it relative, just use the filename
-                    rel_path = prompt.filepath
-            else:
-                rel_path = prompt.filepath
-            link = f"[{prompt.title}]({rel_path})"
-            
-            # Format difficulty with emoji
-            difficulty_emoji = {
-                "Beginner": "🟢",
-                "Intermediate": "🟡",
-                "Advanced": "🔴"
-            }
-            difficulty = f"{difficulty_emoji.get(prompt.difficulty, '⚪')} {prompt.difficulty}"
-            
-            # Truncate description if too long
-            desc = prompt.description
-            if len(desc) > 100:
-                desc = desc[:97] + "..."
-            
-            lines.append(f"| {link} | {difficulty} | {prompt.models} | {desc} |")
-        
+        lines.extend(self.prompt_table(category_prompts))
         lines.append("")  # Empty line after table
         return "\n".join(lines)
     
@@ -167,17 +383,20 @@ class IndexGenerator:
             for tag in prompt.tags:
                 tag_counts[tag] = tag_counts.get(tag, 0) + 1
         
-        if not tag_counts:
-            return ""
-        
         # Sort by count, then alphabetically
         sorted_tags = sorted(tag_counts.items(), key=lambda x: (-x[1], x[0].lower()))
+        return self.format_tags_section(sorted_tags[:30])  # Limit to top 30 tags
+    
+    def format_tags_section(self, tag_counts: List[Tuple[str, int]]) -> str:
+        """Format the tag cloud from (tag, count) pairs, most common first"""
+        if not tag_counts:
+            return ""
         
         lines = ["## 🏷️ Browse by Tag\n"]
         
         # Create tag links (using GitHub search)
         tag_links = []
-        for tag, count in sorted_tags[:30]:  # Limit to top 30 tags
+        for tag, count in tag_counts:
             tag_links.append(f"`#{tag}` ({count})")
         
         # Format in columns
@@ -200,20 +419,33 @@ class IndexGenerator:
         for prompt in self.prompts:
             difficulties[prompt.difficulty] = difficulties.get(prompt.difficulty, 0) + 1
         
+        return self.format_statistics(
+            total,
+            sorted(categories.items(), key=lambda x: -x[1]),
+            sorted(difficulties.items(), key=lambda x: -x[1])
+        )
+    
+    def format_statistics(
+        self,
+        total: int,
+        categories: List[Tuple[str, int]],
+        difficulties: List[Tuple[str, int]]
+    ) -> str:
+        """Format the statistics section from (value, count) pairs, most common first"""
         lines = ["## 📊 Repository Statistics\n"]
         lines.append(f"**Total Prompts:** {total}")
         lines.append("")
         
         lines.append("**By Category:**")
-        for cat, count in sorted(categories.items(), key=lambda x: -x[1]):
+        for cat, count in categories:
             percentage = (count / total * 100) if total > 0 else 0
             lines.append(f"- {cat}: {count} ({percentage:.1f}%)")
         
         lines.append("")
         lines.append("**By Difficulty:**")
-        for diff, count in sorted(difficulties.items(), key=lambda x: -x[1]):
+        for diff, count in difficulties:
             percentage = (count / total * 100) if total > 0 else 0
-            emoji = {"Beginner": "🟢", "Intermediate": "🟡", "Advanced": "🔴"}.get(diff, "⚪")
+            emoji = DIFFICULTY_EMOJI.get(diff, "⚪")
             lines.append(f"- {emoji} {diff}: {count} ({percentage:.1f}%)")
         
         lines.append("")
@@ -224,24 +456,17 @@ class IndexGenerator:
         # Sort by date (most recent first)
         dated_prompts = [p for p in self.prompts if p.date_added != "Unknown"]
         dated_prompts.sort(key=lambda p: p.date_added, reverse=True)
-        
-        if not dated_prompts:
+        return self.format_recent_section(dated_prompts[:limit])
+    
+    def format_recent_section(self, recent_prompts: List[PromptMetadata]) -> str:
+        """Format the recently added list from prompts, most recent first"""
+        if not recent_prompts:
             return ""
         
         lines = [f"## 🆕 Recently Added\n"]
         
-        for prompt in dated_prompts[:limit]:
-            # Create relative link
-            # If filepath is already relative, use it; otherwise make it relative
-            if prompt.filepath.is_absolute():
-                try:
-                    rel_path = prompt.filepath.relative_to(Path.cwd())
-                except ValueError:
-                    rel_path = prompt.filepath
-            else:
-                rel_path = prompt.filepath
-            link = f"[{prompt.title}]({rel_path})"
-            lines.append(f"- {link} - {prompt.date_added}")
+        for prompt in recent_prompts:
+            lines.append(f"- {self.prompt_link(prompt)} - {prompt.date_added}")
         
         lines.append("")
         return "\n".join(lines)
@@ -249,8 +474,10 @@ class IndexGenerator:
     def generate_index(self) -> str:
         """Generate complete index markdown"""
         self.collect_prompts()
-        
-        lines = [
+        return self.render_index()
+    
+    def _header_lines(self) -> List[str]:
+        return [
             "# PromptHub Index",
             "",
             f"*Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*",
@@ -267,61 +494,332 @@ class IndexGenerator:
             "---",
             ""
         ]
+    
+    def _footer_lines(self) -> List[str]:
+        return [
+            "---",
+            "",
+            "## 🤝 Contributing",
+            "",
+            "Don't see what you're looking for? [Submit a new prompt](CONTRIBUTING.md)!",
+            "",
+            "**[Back to Main README](README.md)**"
+        ]
+    
+    def render_index(self) -> str:
+        """Render index markdown from the already collected prompts"""
+        groups = self.group_by_category()
+        return self.assemble_index(
+            self.generate_statistics(),
+            self.generate_recent_section(),
+            [self.generate_category_section(category, groups[category]) for category in CATEGORIES],
+            self.generate_tags_section()
+        )
+    
+    def assemble_index(self, statistics: str, recent: str, category_sections: List[str], tags: str) -> str:
+        """Join rendered sections into index markdown (empty category sections are left out)"""
+        lines = self._header_lines()
         
         # Add statistics
-        lines.append(self.generate_statistics())
+        lines.append(statistics)
         
         # Add recent section
-        lines.append(self.generate_recent_section())
+        lines.append(recent)
         
         # Add categories
         lines.append("## 📁 Browse by Category\n")
-        
-        categories = [
-            "Coding",
-            "Writing", 
-            "Analysis",
-            "Creative",
-            "Education",
-            "Research"
-        ]
-        
-        for category in categories:
-            section = self.generate_category_section(category)
-            if section:
-                lines.append(section)
+        lines.extend(section for section in category_sections if section)
         
         # Add tags section
-        lines.append(self.generate_tags_section())
+        lines.append(tags)
         
         # Add footer
-        lines.extend([
-            "---",
-            "",
-            "## 🤝 Contributing",
-            "",
-            "Don't see what you're looking for? [Submit a new prompt](CONTRIBUTING.md)!",
-            "",
-            "**[Back to Main README](README.md)**"
-        ])
+        lines.extend(self._footer_lines())
         
         return "\n".join(lines)
     
-    def write_index(self, output_path: Path = None):
-        """Generate and write index to file"""
+    def render_pages(
+        self,
+        directory: Path,
+        slug: str,
+        title: str,
+        prompts: List[PromptMetadata],
+        index_path: Path,
+        page_size: int = PAGE_SIZE
+    ) -> Dict[Path, str]:
+        """Render a list of prompts as linked pages of at most page_size rows"""
+        page_count = max(1, math.ceil(len(prompts) / page_size))
+        names = [f"{slug}.md"] + [f"{slug}-{number}.md" for number in range(2, page_count + 1)]
+        back_link = Path(os.path.relpath(index_path, directory)).as_posix()
+        
+        pages = {}
+        for number, name in enumerate(names, 1):
+            nav = [f"{len(prompts)} prompts", f"Page {number} of {page_count}"]
+            if number > 1:
+                nav.append(f"[← Previous]({names[number - 2]})")
+            if number < page_count:
+                nav.append(f"[Next →]({names[number]})")
+            nav.append(f"[Back to index]({back_link})")
+            
+            lines = [f"# {title}", "", f"*{' · '.join(nav)}*", ""]
+            lines.extend(self.prompt_table(prompts[(number - 1) * page_size:number * page_size], directory))
+            lines.append("")
+            pages[directory / name] = "\n".join(lines)
+        return pages
+    
+    def render_sharded_index(
+        self, output_path: Path, shard_dir: Path, page_size: int = PAGE_SIZE
+    ) -> Dict[Path, str]:
+        """Render a small root index plus one set of pages per category and per tag"""
+        root_dir = output_path.parent
+        pages: Dict[Path, str] = {}
+        
+        def link(path: Path, base_dir: Path) -> str:
+            return Path(os.path.relpath(path, base_dir)).as_posix()
+        
+        category_lines = []
+        groups = self.group_by_category()
+        for category in CATEGORIES:
+            if not groups[category]:
+                continue
+            category_pages = self.render_pages(
+                shard_dir / "categories", category.lower(), f"{category} Prompts",
+                groups[category], output_path, page_size
+            )
+            pages.update(category_pages)
+            first_page = next(iter(category_pages))
+            category_lines.append(f"- [{category}]({link(first_page, root_dir)}) ({len(groups[category])})")
+        
+        # Sort by count, then alphabetically
+        tags = sorted(self.group_by_tag().items(), key=lambda item: (-len(item[1]), item[0]))
+        tag_links = []
+        for tag, tag_prompts in tags:
+            tag_pages = self.render_pages(
+                shard_dir / "tags", tag, f"Prompts tagged `#{tag}`", tag_prompts, output_path, page_size
+            )
+            pages.update(tag_pages)
+            tag_links.append((tag, len(tag_prompts), next(iter(tag_pages))))
+        
+        tags_page = shard_dir / "tags.md"
+        tag_list = [
+            f"- [`#{tag}`]({link(first_page, tags_page.parent)}) ({count})"
+            for tag, count, first_page in tag_links
+        ]
+        pages[tags_page] = "\n".join(
+            ["# All Tags", "", f"*[Back to index]({link(output_path, tags_page.parent)})*", ""]
+            + tag_list + [""]
+        )
+        
+        lines = self._header_lines()
+        lines.append(self.generate_statistics())
+        lines.append(self.generate_recent_section())
+        lines.append("## 📁 Browse by Category\n")
+        lines.extend(category_lines)
+        lines.append("")
+        if tag_links:
+            lines.append("## 🏷️ Browse by Tag\n")
+            # Limit to top 30 tags
+            lines.append(" · ".join(
+                f"[`#{tag}`]({link(first_page, root_dir)}) ({count})"
+                for tag, count, first_page in tag_links[:30]
+            ))
+            lines.append("")
+            lines.append(f"[All {len(tag_links)} tags]({link(tags_page, root_dir)})")
+            lines.append("")
+        lines.extend(self._footer_lines())
+        
+        pages[output_path] = "\n".join(lines)
+        return pages
+    
+    def write_index(
+        self,
+        output_path: Path = None,
+        collect: bool = True,
+        shard_dir: Optional[Path] = None,
+        page_size: int = PAGE_SIZE
+    ):
+        """Generate and write index to file
+        
+        Pass collect=False to render prompts that were already loaded into self.prompts.
+        With shard_dir, output_path becomes a small root index linking to paginated
+        category and tag pages under shard_dir. Files are only rewritten when their
+        content (ignoring the "Last updated" line) changed.
+        """
         output_path = output_path or Path("INDEX.md")
         
-        index_content = self.generate_index()
-        output_path.write_text(index_content, encoding='utf-8')
+        if collect:
+            self.collect_prompts()
+        
+        if shard_dir is None:
+            if write_if_changed(output_path, self.render_index()):
+                print(f"✓ Generated index with {len(self.prompts)} prompts")
+                print(f"✓ Written to: {output_path}")
+            else:
+                print(f"✓ Index with {len(self.prompts)} prompts is unchanged: {output_path}")
+            return
+        
+        pages = self.render_sharded_index(output_path, shard_dir, page_size)
+        written = sum(write_if_changed(path, content) for path, content in pages.items())
+        removed = remove_stale_pages(shard_dir, pages)
+        print(f"✓ Generated sharded index with {len(self.prompts)} prompts in {len(pages)} files")
+        print(f"✓ {written} written, {len(pages) - written} unchanged, {removed} removed: {output_path}, {shard_dir}")
+    
+    def write_inverted_index(self, output_path: Path = None):
+        """Write the prebuilt tag/category/difficulty/model/author lookup index and its binary snapshot"""
+        output_path = output_path or DEFAULT_INDEX_PATH
+        
+        index = InvertedIndex.build(self.prompts)
+        index.save(output_path)
+        write_snapshot(index, snapshot_path(output_path), self.prompts_dir)
+        
+        print(f"✓ Inverted index written to: {output_path}")
+    
+    def write_json_export(self, output_dir: Path = None, page_size: int = PAGE_SIZE):
+        """Write the static JSON API for web clients: a manifest, metadata shards and prompt bodies"""
+        output_dir = output_dir or DEFAULT_EXPORT_DIR
+        
+        export = JsonExport(output_dir, page_size)
+        reference_counts = self.reference_counts
+        
+        # One row per prompt, shared by its category and tag shards
+        rows: Dict[str, list] = {}
+        
+        def row(prompt: PromptMetadata) -> list:
+            key = os.path.normpath(prompt.filepath)
+            if key not in rows:
+                path = self.relative_path(prompt)
+                digest = self.store.stored_digest(path) if self.store is not None else None
+                rows[key] = [
+                    prompt.title, path.as_posix(), prompt.category, prompt.difficulty, prompt.models,
+                    prompt.tags, prompt.author, prompt.date_added, prompt.description, prompt.tokens,
+                    reference_counts.get(key, 0), export.add_body(path, digest)
+                ]
+            return rows[key]
         
-        print(f"✓ Generated index with {len(self.prompts)} prompts")
-        print(f"✓ Written to: {output_path}")
+        categories = [
+            {"name": category, "count": len(prompts), "shards": export.add_shards([row(p) for p in prompts])}
+            for category, prompts in self.group_by_category().items() if prompts
+        ]
+        # Sort by count, then alphabetically
+        tags = sorted(self.group_by_tag().items(), key=lambda item: (-len(item[1]), item[0]))
+        
+        difficulties: Dict[str, int] = {}
+        for prompt in self.prompts:
+            difficulties[prompt.difficulty] = difficulties.get(prompt.difficulty, 0) + 1
+        
+        written, total, removed = export.save({
+            "version": EXPORT_VERSION,
+            "total": len(self.prompts),
+            "fields": ROW_FIELDS,
+            "difficulties": difficulties,
+            "categories": categories,
+            "tags": [
+                {"name": tag, "count": len(prompts), "shards": export.add_shards([row(p) for p in prompts])}
+                for tag, prompts in tags
+            ],
+        })
+        
+        print(f"✓ JSON export with {len(self.prompts)} prompts in {total} files")
+        print(f"✓ {written} written, {total - written} unchanged, {removed} removed: {output_dir}")
+    
+    def update_search_index(
+        self,
+        index_path: Path = None,
+        changed: Optional[Set[str]] = None,
+        tree: Optional[str] = None,
+        documents: Optional[Dict[str, SearchDocument]] = None
+    ):
+        """Bring the full-text search index up to date with the prompts directory
+        
+        With changed (absolute paths) and tree (see collect_prompts), indexed
+        files outside it are not checked. documents holds the search terms of
+        prompts the caller already parsed, by absolute path (see SearchIndex.update).
+        """
+        index_path = index_path or DEFAULT_SEARCH_PATH
+        
+        search_index = SearchIndex(index_path)
+        updated = search_index.update(
+            find_prompt_files(self.prompts_dir), self.prompts_dir, changed, tree, documents
+        )
+        search_index.close()
+        
+        print(f"✓ Search index updated ({updated} changed prompts): {index_path}")
+
+
+def write_index_files(generator: IndexGenerator, output_path: Optional[Path], args: argparse.Namespace) -> int:
+    """Collect the prompts and write the index, inverted index and search index as args ask
+    
+    With --changed-since, only prompts changed since the git ref are checked
+    and re-extracted; returns 1 if git cannot list the changes.
+    """
+    changed = tree = None
+    if args.changed_since is not None:
+        try:
+            changes = changed_prompts(args.changed_since, generator.prompts_dir)
+        except ValueError as e:
+            print(f"Error: Cannot list changes since {args.changed_since}: {e}")
+            return 1
+        print(f"Prompts changed: {changes.summary()}")
+        changed, tree = changes.changed_keys, changes.tree
+    
+    generator.collect_prompts(changed, tree)
+    generator.write_index(output_path, collect=False, shard_dir=args.sharded, page_size=args.page_size)
+    generator.write_inverted_index(args.inverted_index)
+    generator.update_search_index(args.search_index, changed, tree)
+    if args.json_export is not None:
+        generator.write_json_export(args.json_export, args.page_size)
+    return 0
+
+
+def add_output_arguments(parser: argparse.ArgumentParser):
+    """Add the options shared by every command that writes the index"""
+    parser.add_argument(
+        "--sharded", nargs="?", type=Path, const=SHARD_DIR, metavar="DIR",
+        help=f"Write a small root index plus paginated category and tag pages under DIR (default: {SHARD_DIR})"
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=PAGE_SIZE,
+        help=f"Maximum prompts per page with --sharded (default: {PAGE_SIZE})"
+    )
+    parser.add_argument(
+        "--inverted-index", type=Path, default=DEFAULT_INDEX_PATH,
+        help=f"Where to write the prebuilt lookup index (default: {DEFAULT_INDEX_PATH})"
+    )
+    parser.add_argument(
+        "--search-index", type=Path, default=DEFAULT_SEARCH_PATH,
+        help=f"Where to keep the full-text search index (default: {DEFAULT_SEARCH_PATH})"
+    )
+    parser.add_argument(
+        "--json-export", nargs="?", type=Path, const=DEFAULT_EXPORT_DIR, metavar="DIR",
+        help=f"Also write a static JSON API for web clients under DIR (default: {DEFAULT_EXPORT_DIR})"
+    )
 
 
 def main():
     """Main entry point"""
-    generator = IndexGenerator()
-    generator.write_index()
+    parser = argparse.ArgumentParser(description="Generate the PromptHub INDEX.md.")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Keep extracted metadata on disk and only re-extract new or modified prompts"
+    )
+    parser.add_argument(
+        "--cache-dir", type=Path, default=CACHE_DIR,
+        help=f"Directory for the metadata store (default: {CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--changed-since", metavar="REF",
+        help="Only re-extract prompts changed since this git ref (implies --incremental)"
+    )
+    add_output_arguments(parser)
+    add_loader_arguments(parser)
+    args = parser.parse_args()
+    set_read_ahead(args.read_ahead)
+    
+    if args.incremental or args.changed_since is not None:
+        generator = IndexGenerator.with_metadata_store(cache_dir=args.cache_dir)
+    else:
+        generator = IndexGenerator()
+    sys.exit(write_index_files(generator, None, args))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+"""
+PromptHub Git Changes
+
+Lists the prompts added, modified, renamed and deleted since a git ref, for
+the --changed-since mode of validation and indexing.
+
+Changes come from `git diff --name-status -M <ref>`, which compares the ref
+with the working tree, plus untracked files that are not ignored. Files outside the diff are assumed to be unchanged, so
+their cached validation results, signatures and index metadata are used
+without reading or even stat-ing them; only the changed prompts (and, for the
+corpus-level checks, the prompts around them) are read.
+
+That is only sound for a cache recorded from the ref's own tree: a cache
+restored from another commit (as CI does through restore-keys) holds values
+for other content. Caches therefore record the git tree id of the prompts
+directory they were last brought up to date with (see worktree_tree), and
+a cache recorded from another tree than the ref's is checked file by file
+as usual.
+
+Usage:
+    python scripts/prompthub.py validate prompts/ --changed-since origin/main
+    python scripts/prompthub.py index --changed-since HEAD~1
+"""
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+from lazy import lazy_import
+from prompt_loader import SKIPPED_FILES
+
+subprocess = lazy_import("subprocess")
+
+
+@dataclass
+class PromptChanges:
+    """Prompt files changed since a ref, as paths relative to the working directory"""
+    ref: str
+    added: List[Path] = field(default_factory=list)
+    modified: List[Path] = field(default_factory=list)
+    deleted: List[Path] = field(default_factory=list)
+    # (old path, new path)
+    renamed: List[Tuple[Path, Path]] = field(default_factory=list)
+    # Git tree id of the prompts directory at ref; caches recorded from another tree are not trusted
+    tree: Optional[str] = None
+
+    @property
+    def changed(self) -> List[Path]:
+        """Files whose current content needs validating and indexing"""
+        return self.added + self.modified + [new for _, new in self.renamed]
+
+    @property
+    def removed(self) -> List[Path]:
+        """Paths that no longer hold the prompt they held at the ref"""
+        return self.deleted + [old for old, _ in self.renamed]
+
+    @property
+    def changed_keys(self) -> Set[str]:
+        """Absolute paths of the changed files, as used for cache keys"""
+        return {os.path.abspath(path) for path in self.changed}
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.modified)} modified, "
+            f"{len(self.renamed)} renamed, {len(self.deleted)} deleted since {self.ref}"
+        )
+
+
+def is_prompt_path(path: Path, prompts_dir: Path) -> bool:
+    """Whether a path is a prompt file under prompts_dir, as find_prompt_files would list it"""
+    root = os.path.abspath(prompts_dir)
+    return (
+        path.suffix == ".md"
+        and path.name.upper() not in SKIPPED_FILES
+        and os.path.abspath(path).startswith(root.rstrip(os.sep) + os.sep)
+    )
+
+
+def run_git(directory: Path, *args: str) -> str:
+    """Run a git command in directory and return its output; raises ValueError if it fails"""
+    try:
+        process = subprocess.run(
+            ["git", *args], cwd=directory, capture_output=True, text=True, encoding='utf-8'
+        )
+    except OSError as e:
+        raise ValueError(f"Cannot run git: {e}")
+    if process.returncode != 0:
+        raise ValueError(process.stderr.strip() or f"git {args[0]} failed")
+    return process.stdout
+
+
+def worktree_tree(prompts_dir: Path) -> Optional[str]:
+    """Return the git tree id of prompts_dir if its files match HEAD exactly
+
+    Returns None if anything under it is modified or untracked, or if it is
+    not in a git repository: the files then match no tree a ref can name.
+    """
+    try:
+        if run_git(prompts_dir, "status", "--porcelain", "-z", "--untracked-files=all", "--", "."):
+            return None
+        return run_git(prompts_dir, "rev-parse", "HEAD:./").strip()
+    except ValueError:
+        return None
+
+
+def add_name_status(changes: PromptChanges, output: str, toplevel: str, prompts_dir: Path):
+    """Sort the prompts in `git diff --name-status -z -M` output into changes
+
+    Names in the output are relative to toplevel (the repository root).
+    """
+    def local(name: str) -> Path:
+        return Path(os.path.relpath(os.path.join(toplevel, name)))
+
+    fields = output.split("\0")
+    position = 0
+    while position < len(fields) and fields[position]:
+        status = fields[position]
+        if status[0] in "RC":
+            old, new = local(fields[position + 1]), local(fields[position + 2])
+            position += 3
+            old_is_prompt, new_is_prompt = is_prompt_path(old, prompts_dir), is_prompt_path(new, prompts_dir)
+            if status[0] == "R" and old_is_prompt and new_is_prompt:
+                changes.renamed.append((old, new))
+            else:
+                # Copies, and renames into or out of the prompts, are an add and/or a delete
+                if new_is_prompt:
+                    changes.added.append(new)
+                if status[0] == "R" and old_is_prompt:
+                    changes.deleted.append(old)
+            continue
+
+        path = local(fields[position + 1])
+        position += 2
+        if not is_prompt_path(path, prompts_dir):
+            continue
+        if status == "A":
+            changes.added.append(path)
+        elif status == "D":
+            changes.deleted.append(path)
+        else:
+            # M, T (type change) and U (unmerged) all mean the content needs another look
+            changes.modified.append(path)
+
+
+def changed_prompts(ref: str, prompts_dir: Path) -> PromptChanges:
+    """Compare ref with the working tree and return the prompt files that changed
+
+    Raises ValueError when git cannot produce the diff (not a repository, unknown ref).
+    """
+    def git(*args: str) -> str:
+        return run_git(prompts_dir, *args)
+
+    toplevel = git("rev-parse", "--show-toplevel").strip()
+    changes = PromptChanges(ref)
+    # -z keeps unusual file names intact; "--" stops a ref from being read as a path
+    add_name_status(changes, git("diff", "--name-status", "-z", "-M", ref, "--", "."), toplevel, prompts_dir)
+    try:
+        changes.tree = git("rev-parse", f"{ref}:./").strip()
+    except ValueError:
+        # The prompts directory does not exist at ref; nothing was recorded from it
+        pass
+
+    # New prompts that were not added to git yet
+    for name in git("ls-files", "-z", "--others", "--exclude-standard", "--full-name", "--", ".").split("\0"):
+        path = Path(os.path.relpath(os.path.join(toplevel, name)))
+        if name and is_prompt_path(path, prompts_dir):
+            changes.added.append(path)
+    return changes
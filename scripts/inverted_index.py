@@ -0,0 +1,144 @@
+"""
+PromptHub Inverted Index
+
+Prebuilt lookup index written alongside INDEX.md. It holds one compact row per
+prompt plus posting lists (lists of row ids) for every tag, category,
+difficulty, model and author. Rows are ordered newest first, so every posting
+list is already sorted by date and queries only need to intersect lists; no
+prompt file is opened at query time.
+
+A binary snapshot written next to the index (see catalog_snapshot) serves the
+same queries without parsing the JSON.
+
+Usage:
+    from inverted_index import InvertedIndex
+
+    index = InvertedIndex.load(Path(".prompthub-cache/inverted-index.json"))
+    index.query(tag=["python"], difficulty=["Advanced"])
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from file_cache import CACHE_DIR
+from lazy import lazy_pattern
+
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = CACHE_DIR / "inverted-index.json"
+
+# Columns of each document row, in order
+DOC_FIELDS = ["title", "path", "category", "difficulty", "models", "author", "date_added", "description"]
+
+# Fields with posting lists
+FILTER_FIELDS = ["tag", "category", "difficulty", "model", "author"]
+
+LIST_SEPARATOR = lazy_pattern(r'\s*[,|/]\s*')
+
+
+def normalize_term(value: str) -> str:
+    """Normalize a field value or query term for matching"""
+    return value.strip().lstrip("#@").lower()
+
+
+def split_values(value: str) -> List[str]:
+    """Split a free-form list field such as 'Claude, GPT-4, Gemini'"""
+    return [part for part in LIST_SEPARATOR.split(value) if part.strip()]
+
+
+def document_terms(prompt) -> Dict[str, List[str]]:
+    """Return the normalized terms a prompt is filed under, per filter field"""
+    return {
+        "tag": [normalize_term(tag) for tag in prompt.tags],
+        "category": [normalize_term(cat) for cat in split_values(prompt.category)],
+        "difficulty": [normalize_term(prompt.difficulty)],
+        "model": [normalize_term(model) for model in split_values(prompt.models)],
+        "author": [normalize_term(prompt.author)],
+    }
+
+
+class InvertedIndex:
+    """Posting lists over prompt metadata, queried without reading prompt files"""
+
+    def __init__(self, docs: List[list], postings: Dict[str, Dict[str, List[int]]]):
+        self.docs = docs
+        self.postings = postings
+
+    @classmethod
+    def build(cls, prompts: list) -> "InvertedIndex":
+        """Build the index from PromptMetadata records"""
+        # Newest first; undated prompts go last, ties broken by title
+        ordered = sorted(prompts, key=lambda p: p.title.lower())
+        ordered.sort(
+            key=lambda p: p.date_added if p.date_added != "Unknown" else "",
+            reverse=True
+        )
+
+        docs = []
+        postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in FILTER_FIELDS}
+        for doc_id, prompt in enumerate(ordered):
+            docs.append([
+                prompt.title,
+                prompt.filepath.as_posix(),
+                prompt.category,
+                prompt.difficulty,
+                prompt.models,
+                prompt.author,
+                prompt.date_added,
+                prompt.description,
+            ])
+            for field, terms in document_terms(prompt).items():
+                field_postings = postings[field]
+                for term in dict.fromkeys(terms):
+                    field_postings.setdefault(term, []).append(doc_id)
+
+        return cls(docs, postings)
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_INDEX_PATH) -> "InvertedIndex":
+        """Load a prebuilt index"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported inverted index version in {path}; regenerate the index")
+        return cls(data["docs"], data["postings"])
+
+    def save(self, path: Path = DEFAULT_INDEX_PATH):
+        """Write the index as compact JSON"""
+        data = {
+            "version": INDEX_VERSION,
+            "fields": DOC_FIELDS,
+            "docs": self.docs,
+            "postings": self.postings,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def query_ids(self, **filters: List[str]) -> List[int]:
+        """Return the ids of documents matching every filter term, newest first"""
+        lists = []
+        for field, terms in filters.items():
+            if field not in self.postings:
+                raise ValueError(f"Unknown filter: {field}. Must be one of: {', '.join(FILTER_FIELDS)}")
+            for term in terms or []:
+                lists.append(self.postings[field].get(normalize_term(term), []))
+
+        if not lists:
+            return list(range(len(self.docs)))
+
+        # Walk the shortest list and probe the others; order is preserved
+        lists.sort(key=len)
+        others = [set(ids) for ids in lists[1:]]
+        return [doc_id for doc_id in lists[0] if all(doc_id in ids for ids in others)]
+
+    def query(self, limit: Optional[int] = None, **filters: List[str]) -> List[Dict[str, str]]:
+        """Return matching documents as dicts, newest first"""
+        ids = self.query_ids(**filters)
+        if limit is not None:
+            ids = ids[:limit]
+        return [dict(zip(DOC_FIELDS, self.docs[doc_id])) for doc_id in ids]
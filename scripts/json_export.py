@@ -0,0 +1,169 @@
+"""
+PromptHub JSON Export
+
+Static JSON API over the catalog for web clients, so a prompt browser does not
+have to download and parse all of INDEX.md. A client loads the small manifest
+first, then only the shards and prompt bodies it shows:
+
+    manifest.json         totals, row fields, and per category and tag the count and shard files
+    shards/<hash>.json    metadata rows of up to --page-size prompts of one category or tag
+    prompts/<hash>.json   one prompt's full markdown and the text of its code block
+
+Shard and prompt files are named after a hash of their content, so clients and
+CDNs can cache them forever and a run only writes the ones that changed; files
+the manifest no longer references are removed. Prompt files are named after
+the source file's content hash, which the metadata store already keeps, so
+unchanged prompts are not even read. Every file gets a gzip copy (.gz) and,
+when the brotli module is installed, a brotli copy (.br), for web servers that
+serve precompressed files.
+
+Usage:
+    python scripts/prompthub.py index --incremental --json-export api/
+    python scripts/generate_index.py --incremental --json-export
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from file_cache import content_hash
+from lazy import lazy_import
+from prompt_parser import parse_prompt
+
+gzip = lazy_import("gzip")
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip copies are written without it
+    brotli = None
+
+
+EXPORT_VERSION = 1
+DEFAULT_EXPORT_DIR = Path("api")
+
+# Columns of each shard row, in order; "body" is the prompt file to fetch for the full text
+ROW_FIELDS = [
+    "title", "path", "category", "difficulty", "models", "tags", "author", "date_added",
+    "description", "tokens", "referenced_by", "body"
+]
+
+# Suffix -> compressor for the precompressed copies of every file
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    # mtime=0 keeps the output identical for identical input
+    ".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+}
+if brotli is not None:
+    COMPRESSORS[".br"] = lambda data: brotli.compress(data, quality=11)
+
+
+def encode(value) -> bytes:
+    """Serialize to compact UTF-8 JSON"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def is_written(path: Path) -> bool:
+    """Whether a file and all of its compressed copies exist"""
+    return path.exists() and all(path.with_name(path.name + suffix).exists() for suffix in COMPRESSORS)
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write a file so readers never see it half-written"""
+    tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_precompressed(path: Path, data: bytes, content_addressed: bool = False) -> bool:
+    """Write data and its compressed copies unless they are already on disk
+
+    Content-addressed files are only checked for existence; other files are
+    compared byte for byte. The plain file is written last, so its presence
+    means the copies are complete.
+    """
+    if is_written(path):
+        if content_addressed:
+            return False
+        try:
+            if path.read_bytes() == data:
+                return False
+        except OSError:
+            pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for suffix, compress in COMPRESSORS.items():
+        atomic_write(path.with_name(path.name + suffix), compress(data))
+    atomic_write(path, data)
+    return True
+
+
+class JsonExport:
+    """Builds the files of a JSON export and writes the ones that changed"""
+
+    def __init__(self, output_dir: Path = DEFAULT_EXPORT_DIR, page_size: int = 100):
+        self.output_dir = output_dir
+        self.page_size = page_size
+        # Path relative to output_dir -> content, for content-addressed files built in this run
+        self.files: Dict[str, bytes] = {}
+        # Content-addressed prompt files referenced by this run, whether built or already on disk
+        self.bodies: Dict[str, None] = {}
+
+    def add_body(self, filepath: Path, digest: Optional[str] = None) -> str:
+        """Add the prompt file for a source file and return its path in the export
+
+        digest is the source file's content hash if already known (see
+        FileCache.stored_digest); without it the file is read to hash it.
+        """
+        data = None
+        if digest is None:
+            data = filepath.read_bytes()
+            digest = content_hash(data)
+        name = f"prompts/{content_hash(f'{EXPORT_VERSION}:{digest}'.encode())}.json"
+        self.bodies[name] = None
+        if name in self.files or is_written(self.output_dir / name):
+            return name
+
+        if data is None:
+            data = filepath.read_bytes()
+        markdown = data.decode('utf-8', errors='replace')
+        parsed = parse_prompt(markdown)
+        blocks = parsed.code_blocks_in("## The Prompt")
+        self.files[name] = encode({
+            "title": parsed.title or filepath.stem,
+            "path": filepath.as_posix(),
+            "prompt": blocks[0].text if blocks else None,
+            "markdown": markdown,
+        })
+        return name
+
+    def add_shards(self, rows: List[list]) -> List[str]:
+        """Split rows into pages of page_size and return the shard paths, in order"""
+        names = []
+        for start in range(0, len(rows), self.page_size):
+            data = encode({"version": EXPORT_VERSION, "rows": rows[start:start + self.page_size]})
+            name = f"shards/{content_hash(data)}.json"
+            self.files[name] = data
+            names.append(name)
+        return names
+
+    def save(self, manifest: dict) -> Tuple[int, int, int]:
+        """Write new files and the manifest, remove unreferenced ones; return (written, total, removed)"""
+        written = sum(
+            write_precompressed(self.output_dir / name, data, content_addressed=True)
+            for name, data in self.files.items()
+        )
+        written += write_precompressed(self.output_dir / "manifest.json", encode(manifest))
+
+        referenced = set(self.files) | set(self.bodies)
+        removed = 0
+        for directory in ("shards", "prompts"):
+            for path in sorted((self.output_dir / directory).glob("*")):
+                name = path.relative_to(self.output_dir).as_posix()
+                for suffix in COMPRESSORS:
+                    if name.endswith(suffix):
+                        name = name[:-len(suffix)]
+                if name not in referenced:
+                    path.unlink()
+                    removed += path.suffix == ".json"
+        return written, len(referenced) + 1, removed
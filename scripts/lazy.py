@@ -0,0 +1,69 @@
+"""
+PromptHub Lazy Loading
+
+Defers work that only some commands need. Editors and pre-commit hooks run
+the small commands (single-file validation, tag lookups) constantly, and for
+those the time goes to interpreter startup, imports and regex compilation
+rather than to the work itself.
+
+Modules imported with lazy_import are only loaded on first attribute access,
+so a command that never opens a SQLite database or a process pool never pays
+for importing sqlite3 or multiprocessing. Patterns created with lazy_pattern
+are compiled on first use.
+
+Usage:
+    sqlite3 = lazy_import("sqlite3")
+    ITEM_PATTERN = lazy_pattern(r'^- (.*)', re.MULTILINE)
+"""
+
+import importlib.util
+import re
+import sys
+from types import ModuleType
+from typing import Optional, Pattern
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return the module, to be imported on first attribute access"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition(".")
+    if parent:
+        # As the import system would, so "import a.b" elsewhere still finds a.b
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+class LazyPattern:
+    """A regular expression compiled the first time one of its methods is used"""
+
+    def __init__(self, pattern: str, flags: int = 0):
+        self.pattern = pattern
+        self.flags = flags
+        self._compiled: Optional[Pattern] = None
+
+    @property
+    def compiled(self) -> Pattern:
+        if self._compiled is None:
+            self._compiled = re.compile(self.pattern, self.flags)
+        return self._compiled
+
+    def __getattr__(self, name: str):
+        # Special methods are looked up while pickling, before __init__ state exists
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.compiled, name)
+
+
+def lazy_pattern(pattern: str, flags: int = 0) -> LazyPattern:
+    """Drop-in replacement for a module-level re.compile"""
+    return LazyPattern(pattern, flags)
@@ -0,0 +1,232 @@
+"""
+PromptHub Near-Duplicate Detection
+
+Corpus-level check that finds prompts whose "The Prompt" code blocks are
+near-copies of each other.
+
+Each code block is reduced to a MinHash signature of its word shingles, using
+one-permutation hashing with densification so a signature costs a single hash
+per shingle. Signatures are split into locality-sensitive hashing bands, and
+only prompts that share a band bucket are compared, so the check scales
+roughly linearly with the number of prompts instead of comparing every pair.
+Signatures are cached per file and content hash, so unchanged prompts are not
+re-read, and `prompthub.py all` hands over the signatures of the prompts its
+own scan parsed. When the changed files are known (--changed-since), the others use
+their cached signatures without being checked, and only pairs involving a
+changed file are reported.
+"""
+
+import hashlib
+import os
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from file_cache import CACHE_DIR, FileCache, fingerprint
+from lazy import lazy_pattern
+from prompt_loader import map_prompts
+from prompt_parser import ParsedPrompt
+
+
+NUM_PERM = 128
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+
+# How many near-duplicates to name in a single warning
+MAX_LISTED = 5
+
+WORD_PATTERN = lazy_pattern(r'\w+')
+BIN_BITS = NUM_PERM.bit_length() - 1
+EMPTY_BIN = (1 << 64) - 1
+
+
+def prompt_text(parsed: ParsedPrompt) -> str:
+    """Return the text of the prompt's code block"""
+    blocks = parsed.code_blocks_in("## The Prompt")
+    return blocks[0].text if blocks else ""
+
+
+def minhash(text: str) -> Optional[array]:
+    """Compute the MinHash signature of the text's word shingles (None for empty text)"""
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return None
+
+    size = min(SHINGLE_SIZE, len(words))
+    signature = array('Q', [EMPTY_BIN]) * NUM_PERM
+    for i in range(len(words) - size + 1):
+        shingle = " ".join(words[i:i + size]).encode('utf-8')
+        value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), 'little')
+        # One-permutation hashing: the low bits pick the bin, the rest is the hash value
+        bin_index = value & (NUM_PERM - 1)
+        value >>= BIN_BITS
+        if value < signature[bin_index]:
+            signature[bin_index] = value
+
+    # Densify: empty bins borrow from the next non-empty bin to the right,
+    # offset by the distance so borrowed values stay distinguishable
+    if EMPTY_BIN in signature:
+        dense = array('Q', signature)
+        for i in range(NUM_PERM):
+            if signature[i] == EMPTY_BIN:
+                distance = 1
+                while signature[(i + distance) % NUM_PERM] == EMPTY_BIN:
+                    distance += 1
+                dense[i] = signature[(i + distance) % NUM_PERM] + (distance << (64 - BIN_BITS))
+        signature = dense
+    return signature
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimate the Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def choose_bands(threshold: float) -> Tuple[int, int]:
+    """Pick (bands, rows) so candidate pairs start just below the Jaccard threshold"""
+    best = (NUM_PERM, 1)
+    for rows in range(1, NUM_PERM + 1):
+        if NUM_PERM % rows:
+            continue
+        bands = NUM_PERM // rows
+        # Similarity at which a pair has a 50% chance of sharing a bucket
+        if (1 / bands) ** (1 / rows) <= threshold * 0.9:
+            best = (bands, rows)
+    return best
+
+
+def signature_for_file(filepath: Path, parsed: Optional[ParsedPrompt]) -> Tuple[str, bytes]:
+    """Return the file's path and signature as bytes (empty if it has no prompt text or could not be read)"""
+    signature = minhash(prompt_text(parsed)) if parsed is not None else None
+    return str(filepath), signature.tobytes() if signature is not None else b""
+
+
+def open_signature_cache(cache_dir: Path = CACHE_DIR) -> FileCache:
+    """Load the on-disk cache of MinHash signatures"""
+    scripts_dir = Path(__file__).resolve().parent
+    return FileCache(
+        cache_dir / "minhash.pickle",
+        fingerprint(NUM_PERM, SHINGLE_SIZE, scripts_dir / "near_duplicates.py", scripts_dir / "prompt_parser.py")
+    ).load()
+
+
+def load_signatures(
+    filepaths: List[Path],
+    jobs: int = 1,
+    cache: Optional[FileCache] = None,
+    changed: Optional[Set[str]] = None,
+    known: Optional[Dict[str, bytes]] = None
+) -> Dict[str, array]:
+    """Compute (or fetch from the cache) the signature of every file
+
+    Files whose absolute path is not in changed are taken from the cache
+    unchecked, if it was recorded from the diff's ref (see FileCache.expect_tree).
+    known maps paths to signatures (as from signature_for_file) already
+    computed from a parse in this run; those files are not parsed again.
+    """
+    raw: Dict[str, bytes] = {}
+    pending = {}
+    for filepath in filepaths:
+        if known is not None and str(filepath) in known:
+            data = raw[str(filepath)] = known[str(filepath)]
+            if cache is not None:
+                cached, state = cache.lookup(filepath)
+                if cached != data:
+                    cache.store(state, data)
+            continue
+        if cache is None:
+            pending[str(filepath)] = None
+            continue
+        if changed is not None and cache.key_for(filepath) not in changed:
+            cached = cache.cached(filepath)
+            if cached is not None:
+                raw[str(filepath)] = cached
+                continue
+        cached, state = cache.lookup(filepath)
+        if cached is None:
+            pending[str(filepath)] = state
+        else:
+            raw[str(filepath)] = cached
+
+    for path, data in map_prompts(signature_for_file, [Path(p) for p in pending], jobs):
+        raw[path] = data
+        if cache is not None:
+            cache.store(pending[path], data)
+
+    signatures = {}
+    for path, data in raw.items():
+        if data:
+            signature = array('Q')
+            signature.frombytes(data)
+            signatures[path] = signature
+    return signatures
+
+
+def find_near_duplicates(
+    signatures: Dict[str, array], threshold: float = DEFAULT_THRESHOLD, involving: Optional[Set[str]] = None
+) -> Iterator[Tuple[str, str, float]]:
+    """Yield (path, other path, similarity) for pairs at or above the threshold
+
+    With involving, only pairs that include one of those paths are compared.
+    """
+    bands, rows = choose_bands(threshold)
+    paths = sorted(signatures)
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    for index, path in enumerate(paths):
+        data = signatures[path].tobytes()
+        width = rows * 8
+        for band in range(bands):
+            buckets.setdefault((band, data[band * width:(band + 1) * width]), []).append(index)
+
+    wanted = None
+    if involving is not None:
+        wanted = {index for index, path in enumerate(paths) if path in involving}
+
+    compared = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        if wanted is not None and wanted.isdisjoint(members):
+            continue
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                if wanted is not None and first not in wanted and second not in wanted:
+                    continue
+                if (first, second) in compared:
+                    continue
+                compared.add((first, second))
+                score = similarity(signatures[paths[first]], signatures[paths[second]])
+                if score >= threshold:
+                    yield paths[first], paths[second], score
+
+
+def duplicate_warnings(
+    filepaths: List[Path],
+    threshold: float = DEFAULT_THRESHOLD,
+    jobs: int = 1,
+    cache: Optional[FileCache] = None,
+    changed: Optional[Set[str]] = None,
+    known: Optional[Dict[str, bytes]] = None
+) -> Dict[str, List[str]]:
+    """Return near-duplicate warnings keyed by file path
+
+    With changed (absolute paths), only pairs involving a changed file are
+    reported. known is passed on to load_signatures.
+    """
+    signatures = load_signatures(filepaths, jobs, cache, changed, known)
+    involving = None
+    if changed is not None:
+        involving = {path for path in signatures if os.path.abspath(path) in changed}
+    matches: Dict[str, List[Tuple[float, str]]] = {}
+    for first, second, score in find_near_duplicates(signatures, threshold, involving):
+        matches.setdefault(first, []).append((score, second))
+        matches.setdefault(second, []).append((score, first))
+    
+    warnings: Dict[str, List[str]] = {}
+    for path, others in matches.items():
+        others.sort(key=lambda match: (-match[0], match[1]))
+        listed = ", ".join(f"{other} ({score:.0%})" for score, other in others[:MAX_LISTED])
+        if len(others) > MAX_LISTED:
+            listed += f" and {len(others) - MAX_LISTED} more"
+        warnings[path] = [f"Prompt is a near-duplicate of {listed}"]
+    return warnings
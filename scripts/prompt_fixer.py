@@ -0,0 +1,318 @@
+"""
+PromptHub Prompt Fixer
+
+Fixes the validation errors that need no judgement, so legacy prompts can be
+brought up to the template in one run:
+
+- a missing **Date Added** or **Version** metadata field, taken from the
+  earliest date and the highest version in the Version History section
+  (today's date and 1.0 if it has none)
+- missing required sections, added empty in template order
+- Category and Difficulty values left in brackets, e.g. "[Coding]"
+- filenames that are not kebab-case
+
+Each fix is a span edit located through the parsed section structure, so the
+rest of the file, including its line endings, is left byte for byte as it
+was. Files are fixed in parallel and only written, atomically, when they
+change. Renames happen afterwards in this process, one at a time, and never
+replace an existing file.
+
+Usage:
+    python scripts/validate_prompt.py prompts/ --fix --jobs 0
+    python scripts/prompthub.py validate prompts/ --fix
+"""
+
+import functools
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from lazy import lazy_pattern
+from prompt_loader import map_files
+from prompt_parser import ParsedPrompt, parse_prompt
+from validation_rules import RuleSet
+
+
+# (start, end, replacement) in the original content
+Edit = Tuple[int, int, str]
+
+WORD_PATTERN = lazy_pattern(r'[a-z0-9]+')
+CAMEL_BOUNDARY = lazy_pattern(r'(?<=[a-z0-9])(?=[A-Z])')
+DATE_PATTERN = lazy_pattern(r'\b(\d{4}-\d{2}-\d{2})\b')
+HISTORY_VERSION_PATTERN = lazy_pattern(r'^#+[ \t]*v?(\d+)\.(\d+)\b', re.MULTILINE)
+
+DEFAULT_VERSION = "1.0"
+
+# Metadata fields whose values are checked against a list in the rules
+LISTED_FIELDS = ["Category", "Difficulty"]
+
+# Metadata fields filled in when missing, from history_defaults
+FILLED_FIELDS = ["Date Added", "Version"]
+
+
+@dataclass
+class FixResult:
+    """The fixes applied to one prompt file"""
+    filepath: str
+    fixes: List[str] = field(default_factory=list)
+    # Kebab-case name the file should be renamed to, if it is not already
+    rename_to: Optional[str] = None
+    renamed: bool = False
+    error: Optional[str] = None
+
+    @property
+    def path(self) -> Path:
+        """Where the file is now"""
+        if self.renamed:
+            return Path(self.filepath).with_name(self.rename_to)
+        return Path(self.filepath)
+
+
+def kebab_case(name: str) -> str:
+    """Convert a filename stem to kebab-case ("" if nothing usable is left)"""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return "-".join(WORD_PATTERN.findall(CAMEL_BOUNDARY.sub("-", name).lower()))
+
+
+def apply_edits(content: str, edits: Iterable[Edit]) -> str:
+    """Apply non-overlapping span edits; insertions at the same position keep their order"""
+    pieces = []
+    position = 0
+    for start, end, text in sorted(edits, key=lambda edit: edit[0]):
+        pieces.append(content[position:start])
+        pieces.append(text)
+        position = end
+    pieces.append(content[position:])
+    return "".join(pieces)
+
+
+def history_defaults(parsed: ParsedPrompt) -> Tuple[str, str]:
+    """Return the (date added, version) implied by the Version History section"""
+    history = parsed.section_body("## Version History") or ""
+    dates = DATE_PATTERN.findall(history)
+    versions = [(int(major), int(minor)) for major, minor in HISTORY_VERSION_PATTERN.findall(history)]
+    date_added = min(dates) if dates else date.today().isoformat()
+    version = "%d.%d" % max(versions) if versions else DEFAULT_VERSION
+    return date_added, version
+
+
+def metadata_line_prefix(content: str, value_start: int) -> str:
+    """The list marker before the bold field name on a metadata line, e.g. '- '"""
+    line_start = content.rfind("\n", 0, value_start) + 1
+    marker = content.find("**", line_start, value_start)
+    return content[line_start:marker] if marker >= 0 else "- "
+
+
+def metadata_edits(
+    content: str, parsed: ParsedPrompt, rules: RuleSet, newline: str, fixes: List[str]
+) -> Tuple[List[Edit], List[str]]:
+    """Edits for the metadata fields; returns them and the lines of missing fields with no section to go in"""
+    edits: List[Edit] = []
+
+    for name in LISTED_FIELDS:
+        value = parsed.metadata.get(name)
+        if not value or ("[" not in value and "]" not in value):
+            continue
+        valid = rules.valid_categories if name == "Category" else rules.valid_difficulties
+        unbracketed = re.sub(r'[\[\]]', '', value).strip()
+        # Only a single valid value is unambiguous; template text like "[Coding | Writing]" is left alone
+        for candidate in valid:
+            if candidate.lower() == unbracketed.lower():
+                start, end = parsed.metadata_spans[name]
+                edits.append((start, end, candidate))
+                fixes.append(f"{name}: {value} -> {candidate}")
+                break
+
+    missing = [
+        name for name in rules.required_metadata
+        if name in FILLED_FIELDS and name not in parsed.metadata
+    ]
+    if not missing:
+        return edits, []
+    defaults = dict(zip(FILLED_FIELDS, history_defaults(parsed)))
+
+    section = parsed.sections.get("## Metadata")
+    if section is None and "## Metadata" not in (name.strip() for name in rules.required_sections):
+        # Nowhere to put the fields without guessing
+        return edits, []
+    spans = [
+        span for span in parsed.metadata_spans.values()
+        if section is not None and section.body_start <= span[0] < section.body_end
+    ]
+    prefix = metadata_line_prefix(content, max(spans)[0]) if spans else "- "
+    lines = [f"{prefix}**{name}**: {defaults[name]}{newline}" for name in missing]
+    fixes.extend(f"Added **{name}**: {defaults[name]}" for name in missing)
+    if section is None:
+        return edits, lines
+
+    if spans:
+        # After the line holding the last field in the section
+        line_end = content.find("\n", max(spans)[1])
+        position = len(content) if line_end < 0 else line_end + 1
+    else:
+        position = section.body_start
+    separator = newline if position and not content[:position].endswith("\n") else ""
+    edits.append((position, position, separator + "".join(lines)))
+    return edits, []
+
+
+def section_edits(
+    content: str, parsed: ParsedPrompt, rules: RuleSet, filepath: Path, newline: str,
+    metadata_lines: List[str], fixes: List[str]
+) -> List[Edit]:
+    """Edits adding each missing required section before the next required section present"""
+    edits: List[Edit] = []
+    required = [name.strip() or "#" for name in rules.required_sections]
+    at_end = False
+    for index, name in enumerate(required):
+        if parsed.has_section(name):
+            continue
+
+        if name == "#":
+            title = " ".join(word.capitalize() for word in kebab_case(filepath.stem).split("-")) or filepath.stem
+            text = f"# {title}{newline}" + ("" if content.startswith(("\n", "\r\n")) else newline)
+            fixes.append(f"Added title: # {title}")
+        else:
+            body = "".join(metadata_lines) if name == "## Metadata" else ""
+            text = f"{name}{newline}{body}{newline}"
+            fixes.append(f"Added section: {name}")
+
+        following = [
+            parsed.sections[later] for later in required[index + 1:]
+            if later != "#" and later in parsed.sections
+        ]
+        if name == "#":
+            position = 0
+        elif following:
+            position = min(section.heading_start for section in following)
+        else:
+            position = len(content)
+            if not at_end and content.strip():
+                # Leave one blank line between the end of the file and the new sections
+                trailing = len(content) - len(content.rstrip("\r\n"))
+                text = newline * max(0, 2 - content.count("\n", len(content) - trailing)) + text
+            at_end = True
+        edits.append((position, position, text))
+    return edits
+
+
+def fix_content(content: str, filepath: Path, rules: RuleSet) -> Tuple[str, List[str]]:
+    """Return the fixed content of a prompt file and a description of each fix"""
+    parsed = parse_prompt(content)
+    newline = "\r\n" if "\r\n" in content else "\n"
+    fixes: List[str] = []
+    edits, metadata_lines = metadata_edits(content, parsed, rules, newline, fixes)
+    edits += section_edits(content, parsed, rules, filepath, newline, metadata_lines, fixes)
+    return apply_edits(content, edits), fixes
+
+
+def write_atomic(path: Path, data: bytes):
+    """Replace a file's content so readers never see it half-written, keeping its permissions"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+    os.replace(tmp_path, path)
+
+
+def fix_file(filepath: Path, rules: RuleSet) -> FixResult:
+    """Fix one prompt file in place (module-level so worker processes can run it)"""
+    result = FixResult(str(filepath))
+    try:
+        data = filepath.read_bytes()
+        content = data.decode('utf-8')
+    except (OSError, UnicodeDecodeError) as e:
+        result.error = f"Could not read file: {e}"
+        return result
+
+    fixed, result.fixes = fix_content(content, filepath, rules)
+    if fixed != content:
+        try:
+            write_atomic(filepath, fixed.encode('utf-8'))
+        except OSError as e:
+            result.fixes = []
+            result.error = f"Could not write file: {e}"
+            return result
+
+    name = kebab_case(filepath.stem)
+    if name and name != filepath.stem:
+        result.rename_to = name + filepath.suffix
+    return result
+
+
+def move_exclusive(source: Path, target: Path):
+    """Rename source to target; raises FileExistsError instead of replacing a file"""
+    try:
+        # link() refuses an existing target, so there is no gap between checking and renaming
+        os.link(source, target)
+    except FileExistsError:
+        raise
+    except OSError:
+        # No hard links on this file system: claim the name first, then move over the claim
+        os.close(os.open(target, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        try:
+            os.replace(source, target)
+        except OSError:
+            os.unlink(target)
+            raise
+        return
+    try:
+        os.unlink(source)
+    except OSError:
+        os.unlink(target)
+        raise
+
+
+def rename_prompt(result: FixResult) -> bool:
+    """Rename a fixed file to its kebab-case name unless the name is taken; return whether it was renamed"""
+    source = Path(result.filepath)
+    target = source.with_name(result.rename_to)
+    try:
+        # A name differing only in case is the same file on case-insensitive file systems
+        if target.exists() and os.path.samefile(source, target):
+            os.rename(source, target)
+        else:
+            move_exclusive(source, target)
+    except FileExistsError:
+        result.error = f"Cannot rename to {target.name}: a file with that name exists"
+        return False
+    except OSError as e:
+        result.error = f"Could not rename to {target.name}: {e}"
+        return False
+    result.renamed = True
+    result.fixes.append(f"Renamed to {target.name}")
+    return True
+
+
+def fix_prompts(filepaths: List[Path], rules: RuleSet, jobs: int = 1) -> List[FixResult]:
+    """Fix prompt files in parallel, then rename the ones that need it; return the results in input order"""
+    order = {str(filepath): index for index, filepath in enumerate(filepaths)}
+    results = sorted(
+        map_files(functools.partial(fix_file, rules=rules), filepaths, jobs),
+        key=lambda result: order[result.filepath]
+    )
+    # Serially, so two files that map to the same name cannot both take it
+    for result in results:
+        if result.rename_to is not None and result.error is None:
+            rename_prompt(result)
+    return results
+
+
+def print_fixes(results: List[FixResult]) -> Tuple[int, int]:
+    """Print the fixes and failures per file; return (files fixed, files that failed)"""
+    fixed = failed = 0
+    for result in results:
+        if result.fixes:
+            fixed += 1
+            print(f"🔧 {result.filepath}")
+            for fix in result.fixes:
+                print(f"   {fix}")
+        if result.error:
+            failed += 1
+            print(f"✗ {result.filepath}: {result.error}")
+    print(f"✓ Fixed {fixed} of {len(results)} prompt(s)" + (f", {failed} could not be fixed" if failed else "") + "\n")
+    return fixed, failed
@@ -0,0 +1,157 @@
+"""
+PromptHub Prompt Loader
+
+Shared file discovery and loading for the validation and indexing scripts.
+Each prompt is read and parsed once; the resulting ParsedPrompt feeds both
+PromptValidator and IndexGenerator.
+
+In a single process, files are read ahead on a small thread pool while the
+calling thread parses the ones already read, so I/O wait (cold caches, network
+mounts) overlaps with parsing. At most a fixed number of reads are in flight,
+which bounds memory regardless of corpus size.
+"""
+
+import argparse
+import functools
+import os
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from lazy import lazy_import
+from prompt_parser import ParsedPrompt, parse_prompt
+
+# Only loaded when files are read ahead or spread across processes
+futures = lazy_import("concurrent.futures")
+multiprocessing = lazy_import("multiprocessing")
+
+
+T = TypeVar("T")
+
+# README and other documentation files living next to prompts
+SKIPPED_FILES = ["README.MD", "INDEX.MD", "CONTRIBUTING.MD", "LICENSE.MD"]
+
+# Default number of file reads kept in flight ahead of parsing
+READ_AHEAD = 16
+MAX_READ_THREADS = 8
+
+_read_ahead = READ_AHEAD
+
+
+def set_read_ahead(depth: int):
+    """Set how many file reads load_prompts keeps in flight (1 = no prefetching)"""
+    global _read_ahead
+    _read_ahead = max(1, depth)
+
+
+def iter_prompt_files(directory: Path) -> Iterator[Path]:
+    """Yield prompt files under a directory, walking it with os.scandir"""
+    stack = [str(directory)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        subdirs = []
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(".md") and entry.name.upper() not in SKIPPED_FILES:
+                    yield Path(entry.path)
+        # Visit subdirectories in listing order
+        stack.extend(reversed(subdirs))
+
+
+def find_prompt_files(directory: Path) -> List[Path]:
+    """Find all prompt files in a directory"""
+    return list(iter_prompt_files(directory))
+
+
+def load_prompt(filepath: Path) -> ParsedPrompt:
+    """Read and parse a prompt file"""
+    return parse_prompt(filepath.read_text(encoding='utf-8'))
+
+
+def load_prompts(
+    filepaths: Iterable[Path], read_ahead: Optional[int] = None
+) -> Iterator[Tuple[Path, Optional[ParsedPrompt], Optional[Exception]]]:
+    """Yield (filepath, parsed prompt, error) in input order, reading files ahead on threads
+    
+    Reading happens on a bounded thread pool and parsing on the calling
+    thread. parsed is None when the file could not be read or decoded.
+    """
+    depth = read_ahead or _read_ahead
+    if depth <= 1:
+        for filepath in filepaths:
+            try:
+                yield filepath, load_prompt(filepath), None
+            except (OSError, UnicodeDecodeError) as e:
+                yield filepath, None, e
+        return
+    
+    def parsed(filepath: Path, future: "futures.Future") -> Tuple[Path, Optional[ParsedPrompt], Optional[Exception]]:
+        try:
+            return filepath, parse_prompt(future.result()), None
+        except (OSError, UnicodeDecodeError) as e:
+            return filepath, None, e
+    
+    with futures.ThreadPoolExecutor(max_workers=min(depth, MAX_READ_THREADS)) as pool:
+        in_flight: Deque[Tuple[Path, futures.Future]] = deque()
+        for filepath in filepaths:
+            in_flight.append((filepath, pool.submit(filepath.read_text, encoding='utf-8')))
+            if len(in_flight) >= depth:
+                yield parsed(*in_flight.popleft())
+        while in_flight:
+            yield parsed(*in_flight.popleft())
+
+
+def _load_and_apply(func: Callable[[Path, Optional[ParsedPrompt]], T], filepath: Path) -> T:
+    try:
+        parsed = load_prompt(filepath)
+    except (OSError, UnicodeDecodeError):
+        parsed = None
+    return func(filepath, parsed)
+
+
+def map_prompts(
+    func: Callable[[Path, Optional[ParsedPrompt]], T], filepaths: List[Path], jobs: int = 1
+) -> Iterator[T]:
+    """Apply func(filepath, parsed) to each prompt, like map_files
+    
+    parsed is None when the file could not be read or decoded. In a single
+    process files are prefetched with load_prompts; with jobs > 1 each worker
+    reads its own files.
+    """
+    if jobs <= 1 or len(filepaths) <= 1:
+        # A single file has nothing to read ahead of
+        for filepath, parsed, _ in load_prompts(filepaths, 1 if len(filepaths) <= 1 else None):
+            yield func(filepath, parsed)
+        return
+    yield from map_files(functools.partial(_load_and_apply, func), filepaths, jobs)
+
+
+def map_files(func: Callable[[Path], T], filepaths: List[Path], jobs: int = 1) -> Iterator[T]:
+    """Apply func to each file and yield results as soon as they are ready
+    
+    With jobs > 1 the files are spread across a process pool in chunks and
+    results are yielded in completion order rather than input order. func must
+    be a module-level function so worker processes can run it.
+    """
+    if jobs <= 1 or len(filepaths) <= 1:
+        for filepath in filepaths:
+            yield func(filepath)
+        return
+    
+    # Several chunks per worker keeps the pool balanced when some files are slow
+    chunksize = max(1, min(256, len(filepaths) // (jobs * 4)))
+    with multiprocessing.Pool(processes=jobs) as pool:
+        yield from pool.imap_unordered(func, filepaths, chunksize=chunksize)
+
+
+def add_loader_arguments(parser: argparse.ArgumentParser):
+    """Add the file loading options"""
+    parser.add_argument(
+        "--read-ahead", type=int, default=READ_AHEAD,
+        help=f"File reads kept in flight ahead of parsing in a single process (default: {READ_AHEAD})"
+    )
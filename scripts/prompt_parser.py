@@ -0,0 +1,164 @@
+"""
+PromptHub Prompt Parser
+
+Splits a prompt file into its structure (headings, section bodies, metadata
+fields and fenced code blocks) in a single pass over the text, so that the
+validation and indexing scripts never have to rescan the whole file.
+
+Usage:
+    from prompt_parser import parse_prompt
+
+    parsed = parse_prompt(content)
+    parsed.section_body("## Description")
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})[ \t]+(.+?)[ \t#]*$')
+METADATA_PATTERN = re.compile(r'\*\*([^*\n]+)\*\*:[ \t]*(.*)')
+FENCE_MARKER = "```"
+
+
+@dataclass
+class Section:
+    """A heading and the span of its body (up to the next heading of the same or higher level)"""
+    level: int
+    title: str
+    heading_start: int
+    body_start: int
+    body_end: int
+
+    @property
+    def key(self) -> str:
+        return f"{'#' * self.level} {self.title}"
+
+
+@dataclass
+class CodeBlock:
+    """A fenced code block and the level-2 section it appears in"""
+    info: str
+    text: str
+    start: int
+    end: int
+    section: Optional[str]
+
+
+@dataclass
+class ParsedPrompt:
+    """Structure of a prompt file produced by parse_prompt"""
+    content: str
+    title: Optional[str] = None
+    sections: Dict[str, Section] = field(default_factory=dict)
+    metadata: Dict[str, str] = field(default_factory=dict)
+    # (start, end) of each metadata value in content, for editing it in place
+    metadata_spans: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    code_blocks: List[CodeBlock] = field(default_factory=list)
+
+    def has_section(self, name: str) -> bool:
+        """Check for a section by its heading marker, e.g. '## Description' or '# ' for the title"""
+        name = name.strip()
+        if name == "#":
+            return self.title is not None
+        return name in self.sections
+
+    def section_body(self, name: str) -> Optional[str]:
+        """Return the body text of a section, or None if the section is missing"""
+        section = self.sections.get(name.strip())
+        if section is None:
+            return None
+        return self.content[section.body_start:section.body_end]
+
+    def code_blocks_in(self, name: str) -> List[CodeBlock]:
+        """Return the code blocks inside a section (including its subsections)"""
+        section = self.sections.get(name.strip())
+        if section is None:
+            return []
+        return [
+            block for block in self.code_blocks
+            if section.body_start <= block.start < section.body_end
+        ]
+
+
+def parse_prompt(content: str) -> ParsedPrompt:
+    """Tokenize a prompt file into sections, metadata and code blocks in one pass"""
+    parsed = ParsedPrompt(content=content)
+    open_sections: List[Section] = []
+    current_h2: Optional[str] = None
+
+    fence_info = None
+    fence_body_start = 0
+    fence_start = 0
+
+    offset = 0
+    for line in content.splitlines(keepends=True):
+        line_start = offset
+        offset += len(line)
+        stripped = line.strip()
+
+        # Fenced code blocks: any line starting with ``` opens or closes a fence
+        if stripped.startswith(FENCE_MARKER):
+            if fence_info is None:
+                fence_info = stripped[len(FENCE_MARKER):].strip()
+                fence_start = line_start
+                fence_body_start = offset
+            else:
+                parsed.code_blocks.append(CodeBlock(
+                    info=fence_info,
+                    text=content[fence_body_start:line_start],
+                    start=fence_start,
+                    end=offset,
+                    section=current_h2
+                ))
+                fence_info = None
+            continue
+
+        if fence_info is not None:
+            continue
+
+        if line.startswith("#"):
+            heading_match = HEADING_PATTERN.match(stripped)
+            if heading_match:
+                level = len(heading_match.group(1))
+                # Close every open section at the same or a deeper level
+                while open_sections and open_sections[-1].level >= level:
+                    open_sections.pop().body_end = line_start
+                section = Section(
+                    level=level,
+                    title=heading_match.group(2),
+                    heading_start=line_start,
+                    body_start=offset,
+                    body_end=len(content)
+                )
+                open_sections.append(section)
+                parsed.sections.setdefault(section.key, section)
+                if level == 1 and parsed.title is None:
+                    parsed.title = section.title
+                if level <= 2:
+                    current_h2 = section.key
+                continue
+
+        if "**" in line:
+            metadata_match = METADATA_PATTERN.search(line)
+            if metadata_match:
+                name = metadata_match.group(1).strip()
+                if name not in parsed.metadata:
+                    raw_value = metadata_match.group(2)
+                    value = raw_value.strip()
+                    value_start = line_start + metadata_match.start(2) + len(raw_value) - len(raw_value.lstrip())
+                    parsed.metadata[name] = value
+                    parsed.metadata_spans[name] = (value_start, value_start + len(value))
+
+    # An unterminated fence runs to the end of the file
+    if fence_info is not None:
+        parsed.code_blocks.append(CodeBlock(
+            info=fence_info,
+            text=content[fence_body_start:],
+            start=fence_start,
+            end=len(content),
+            section=current_h2
+        ))
+
+    return parsed
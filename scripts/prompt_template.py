@@ -0,0 +1,273 @@
+"""
+PromptHub Template Rendering
+
+Fills the {VARIABLE} placeholders of a prompt's "The Prompt" code block.
+
+A prompt file is parsed and compiled once into a CompiledTemplate: the code
+block becomes a single str.format_map string (other braces are escaped), and
+its variables are checked against the ones documented under "Variables to
+Customize". Compiled templates are cached per file and stat info, so rendering
+many variable sets never re-reads or re-parses the prompt.
+
+Variable sets are streamed from JSONL (one JSON object per line) or CSV (one
+column per variable) and each rendered prompt is written as soon as it is
+ready. Rows missing variables are reported and skipped; extra variables are
+reported but do not stop rendering. An empty cell counts as a value, but a CSV
+row too short to reach a column is missing that column's variable, and a row
+with more fields than the header is reported and skipped.
+
+Usage:
+    python scripts/prompthub.py render prompts/by-category/coding/python-code-debugger-pro.md --vars rows.jsonl
+    python scripts/prompthub.py render prompt.md --vars rows.csv --format text
+    python scripts/prompthub.py render prompt.md --set CODE_BLOCK="print(1)" --set ERROR_MESSAGE=none
+    python scripts/prompthub.py render prompt.md --list-variables
+"""
+
+import functools
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, TextIO
+
+from lazy import lazy_import, lazy_pattern
+from prompt_loader import load_prompt
+from prompt_parser import ParsedPrompt
+
+csv = lazy_import("csv")
+
+
+VARIABLE_PATTERN = lazy_pattern(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
+DOCUMENTED_PATTERN = lazy_pattern(r'`\{([A-Za-z_][A-Za-z0-9_]*)\}`')
+
+INPUT_FORMATS = ["jsonl", "csv"]
+OUTPUT_FORMATS = ["ndjson", "text"]
+
+# Printed between prompts in text output
+TEXT_SEPARATOR = "\n\n---\n\n"
+
+# Key under which a CSV row's fields beyond the header are collected (never a variable name)
+UNNAMED_FIELDS = "(unnamed fields)"
+
+
+@dataclass
+class CompiledTemplate:
+    """A prompt's code block compiled for repeated rendering"""
+    source: str
+    # Variables in order of first use
+    variables: List[str]
+    documented: List[str]
+    format_string: str
+
+    @property
+    def undocumented(self) -> List[str]:
+        """Variables used in the prompt but not listed under Variables to Customize"""
+        return [name for name in self.variables if name not in self.documented]
+
+    @property
+    def unused(self) -> List[str]:
+        """Documented variables that the prompt never uses"""
+        return [name for name in self.documented if name not in self.variables]
+
+    def missing(self, values: Mapping[str, object]) -> List[str]:
+        return [name for name in self.variables if name not in values]
+
+    def extra(self, values: Mapping[str, object]) -> List[str]:
+        return [name for name in values if name not in self.variables]
+
+    def render(self, values: Mapping[str, object]) -> str:
+        """Fill every variable; raises KeyError if one is missing"""
+        return self.format_string.format_map(values)
+
+    def render_partial(self, values: Mapping[str, object]) -> str:
+        """Fill the variables that have values and leave the rest as {NAME}"""
+        return self.format_string.format_map(_KeepMissing(values))
+
+
+class _KeepMissing(dict):
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+@dataclass
+class RenderResult:
+    """Outcome of rendering one variable set"""
+    row: int
+    prompt: Optional[str]
+    missing: List[str] = field(default_factory=list)
+    extra: List[str] = field(default_factory=list)
+    # Why the row could not be rendered, other than missing variables
+    error: Optional[str] = None
+
+
+def compile_template(parsed: ParsedPrompt) -> CompiledTemplate:
+    """Compile the code block of a parsed prompt's "The Prompt" section"""
+    blocks = parsed.code_blocks_in("## The Prompt")
+    if not blocks:
+        raise ValueError("The Prompt section has no code block to render")
+    source = blocks[0].text
+
+    variables = list(dict.fromkeys(VARIABLE_PATTERN.findall(source)))
+    documented = list(dict.fromkeys(
+        DOCUMENTED_PATTERN.findall(parsed.section_body("## Variables to Customize") or "")
+    ))
+
+    # Escape every brace, then restore the variable placeholders
+    parts = []
+    position = 0
+    for match in VARIABLE_PATTERN.finditer(source):
+        parts.append(source[position:match.start()].replace("{", "{{").replace("}", "}}"))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(source[position:].replace("{", "{{").replace("}", "}}"))
+
+    return CompiledTemplate(source, variables, documented, "".join(parts))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_file(path: str, mtime_ns: int, size: int) -> CompiledTemplate:
+    return compile_template(load_prompt(Path(path)))
+
+
+def load_template(filepath: Path) -> CompiledTemplate:
+    """Compile a prompt file, reusing the compiled template while the file is unchanged"""
+    stat = os.stat(filepath)
+    return _compile_file(os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+
+
+def read_variable_sets(stream: TextIO, input_format: str) -> Iterator[Dict[str, object]]:
+    """Yield one dict of variables per JSONL line or CSV row"""
+    if input_format == "csv":
+        # Columns a short row does not reach are left out, so they count as missing
+        for row in csv.DictReader(stream, restkey=UNNAMED_FIELDS):
+            yield {name: value for name, value in row.items() if value is not None}
+        return
+
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        values = json.loads(line)
+        if not isinstance(values, dict):
+            raise ValueError(f"Line {line_number}: expected a JSON object, got {type(values).__name__}")
+        yield values
+
+
+def render_batch(
+    template: CompiledTemplate, variable_sets: Iterable[Mapping[str, object]], allow_missing: bool = False
+) -> Iterator[RenderResult]:
+    """Render each variable set as it arrives
+
+    Rows with missing variables are not rendered unless allow_missing is set,
+    in which case the missing placeholders are left in place.
+    """
+    for row, values in enumerate(variable_sets, 1):
+        missing = template.missing(values)
+        extra = [name for name in template.extra(values) if name != UNNAMED_FIELDS]
+        if UNNAMED_FIELDS in values:
+            count = len(values[UNNAMED_FIELDS])
+            yield RenderResult(row, None, missing, extra, f"{count} more field(s) than the header")
+            continue
+        if not missing:
+            prompt = template.render(values)
+        elif allow_missing:
+            prompt = template.render_partial(values)
+        else:
+            prompt = None
+        yield RenderResult(row, prompt, missing, extra)
+
+
+def write_results(results: Iterable[RenderResult], output_format: str, stream: TextIO = None) -> int:
+    """Stream rendered prompts and report row problems; return the exit code"""
+    stream = stream or sys.stdout
+    failed = 0
+    first = True
+
+    for result in results:
+        if result.prompt is None:
+            failed += 1
+        if output_format == "ndjson":
+            stream.write(json.dumps({
+                "row": result.row,
+                "prompt": result.prompt,
+                "missing": result.missing,
+                "extra": list(map(str, result.extra)),
+                "error": result.error,
+            }, ensure_ascii=False) + "\n")
+        else:
+            if result.error:
+                print(f"Row {result.row}: {result.error}", file=sys.stderr)
+            if result.missing:
+                print(f"Row {result.row}: missing variables: {', '.join(result.missing)}", file=sys.stderr)
+            if result.extra:
+                print(f"Row {result.row}: unknown variables: {', '.join(map(str, result.extra))}", file=sys.stderr)
+            if result.prompt is not None:
+                if not first:
+                    stream.write(TEXT_SEPARATOR)
+                stream.write(result.prompt)
+                first = False
+        stream.flush()
+
+    if output_format == "text" and not first:
+        stream.write("\n")
+    return 1 if failed else 0
+
+
+def input_format_for(path: Path, input_format: Optional[str]) -> str:
+    """Use the given input format, or infer it from the file extension"""
+    if input_format:
+        return input_format
+    return "csv" if path.suffix.lower() == ".csv" else "jsonl"
+
+
+def run_render(
+    prompt_path: Path,
+    vars_path: Optional[Path] = None,
+    assignments: Optional[List[str]] = None,
+    input_format: Optional[str] = None,
+    output_format: str = "ndjson",
+    allow_missing: bool = False,
+    list_variables: bool = False
+) -> int:
+    """Render a prompt for every variable set in vars_path ('-' for stdin) or for --set values"""
+    try:
+        template = load_template(prompt_path)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        print(f"Error: Cannot compile {prompt_path}: {e}", file=sys.stderr)
+        return 1
+
+    if template.undocumented:
+        print(f"Warning: Undocumented variables: {', '.join(template.undocumented)}", file=sys.stderr)
+    if template.unused:
+        print(f"Warning: Documented but unused variables: {', '.join(template.unused)}", file=sys.stderr)
+
+    if list_variables:
+        for name in template.variables:
+            print(name)
+        return 0
+
+    if vars_path is None:
+        values = {}
+        for assignment in assignments or []:
+            name, separator, value = assignment.partition("=")
+            if not separator:
+                print(f"Error: --set expects NAME=VALUE, got: {assignment}", file=sys.stderr)
+                return 1
+            values[name] = value
+        return write_results(render_batch(template, [values], allow_missing), output_format)
+
+    input_format = input_format_for(vars_path, input_format)
+    try:
+        if str(vars_path) == "-":
+            return write_results(
+                render_batch(template, read_variable_sets(sys.stdin, input_format), allow_missing), output_format
+            )
+        with open(vars_path, encoding='utf-8', newline='') as stream:
+            return write_results(
+                render_batch(template, read_variable_sets(stream, input_format), allow_missing), output_format
+            )
+    except BrokenPipeError:
+        raise
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot read variables from {vars_path}: {e}", file=sys.stderr)
+        return 1
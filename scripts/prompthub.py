@@ -0,0 +1,651 @@
+#!/usr/bin/env python3
+"""
+PromptHub Command Line Interface
+
+Single entry point for the repository tooling. The `all` command validates
+every prompt and regenerates INDEX.md from one scan of the prompts directory:
+each file is read and parsed once, and that parse produces its validation
+result, its index metadata, its near-duplicate signature and its search
+terms. The Related Prompts check reads its titles and items from the index
+metadata.
+
+`query` updates the lookup index by itself when prompts are added, removed,
+renamed or edited.
+
+Usage:
+    python scripts/prompthub.py validate prompts/
+    python scripts/prompthub.py validate prompts/ --fix  # fix missing fields, sections and bad filenames
+    python scripts/prompthub.py index --incremental
+    python scripts/prompthub.py all prompts/ --jobs 0
+    python scripts/prompthub.py all prompts/ --changed-since origin/main
+    python scripts/prompthub.py all prompts/ --sharded index/ --page-size 50
+    python scripts/prompthub.py all prompts/ --json-export api/  # static JSON API for web clients
+    python scripts/prompthub.py watch prompts/
+    python scripts/prompthub.py query --tag python --difficulty Advanced --model Claude
+    python scripts/prompthub.py search "debug python errors" -k 5
+    python scripts/prompthub.py index --catalog-db  # keep the catalog in .prompthub-cache/catalog.sqlite
+    python scripts/prompthub.py render prompts/by-category/coding/python-code-debugger-pro.md --vars rows.jsonl
+    python scripts/prompthub.py evaluate prompts/ tests.jsonl --endpoint http://127.0.0.1:8080/generate
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from file_cache import CACHE_DIR
+from inverted_index import DEFAULT_INDEX_PATH
+from near_duplicates import DEFAULT_THRESHOLD
+
+if TYPE_CHECKING:
+    from file_cache import FileCache
+    from generate_index import PromptMetadata
+    from inverted_index import InvertedIndex
+    from prompt_parser import ParsedPrompt
+    from search_index import SearchDocument
+    from validate_prompt import ValidationResult
+
+
+@dataclass
+class ScannedPrompt:
+    """What one pass over a prompt file produced"""
+    result: "ValidationResult"
+    metadata: Optional["PromptMetadata"]
+    # MinHash signature as bytes and search terms, if the file was parsed in this scan
+    # (see near_duplicates and search_index)
+    signature: Optional[bytes] = None
+    document: Optional["SearchDocument"] = None
+
+
+def analyze_file(
+    filepath: Path, parsed: Optional["ParsedPrompt"], signatures: bool = False
+) -> Tuple["ValidationResult", Optional[dict], Optional[bytes], Optional["SearchDocument"]]:
+    """Validate a prompt parsed once by map_prompts and extract its index metadata
+    
+    Returns the validation result, the metadata record (None if the file
+    could not be read or its metadata could not be extracted), with
+    signatures its MinHash signature, and its search terms.
+    """
+    from generate_index import IndexGenerator, metadata_to_record
+    from near_duplicates import signature_for_file
+    from search_index import search_document
+    from validate_prompt import PromptValidator
+    
+    if parsed is None:
+        # Let the validator report why the file could not be read
+        return PromptValidator(filepath).validate(), None, None, None
+    
+    result = PromptValidator(filepath, parsed=parsed).validate()
+    try:
+        record = metadata_to_record(IndexGenerator().metadata_from_parsed(filepath, parsed))
+    except Exception as e:
+        print(f"Warning: Failed to process {filepath}: {e}", file=sys.stderr)
+        record = None
+    signature = signature_for_file(filepath, parsed)[1] if signatures else None
+    return result, record, signature, search_document(filepath, parsed)
+
+
+def scan_prompts(
+    filepaths: List[Path],
+    jobs: int = 1,
+    validation_cache: Optional["FileCache"] = None,
+    metadata_store: Optional["FileCache"] = None,
+    signatures: bool = False
+) -> Iterator[ScannedPrompt]:
+    """Validate and extract metadata for every file in a single pass
+    
+    Files whose validation result and metadata are both cached are not read.
+    The files that are parsed also get their search terms and, with
+    signatures, their MinHash signature.
+    """
+    from generate_index import metadata_from_record
+    from prompt_loader import map_prompts
+    from validate_prompt import result_from_record, result_to_record
+    
+    pending = {}
+    for filepath in filepaths:
+        if validation_cache is None or metadata_store is None:
+            pending[str(filepath)] = (None, None)
+            continue
+        
+        cached_result, result_state = validation_cache.lookup(filepath)
+        cached_record, record_state = metadata_store.lookup(filepath)
+        if cached_result is not None and cached_record is not None:
+            yield ScannedPrompt(
+                result_from_record(filepath, cached_result),
+                metadata_from_record(filepath, cached_record)
+            )
+        else:
+            pending[str(filepath)] = (result_state, record_state)
+    
+    analyze = functools.partial(analyze_file, signatures=signatures)
+    for result, record, signature, document in map_prompts(analyze, [Path(p) for p in pending], jobs):
+        result_state, record_state = pending[result.filepath]
+        if result_state is not None:
+            validation_cache.store(result_state, result_to_record(result))
+        if record_state is not None and record is not None:
+            metadata_store.store(record_state, record)
+        
+        metadata = None
+        if record is not None:
+            metadata = metadata_from_record(Path(result.filepath), record)
+        yield ScannedPrompt(result, metadata, signature, document)
+
+
+def run_all(
+    prompts_dir: Path,
+    output_path: Path,
+    jobs: int = 1,
+    use_cache: bool = True,
+    cache_dir: Path = CACHE_DIR,
+    inverted_index_path: Path = DEFAULT_INDEX_PATH,
+    search_index_path: Optional[Path] = None,
+    duplicate_threshold: Optional[float] = DEFAULT_THRESHOLD,
+    output_format: str = "text",
+    shard_dir: Optional[Path] = None,
+    page_size: Optional[int] = None,
+    catalog_db_path: Optional[Path] = None,
+    check_references: bool = True,
+    changed_since: Optional[str] = None,
+    json_export_dir: Optional[Path] = None
+) -> int:
+    """Validate every prompt and regenerate the index from the same scan
+    
+    With catalog_db_path the index is rendered from the SQLite catalog,
+    which is brought up to date first. With changed_since (a git ref), only
+    the prompts changed since the ref and those whose corpus-level warnings
+    the change affects are validated, and the stored metadata of every other
+    prompt is used for the index without reading it. json_export_dir also
+    gets the static JSON API for web clients. search_index_path and page_size
+    default to those of generate_index. Results are reported once the scan and
+    the corpus checks are done.
+    """
+    from catalog import PromptCatalog
+    from catalog_db import CatalogDatabase, CatalogIndexGenerator
+    from generate_index import PAGE_SIZE, IndexGenerator, open_metadata_store
+    from git_changes import changed_prompts, worktree_tree
+    from prompt_loader import find_prompt_files
+    from validate_prompt import (
+        REPORTERS, add_corpus_warnings, diagnostics_to_stderr, files_to_report, find_corpus_warnings,
+        open_validation_cache
+    )
+    
+    page_size = page_size or PAGE_SIZE
+    if not prompts_dir.is_dir():
+        print(f"Error: Path must be a directory: {prompts_dir}")
+        return 1
+    
+    filepaths = find_prompt_files(prompts_dir)
+    
+    changes = changed = tree = None
+    if changed_since is not None:
+        try:
+            changes = changed_prompts(changed_since, prompts_dir)
+        except ValueError as e:
+            print(f"Error: Cannot list changes since {changed_since}: {e}")
+            return 1
+        changed, tree = changes.changed_keys, changes.tree
+        with diagnostics_to_stderr(output_format):
+            print(f"Prompts changed: {changes.summary()}")
+    
+    validation_cache = metadata_store = None
+    if use_cache:
+        validation_cache = open_validation_cache(cache_dir)
+        metadata_store = open_metadata_store(cache_dir)
+    
+    prompts = PromptCatalog()
+    results: List["ValidationResult"] = []
+    # MinHash signatures and search terms of the files the scan parsed
+    signatures: Dict[str, bytes] = {}
+    documents: Dict[str, "SearchDocument"] = {}
+    
+    def scan(scanned: List[Path]):
+        for item in scan_prompts(scanned, jobs, validation_cache, metadata_store, duplicate_threshold is not None):
+            results.append(item.result)
+            if item.metadata is not None:
+                prompts.append(item.metadata)
+            if item.signature is not None:
+                signatures[item.result.filepath] = item.signature
+            if item.document is not None:
+                documents[os.path.abspath(item.result.filepath)] = item.document
+    
+    # Scanning before the corpus checks lets them reuse its parses instead of reading every file again
+    if changes is None:
+        scan(filepaths)
+    else:
+        scan([filepath for filepath in filepaths if os.path.abspath(filepath) in changed])
+    
+    corpus_warnings = find_corpus_warnings(
+        prompts_dir, filepaths, duplicate_threshold, jobs, use_cache, cache_dir, check_references, changes,
+        signatures, {str(prompt.filepath): (prompt.title, prompt.related) for prompt in prompts}
+    )
+    if changes is not None:
+        # Unchanged files are reported too when the change gave them corpus warnings
+        filepaths = files_to_report(filepaths, changes, corpus_warnings)
+        scan([filepath for filepath in filepaths if os.path.abspath(filepath) not in changed])
+    
+    exit_code = REPORTERS[output_format](add_corpus_warnings(results, corpus_warnings))
+    
+    if use_cache:
+        # A diff-scoped scan does not see every file; the metadata store is pruned when the index is collected
+        if changes is None:
+            for cache in (validation_cache, metadata_store):
+                cache.prune(prompts_dir)
+            if len(prompts) == len(filepaths):
+                # Every file was looked up and extracted, so the store matches the checkout
+                metadata_store.record_tree(worktree_tree(prompts_dir))
+        for cache in (validation_cache, metadata_store):
+            cache.save()
+    
+    with diagnostics_to_stderr(output_format):
+        # Like the CI workflow, only publish the index when every prompt is valid
+        if exit_code != 0:
+            print("Index not updated because validation failed.")
+            return exit_code
+        
+        if catalog_db_path is not None:
+            generator = CatalogIndexGenerator(prompts_dir, CatalogDatabase(catalog_db_path))
+            generator.collect_prompts(changed, tree)
+        elif changes is not None:
+            # The scan only covered the affected prompts; apply them to the stored metadata of the rest
+            generator = IndexGenerator(prompts_dir, metadata_store)
+            generator.collect_prompts(changed, tree)
+        else:
+            # The store is only passed on for the content hashes the JSON export names prompt files by
+            generator = IndexGenerator(prompts_dir, metadata_store)
+            generator.set_prompts(prompts)
+        generator.write_index(output_path, collect=False, shard_dir=shard_dir, page_size=page_size)
+        generator.write_inverted_index(inverted_index_path)
+        generator.update_search_index(search_index_path, changed, tree, documents)
+        if json_export_dir is not None:
+            generator.write_json_export(json_export_dir, page_size)
+    return exit_code
+
+
+def load_query_index(index_path: Path) -> "InvertedIndex":
+    """Load the inverted index for a query, preferring its binary snapshot
+    
+    A snapshot whose prompts tree has changed since it was written is rebuilt
+    first, re-extracting only the changed prompts through the metadata store.
+    Changes are detected from the stat info of the tree (see catalog_snapshot).
+    It is only rebuilt from the directory it was built in; from anywhere else,
+    or if the prompts directory is gone, the stored index is served with a
+    warning. Without a usable snapshot the JSON index is loaded as is.
+    """
+    from catalog_snapshot import load_snapshot
+    from inverted_index import InvertedIndex
+    
+    snapshot = load_snapshot(index_path)
+    if snapshot is None:
+        return InvertedIndex.load(index_path)
+    if snapshot.is_current():
+        return snapshot
+    
+    # Progress messages must not mix with the query results
+    with contextlib.redirect_stdout(sys.stderr):
+        if not snapshot.can_rebuild():
+            print(
+                f"Warning: Prompts in {snapshot.prompts_path} may have changed since the index was written; "
+                f"run 'prompthub.py index' in {snapshot.root} to update it"
+            )
+            return snapshot
+        print(f"Prompts in {snapshot.prompts_dir} changed since the index was written; updating it")
+        from generate_index import IndexGenerator
+        generator = IndexGenerator.with_metadata_store(snapshot.prompts_dir)
+        generator.collect_prompts()
+        generator.write_inverted_index(index_path)
+    return load_snapshot(index_path) or InvertedIndex.load(index_path)
+
+
+def run_query(
+    index_path: Path,
+    filters: dict,
+    limit: Optional[int] = None,
+    as_json: bool = False,
+    catalog_db_path: Optional[Path] = None
+) -> int:
+    """Look up prompts in the prebuilt inverted index (or the SQLite catalog)"""
+    if catalog_db_path is not None:
+        if not catalog_db_path.exists():
+            print(f"Error: No catalog database at {catalog_db_path}. Run 'prompthub.py index --catalog-db' first.")
+            return 1
+        from catalog_db import CatalogDatabase
+        db = CatalogDatabase(catalog_db_path)
+        matches = db.query(limit=limit, **filters)
+        db.close()
+    else:
+        try:
+            index = load_query_index(index_path)
+        except FileNotFoundError:
+            print(f"Error: No inverted index at {index_path}. Run 'prompthub.py index' first.")
+            return 1
+        matches = index.query(limit=limit, **filters)
+    
+    if as_json:
+        print(json.dumps(matches, ensure_ascii=False, indent=2))
+        return 0
+    
+    for match in matches:
+        print(f"{match['date_added']:<10}  {match['title']}  ({match['path']})")
+    print(f"\n{len(matches)} prompt(s) found")
+    return 0
+
+
+def run_search(index_path: Path, query: str, k: int = 10, as_json: bool = False) -> int:
+    """Rank prompts against a free-text query using the BM25 index"""
+    from search_index import SearchIndex
+    
+    if not index_path.exists():
+        print(f"Error: No search index at {index_path}. Run 'prompthub.py index' first.")
+        return 1
+    
+    search_index = SearchIndex(index_path)
+    matches = [
+        {"score": round(score, 4), "path": os.path.relpath(path), "title": title}
+        for score, path, title in search_index.search(query, k)
+    ]
+    search_index.close()
+    
+    if as_json:
+        print(json.dumps(matches, ensure_ascii=False, indent=2))
+        return 0
+    
+    for match in matches:
+        print(f"{match['score']:>8.3f}  {match['title']}  ({match['path']})")
+    print(f"\n{len(matches)} prompt(s) found")
+    return 0
+
+
+def add_validate_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments of the validate command"""
+    from validate_prompt import add_fix_arguments, add_profile_arguments, add_validation_arguments
+    
+    parser.add_argument("path", help="Prompt file or directory to validate")
+    add_validation_arguments(parser)
+    add_fix_arguments(parser)
+    add_profile_arguments(parser)
+
+
+def add_index_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments of the index command"""
+    from prompt_loader import add_loader_arguments
+    
+    parser.add_argument(
+        "prompts_dir", nargs="?", type=Path, default=Path("prompts"),
+        help="Directory containing the prompts (default: prompts)"
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, default=Path("INDEX.md"),
+        help="Index file to write (default: INDEX.md)"
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Keep extracted metadata on disk and only re-extract new or modified prompts"
+    )
+    parser.add_argument(
+        "--cache-dir", type=Path, default=CACHE_DIR,
+        help=f"Directory for the metadata store (default: {CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--changed-since", metavar="REF",
+        help="Only re-extract prompts changed since this git ref (implies --incremental)"
+    )
+    add_loader_arguments(parser)
+    add_catalog_output_arguments(parser)
+
+
+def add_all_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments of the all command"""
+    from validate_prompt import add_validation_arguments
+    
+    parser.add_argument(
+        "prompts_dir", nargs="?", type=Path, default=Path("prompts"),
+        help="Directory containing the prompts (default: prompts)"
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, default=Path("INDEX.md"),
+        help="Index file to write (default: INDEX.md)"
+    )
+    add_validation_arguments(parser)
+    add_catalog_output_arguments(parser)
+
+
+def add_catalog_output_arguments(parser: argparse.ArgumentParser):
+    """Add the output options shared by the index and all commands"""
+    from catalog_db import DEFAULT_CATALOG_PATH
+    from generate_index import add_output_arguments
+    
+    add_output_arguments(parser)
+    parser.add_argument(
+        "--catalog-db", type=Path, nargs="?", const=DEFAULT_CATALOG_PATH, metavar="PATH",
+        help=f"Keep the catalog in SQLite and render INDEX.md from it (default: {DEFAULT_CATALOG_PATH})"
+    )
+
+
+def add_watch_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments of the watch command"""
+    from watch import DEFAULT_DEBOUNCE, DEFAULT_INTERVAL, DEFAULT_RESCAN
+    
+    parser.add_argument(
+        "prompts_dir", nargs="?", type=Path, default=Path("prompts"),
+        help="Directory containing the prompts (default: prompts)"
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, default=Path("INDEX.md"),
+        help="Index file to keep up to date (default: INDEX.md)"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of worker processes for the initial scan (0 = one per CPU)"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=DEFAULT_INTERVAL,
+        help=f"Seconds between polls of the prompts directory (default: {DEFAULT_INTERVAL})"
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=DEFAULT_DEBOUNCE,
+        help=f"Seconds the tree must stay unchanged before changes are processed (default: {DEFAULT_DEBOUNCE})"
+    )
+    parser.add_argument(
+        "--rescan", type=float, default=DEFAULT_RESCAN,
+        help=f"Seconds between stats of every prompt file, to catch in-place edits (default: {DEFAULT_RESCAN})"
+    )
+
+
+def add_query_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments of the query command"""
+    parser.add_argument("--tag", action="append", help="Tag (repeatable)")
+    parser.add_argument("--category", action="append", help="Category (repeatable)")
+    parser.add_argument("--difficulty", action="append", help="Difficulty (repeatable)")
+    parser.add_argument("--model", action="append", help="Model (repeatable)")
+    parser.add_argument("--author", action="append", help="Author (repeatable)")
+    parser.add_argument("-n", "--limit", type=int, help="Maximum number of results")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument(
+        "--index", type=Path, default=DEFAULT_INDEX_PATH,
+        help=f"Inverted index to query, updated first if the prompts changed (default: {DEFAULT_INDEX_PATH})"
+    )
+    # The default path lives in catalog_db, which loads the whole indexer; it is only imported when used
+    parser.add_argument(
+        "--catalog-db", type=Path, nargs="?", const=True, metavar="PATH",
+        help="Query the SQLite catalog instead of the inverted index (default: the one 'index --catalog-db' writes)"
+    )
+
+
+def add_search_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments of the search command"""
+    from search_index import DEFAULT_SEARCH_PATH
+    
+    parser.add_argument("query", help="Search terms")
+    parser.add_argument("-k", "--top", type=int, default=10, help="Number of results (default: 10)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument(
+        "--index", type=Path, default=DEFAULT_SEARCH_PATH,
+        help=f"Search index to query (default: {DEFAULT_SEARCH_PATH})"
+    )
+
+
+def add_render_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments of the render command"""
+    from prompt_template import INPUT_FORMATS, OUTPUT_FORMATS
+    
+    parser.add_argument("prompt", type=Path, help="Prompt file to render")
+    parser.add_argument(
+        "--vars", type=Path,
+        help="JSONL or CSV file with one variable set per row ('-' for stdin)"
+    )
+    parser.add_argument(
+        "--set", action="append", metavar="NAME=VALUE", dest="assignments",
+        help="Variable value for a single render (repeatable, used without --vars)"
+    )
+    parser.add_argument(
+        "--input-format", choices=INPUT_FORMATS,
+        help="Format of --vars (default: from the file extension, else jsonl)"
+    )
+    parser.add_argument(
+        "--format", choices=OUTPUT_FORMATS, default="ndjson", dest="output_format",
+        help="ndjson: one record per row with missing/extra variables; text: rendered prompts only"
+    )
+    parser.add_argument(
+        "--allow-missing", action="store_true",
+        help="Render rows with missing variables, leaving their placeholders in place"
+    )
+    parser.add_argument(
+        "--list-variables", action="store_true", help="Print the prompt's variables and exit"
+    )
+
+
+def add_evaluate_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments of the evaluate command"""
+    from evaluate import DEFAULT_CACHE_PATH, DEFAULT_CONCURRENCY, DEFAULT_RETRIES, DEFAULT_TIMEOUT
+    
+    parser.add_argument("prompts", type=Path, help="Prompt file or directory")
+    parser.add_argument("tests", type=Path, help="JSONL file of test cases")
+    parser.add_argument("--endpoint", required=True, help="URL each rendered prompt is POSTed to")
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+        help=f"Requests (and pooled connections) in flight at once (default: {DEFAULT_CONCURRENCY})"
+    )
+    parser.add_argument("--rate", type=float, help="Maximum requests per second (default: unlimited)")
+    parser.add_argument(
+        "--retries", type=int, default=DEFAULT_RETRIES,
+        help=f"Retries for connection errors, timeouts, 429 and 5xx responses (default: {DEFAULT_RETRIES})"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT,
+        help=f"Seconds to wait for each response (default: {DEFAULT_TIMEOUT})"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Send every pair, ignoring cached results")
+    parser.add_argument(
+        "--cache", type=Path, default=DEFAULT_CACHE_PATH,
+        help=f"Result cache database (default: {DEFAULT_CACHE_PATH})"
+    )
+    parser.add_argument("-o", "--output", type=Path, help="Write NDJSON results here instead of stdout")
+
+
+# Command name -> (help, function adding its arguments)
+COMMANDS = {
+    "validate": ("Validate prompt files", add_validate_arguments),
+    "index": ("Generate INDEX.md", add_index_arguments),
+    "all": ("Validate all prompts and generate INDEX.md from a single scan", add_all_arguments),
+    "watch": ("Keep prompts validated and INDEX.md current while editing", add_watch_arguments),
+    "query": ("Find prompts by tag, category, difficulty, model or author", add_query_arguments),
+    "search": ("Full-text search over prompts", add_search_arguments),
+    "render": ("Fill a prompt's variables from JSONL/CSV rows or --set values", add_render_arguments),
+    "evaluate": ("Run prompts against JSONL test cases through an HTTP model endpoint", add_evaluate_arguments),
+}
+
+
+def main():
+    """Main entry point
+    
+    Each command imports its own modules, and only the command being run
+    gets its arguments (whose defaults come from those modules), so a tag
+    lookup or a single-file check does not load the rest of the tooling.
+    """
+    parser = argparse.ArgumentParser(
+        prog="prompthub",
+        description="PromptHub repository tooling."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    # The top-level parser has no options of its own, so the first positional argument is the command
+    command = next((arg for arg in sys.argv[1:] if not arg.startswith("-")), None)
+    for name, (help_text, add_arguments) in COMMANDS.items():
+        command_parser = subparsers.add_parser(name, help=help_text)
+        if name == command:
+            add_arguments(command_parser)
+    
+    args = parser.parse_args()
+    if "read_ahead" in args:
+        from prompt_loader import set_read_ahead
+        set_read_ahead(args.read_ahead)
+    
+    if args.command == "validate":
+        from validate_prompt import duplicate_threshold_from_args, resolve_jobs, run_validation
+        exit_code = run_validation(
+            Path(args.path), resolve_jobs(args.jobs), not args.no_cache, args.cache_dir,
+            duplicate_threshold_from_args(args), args.profile, args.profile_top, args.profile_output,
+            args.output_format, not args.no_references, args.changed_since, args.fix
+        )
+    elif args.command == "index":
+        from catalog_db import CatalogDatabase, CatalogIndexGenerator
+        from generate_index import IndexGenerator, write_index_files
+        if args.catalog_db is not None:
+            generator = CatalogIndexGenerator(args.prompts_dir, CatalogDatabase(args.catalog_db))
+        elif args.incremental or args.changed_since is not None:
+            generator = IndexGenerator.with_metadata_store(args.prompts_dir, args.cache_dir)
+        else:
+            generator = IndexGenerator(args.prompts_dir)
+        exit_code = write_index_files(generator, args.output, args)
+    elif args.command == "all":
+        from validate_prompt import duplicate_threshold_from_args, resolve_jobs
+        exit_code = run_all(
+            args.prompts_dir, args.output, resolve_jobs(args.jobs),
+            not args.no_cache, args.cache_dir, args.inverted_index, args.search_index,
+            duplicate_threshold_from_args(args), args.output_format, args.sharded, args.page_size,
+            args.catalog_db, not args.no_references, args.changed_since, args.json_export
+        )
+    elif args.command == "watch":
+        from validate_prompt import resolve_jobs
+        from watch import run_watch
+        exit_code = run_watch(
+            args.prompts_dir, args.output, resolve_jobs(args.jobs), args.interval, args.debounce, args.rescan
+        )
+    elif args.command == "render":
+        from prompt_template import run_render
+        exit_code = run_render(
+            args.prompt, args.vars, args.assignments, args.input_format, args.output_format,
+            args.allow_missing, args.list_variables
+        )
+    elif args.command == "evaluate":
+        from evaluate import run_evaluation
+        exit_code = run_evaluation(
+            args.prompts, args.tests, args.endpoint, args.concurrency, args.rate, args.retries,
+            args.timeout, not args.no_cache, args.cache, args.output
+        )
+    elif args.command == "search":
+        exit_code = run_search(args.index, args.query, args.top, args.json)
+    else:
+        catalog_db_path = args.catalog_db
+        if catalog_db_path is True:
+            from catalog_db import DEFAULT_CATALOG_PATH
+            catalog_db_path = DEFAULT_CATALOG_PATH
+        filters = {
+            "tag": args.tag,
+            "category": args.category,
+            "difficulty": args.difficulty,
+            "model": args.model,
+            "author": args.author,
+        }
+        exit_code = run_query(args.index, filters, args.limit, args.json, catalog_db_path)
+    
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+PromptHub Search Index
+
+Persisted BM25 full-text index over each prompt's title, Description,
+Use Case and "The Prompt" code block, stored in a local SQLite database.
+
+Each term's posting list is a single compact blob of (doc id, term frequency)
+pairs, and document lengths are kept in one array, so a query only loads the
+posting lists of its own terms and never opens a prompt file. The index is
+updated incrementally: files whose stat info or content hash is unchanged are
+skipped, and only the posting lists of terms in changed documents are
+rewritten. `prompthub.py all` passes in the terms of the prompts its own scan
+parsed, so only the standalone commands read prompts here.
+
+Usage:
+    from search_index import SearchIndex
+
+    SearchIndex(Path(".prompthub-cache/search.sqlite")).search("debug python errors")
+"""
+
+import heapq
+import math
+import os
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from file_cache import CACHE_DIR, RACY_WINDOW_NS, content_hash
+from git_changes import worktree_tree
+from lazy import lazy_import, lazy_pattern
+from prompt_parser import ParsedPrompt, parse_prompt
+
+sqlite3 = lazy_import("sqlite3")
+
+
+DEFAULT_SEARCH_PATH = CACHE_DIR / "search.sqlite"
+SEARCH_VERSION = "1"
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+TOKEN_PATTERN = lazy_pattern(r'[a-z0-9]+')
+# (title, term frequencies) a prompt is indexed under
+SearchDocument = Tuple[str, Dict[str, int]]
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by can for from has have how i if in into is it its
+    of on or so that the their them then there these this to was we what when
+    which will with you your
+""".split())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    terms TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (term TEXT PRIMARY KEY, data BLOB NOT NULL);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms"""
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def search_text(parsed: ParsedPrompt) -> str:
+    """Collect the searchable text of a prompt"""
+    parts = [parsed.title or ""]
+    for section in ("## Description", "## Use Case"):
+        parts.append(parsed.section_body(section) or "")
+    prompt_blocks = parsed.code_blocks_in("## The Prompt")
+    if prompt_blocks:
+        parts.append(prompt_blocks[0].text)
+    return "\n".join(parts)
+
+
+def search_document(filepath: Path, parsed: ParsedPrompt) -> SearchDocument:
+    """Return the title and term frequencies of a parsed prompt"""
+    return parsed.title or filepath.stem, Counter(tokenize(search_text(parsed)))
+
+
+class SearchIndex:
+    """BM25 index persisted in SQLite; the database is opened on first use"""
+
+    def __init__(self, db_path: Path = DEFAULT_SEARCH_PATH):
+        self.db_path = db_path
+        self._conn: Optional["sqlite3.Connection"] = None
+        self._lengths: Optional[array] = None
+
+    @property
+    def conn(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path))
+            self._conn.executescript(SCHEMA)
+            if self._get_meta("version") not in (None, SEARCH_VERSION):
+                # Tokenization changed: start over
+                self._conn.executescript("DELETE FROM docs; DELETE FROM postings; DELETE FROM meta;")
+            self._set_meta("version", SEARCH_VERSION)
+            self._conn.commit()
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _get_meta(self, key: str):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def lengths(self) -> array:
+        """Document lengths indexed by doc id (0 for unused ids)"""
+        if self._lengths is None:
+            self._lengths = array('I')
+            blob = self._get_meta("lengths")
+            if blob:
+                self._lengths.frombytes(blob)
+        return self._lengths
+
+    def update(
+        self,
+        filepaths: Iterable[Path],
+        root: Optional[Path] = None,
+        changed: Optional[Set[str]] = None,
+        tree: Optional[str] = None,
+        documents: Optional[Dict[str, SearchDocument]] = None
+    ) -> int:
+        """Bring the index up to date with the given files; return the number of changed documents
+
+        Documents under root that are not in filepaths are removed. With changed
+        (absolute paths), indexed files outside it are trusted without a stat,
+        if the index was last updated from tree (the git tree id of the prompts
+        at the diff's ref). documents maps absolute paths to search_document()
+        values already extracted in this run; those files are not parsed again.
+        """
+        conn = self.conn
+        if tree is None or self._get_meta("tree") != tree:
+            # Updated from other content than the ref's: check every file
+            changed = None
+        stamps = {
+            path: (doc_id, mtime_ns, size, digest, terms)
+            for doc_id, path, mtime_ns, size, digest, terms in conn.execute(
+                "SELECT id, path, mtime_ns, size, digest, terms FROM docs"
+            )
+        }
+        lengths = self.lengths
+        # term -> {doc id: new term frequency, 0 = remove}
+        changes: Dict[str, Dict[int, int]] = {}
+        next_id = max((stamp[0] for stamp in stamps.values()), default=0) + 1
+        seen = set()
+        updated = 0
+
+        # Stat info of files modified just now is not trusted on the next run
+        racy_limit_ns = time.time_ns() - RACY_WINDOW_NS
+
+        for filepath in filepaths:
+            key = os.path.abspath(filepath)
+            seen.add(key)
+            if changed is not None and key in stamps and key not in changed:
+                continue
+            stat = os.stat(filepath)
+            mtime_ns = stat.st_mtime_ns if stat.st_mtime_ns < racy_limit_ns else -1
+            stamp = stamps.get(key)
+            if stamp and stamp[1] == stat.st_mtime_ns and stamp[2] == stat.st_size:
+                continue
+
+            data = Path(filepath).read_bytes()
+            digest = content_hash(data)
+            if stamp and stamp[3] == digest:
+                conn.execute(
+                    "UPDATE docs SET mtime_ns = ?, size = ? WHERE id = ?",
+                    (mtime_ns, stat.st_size, stamp[0])
+                )
+                continue
+
+            document = documents.get(key) if documents is not None else None
+            if document is None:
+                document = search_document(Path(filepath), parse_prompt(data.decode('utf-8', errors='replace')))
+            title, counts = document
+
+            if stamp:
+                doc_id = stamp[0]
+                for term in stamp[4].split():
+                    changes.setdefault(term, {})[doc_id] = 0
+            else:
+                doc_id = next_id
+                next_id += 1
+            for term, tf in counts.items():
+                changes.setdefault(term, {})[doc_id] = tf
+
+            if len(lengths) <= doc_id:
+                lengths.extend([0] * (doc_id + 1 - len(lengths)))
+            lengths[doc_id] = sum(counts.values())
+            conn.execute(
+                "INSERT OR REPLACE INTO docs (id, path, title, length, terms, mtime_ns, size, digest) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (doc_id, key, title, lengths[doc_id],
+                 " ".join(counts), mtime_ns, stat.st_size, digest)
+            )
+            updated += 1
+
+        # Remove documents for files that no longer exist
+        if root is not None:
+            prefix = os.path.abspath(root).rstrip(os.sep) + os.sep
+            for key, (doc_id, _, _, _, terms) in stamps.items():
+                if key.startswith(prefix) and key not in seen:
+                    for term in terms.split():
+                        changes.setdefault(term, {})[doc_id] = 0
+                    lengths[doc_id] = 0
+                    conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+                    updated += 1
+
+        self._apply_changes(changes)
+        self._set_meta("lengths", lengths.tobytes())
+        self._set_meta("doc_count", sum(1 for length in lengths if length))
+        self._set_meta("total_length", sum(lengths))
+        self._set_meta("tree", worktree_tree(root) if root is not None else None)
+        conn.commit()
+        return updated
+
+    def _apply_changes(self, changes: Dict[str, Dict[int, int]]):
+        """Rewrite the posting lists of every touched term"""
+        conn = self.conn
+        for term, doc_changes in changes.items():
+            row = conn.execute("SELECT data FROM postings WHERE term = ?", (term,)).fetchone()
+            old = array('I')
+            if row:
+                old.frombytes(row[0])
+            new = array('I')
+            for i in range(0, len(old), 2):
+                if old[i] not in doc_changes:
+                    new.append(old[i])
+                    new.append(old[i + 1])
+            for doc_id, tf in doc_changes.items():
+                if tf:
+                    new.append(doc_id)
+                    new.append(tf)
+            if new:
+                conn.execute(
+                    "INSERT OR REPLACE INTO postings (term, data) VALUES (?, ?)",
+                    (term, new.tobytes())
+                )
+            elif row:
+                conn.execute("DELETE FROM postings WHERE term = ?", (term,))
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[float, str, str]]:
+        """Return the top-k (score, path, title) matches for a query"""
+        conn = self.conn
+        lengths = self.lengths
+        doc_count = self._get_meta("doc_count")
+        if not doc_count:
+            return []
+        avg_length = self._get_meta("total_length") / doc_count
+
+        scores: Dict[int, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            row = conn.execute("SELECT data FROM postings WHERE term = ?", (term,)).fetchone()
+            if not row:
+                continue
+            postings = array('I')
+            postings.frombytes(row[0])
+            df = len(postings) // 2
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for i in range(0, len(postings), 2):
+                doc_id, tf = postings[i], postings[i + 1]
+                norm = K1 * (1 - B + B * lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        results = []
+        for doc_id, score in top:
+            path, title = conn.execute(
+                "SELECT path, title FROM docs WHERE id = ?", (doc_id,)
+            ).fetchone()
+            results.append((score, path, title))
+        return results
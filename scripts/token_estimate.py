@@ -0,0 +1,79 @@
+"""
+PromptHub Token Estimates
+
+Dependency-free approximation of how many tokens a prompt costs, for
+comparing prompts by context size without calling a tokenizer service.
+
+The estimate follows how byte-pair tokenizers typically split text: most
+ASCII words are one token and long words split into pieces, digits group in
+threes, punctuation pairs up, a newline together with the indentation after
+it is one token, and non-ASCII characters are counted one token each. Every
+rule is a single regex count, so no Python code runs per word.
+
+The counts are rough: use them to compare prompts and to spot oversized
+ones, not to predict a bill. Measured with scripts/calibrate_tokens.py against
+the tokenizer.json bundled with older releases of the anthropic Python SDK (a
+byte-pair tokenizer from before Claude 3), on 268 samples (115k tokens) of
+this repository's markdown, English READMEs and Python source, the estimates
+run about 5% high overall: the median sample is off by 5%, 90% of samples by
+at most 12%, and the worst sample, dense code, by 44%. On English prose alone
+the overall count is within 1%. Other tokenizers split text differently;
+rerun the calibration against the one you budget for.
+
+Estimates are remembered by content hash for the most recent
+ESTIMATE_CACHE_SIZE texts, so validation and indexing in one process do not
+count the same block twice; across runs the metadata store keeps them.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+from lazy import lazy_pattern
+from prompt_parser import ParsedPrompt
+
+
+# Each match of these patterns counts as one token
+TOKEN_PATTERNS = [
+    # Words, plus one more token for every eight letters in a row
+    lazy_pattern(r'[A-Za-z]+'),
+    lazy_pattern(r'[A-Za-z]{8}'),
+    # Numbers in groups of up to three digits
+    lazy_pattern(r'[0-9]{1,3}'),
+    # ASCII punctuation, two characters at a time
+    lazy_pattern(r'[!-/:-@\[-`{-~]{1,2}'),
+    # Line breaks with the indentation that follows, and runs of spaces
+    lazy_pattern(r'\n\s*|[ \t]{2,}'),
+    # Anything outside ASCII
+    lazy_pattern(r'[^\x00-\x7f]'),
+]
+
+ESTIMATE_CACHE_SIZE = 4096
+
+# Estimates by content digest, least recently used first; prompts with identical text share one entry
+_estimates: "OrderedDict[bytes, int]" = OrderedDict()
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of tokens in text"""
+    return sum(len(pattern.findall(text)) for pattern in TOKEN_PATTERNS)
+
+
+def cached_estimate(text: str) -> int:
+    """estimate_tokens, remembered by the text's content hash"""
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    tokens = _estimates.get(digest)
+    if tokens is None:
+        tokens = _estimates[digest] = estimate_tokens(text)
+        if len(_estimates) > ESTIMATE_CACHE_SIZE:
+            _estimates.popitem(last=False)
+    else:
+        _estimates.move_to_end(digest)
+    return tokens
+
+
+def prompt_tokens(parsed: ParsedPrompt) -> int:
+    """Estimated tokens of the code block in "The Prompt" (0 if there is none)"""
+    blocks = parsed.code_blocks_in("## The Prompt")
+    if not blocks:
+        return 0
+    return cached_estimate(blocks[0].text)
@@ -3,18 +3,45 @@
 PromptHub Prompt Validation Script
 
 Validates that prompt files follow the required format and standards.
+The rules themselves are declared in scripts/validation_rules.json.
 
 Usage:
     python scripts/validate_prompt.py path/to/prompt.md
     python scripts/validate_prompt.py prompts/by-category/coding/  # validate all in directory
+    python scripts/validate_prompt.py prompts/ --jobs 8  # validate in parallel
+    python scripts/validate_prompt.py prompts/ --no-cache  # ignore .prompthub-cache/
+    python scripts/validate_prompt.py prompts/ --duplicate-threshold 0.9  # near-duplicate sensitivity
+    python scripts/validate_prompt.py prompts/ --profile  # report the slowest checks and files
+    python scripts/validate_prompt.py prompts/ --format ndjson  # one JSON record per line, streamed
+    python scripts/validate_prompt.py prompts/ --changed-since origin/main  # only what a branch touched
+    python scripts/validate_prompt.py prompts/ --fix --jobs 0  # fix mechanical errors in place first
 """
 
+import argparse
+import contextlib
+import functools
+import json
+import os
 import sys
 import re
+import time
 from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 from dataclasses import dataclass
 
+from file_cache import CACHE_DIR, FileCache, fingerprint
+from lazy import lazy_import
+from near_duplicates import DEFAULT_THRESHOLD
+from prompt_loader import add_loader_arguments, find_prompt_files, map_files, map_prompts, set_read_ahead
+from prompt_parser import ParsedPrompt, parse_prompt
+from token_estimate import cached_estimate
+from validation_rules import DEFAULT_RULES_PATH, RuleSet, load_rules
+
+if TYPE_CHECKING:
+    from git_changes import PromptChanges
+
+cProfile = lazy_import("cProfile")
+
 
 @dataclass
 class ValidationResult:
@@ -23,57 +50,89 @@ class ValidationResult:
     errors: List[str]
     warnings: List[str]
     filepath: str
+    # Wall time per stage/check in seconds, only recorded when profiling
+    timings: Optional[Dict[str, float]] = None
+
+
+# Called with (filepath, check name, seconds) for every timed check
+TimingHook = Callable[[str, str, float], None]
+
+_timing_hooks: List[TimingHook] = []
+
+
+def add_timing_hook(hook: TimingHook):
+    """Register a callable that receives per-check timings of profiled results"""
+    _timing_hooks.append(hook)
+
+
+def remove_timing_hook(hook: TimingHook):
+    """Unregister a timing hook"""
+    _timing_hooks.remove(hook)
+
+
+def dispatch_timings(results: Iterable[ValidationResult]) -> Iterator[ValidationResult]:
+    """Pass the timings of each result to the registered hooks
+    
+    Hooks run in this process as results arrive, so timings recorded in
+    worker processes reach them too.
+    """
+    for result in results:
+        if result.timings and _timing_hooks:
+            for check, seconds in result.timings.items():
+                for hook in _timing_hooks:
+                    hook(result.filepath, check, seconds)
+        yield result
 
 
 class PromptValidator:
     """Validates prompt files against PromptHub standards"""
     
-    REQUIRED_SECTIONS = [
-        "# ",  # Title
-        "## Metadata",
-        "## Description",
-        "## Use Case",
-        "## The Prompt",
-        "## Variables to Customize",
-        "## Example Input/Output",
-        "## Performance Notes",
-        "## Related Prompts",
-        "## Version History"
-    ]
+    # Declared in validation_rules.json and compiled once per process
+    RULES = load_rules()
     
-    REQUIRED_METADATA = [
-        "**Category**:",
-        "**Difficulty**:",
-        "**Model Compatibility**:",
-        "**Tags**:",
-        "**Author**:",
-        "**Date Added**:",
-        "**Version**:"
-    ]
+    REQUIRED_SECTIONS = RULES.required_sections
+    REQUIRED_METADATA = RULES.required_metadata
+    VALID_CATEGORIES = RULES.valid_categories
+    VALID_DIFFICULTIES = RULES.valid_difficulties
     
-    VALID_CATEGORIES = [
-        "Coding", "Writing", "Analysis", 
-        "Creative", "Education", "Research"
+    CHECKS = [
+        "_check_filename",
+        "_check_required_sections",
+        "_check_metadata",
+        "_check_content_quality",
+        "_check_examples"
     ]
     
-    VALID_DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
-    
-    def __init__(self, filepath: str):
+    def __init__(
+        self,
+        filepath: str,
+        parsed: Optional[ParsedPrompt] = None,
+        profile: bool = False,
+        rules: Optional[RuleSet] = None
+    ):
         self.filepath = Path(filepath)
-        self.content = ""
+        self.profile = profile
+        self.rules = rules or self.RULES
+        # A prompt already parsed by the shared loader skips reading the file again
+        self.parsed = parsed
+        self.content = parsed.content if parsed is not None else ""
         self.errors = []
         self.warnings = []
         
     def validate(self) -> ValidationResult:
         """Run all validation checks"""
-        if not self._load_file():
+        if self.profile:
+            return self._validate_profiled()
+        
+        if self.parsed is None:
+            if not self._load_file():
+                return ValidationResult(False, self.errors, self.warnings, str(self.filepath))
+            self.parsed = parse_prompt(self.content)
+        elif not self._check_suffix():
             return ValidationResult(False, self.errors, self.warnings, str(self.filepath))
             
-        self._check_filename()
-        self._check_required_sections()
-        self._check_metadata()
-        self._check_content_quality()
-        self._check_examples()
+        for check in self.CHECKS:
+            getattr(self, check)()
         
         is_valid = len(self.errors) == 0
         
@@ -84,14 +143,41 @@ class PromptValidator:
             filepath=str(self.filepath)
         )
     
+    def _validate_profiled(self) -> ValidationResult:
+        """Run all validation checks, recording the wall time of each stage"""
+        timings = {}
+        clock = time.perf_counter
+        
+        if self.parsed is None:
+            start = clock()
+            loaded = self._load_file()
+            timings["_load_file"] = clock() - start
+            if not loaded:
+                return ValidationResult(False, self.errors, self.warnings, str(self.filepath), timings)
+            start = clock()
+            self.parsed = parse_prompt(self.content)
+            timings["parse_prompt"] = clock() - start
+        
+        for check in self.CHECKS:
+            start = clock()
+            getattr(self, check)()
+            timings[check] = clock() - start
+        
+        return ValidationResult(
+            is_valid=len(self.errors) == 0,
+            errors=self.errors,
+            warnings=self.warnings,
+            filepath=str(self.filepath),
+            timings=timings
+        )
+    
     def _load_file(self) -> bool:
         """Load the prompt file"""
         if not self.filepath.exists():
             self.errors.append(f"File not found: {self.filepath}")
             return False
             
-        if self.filepath.suffix != ".md":
-            self.errors.append(f"File must be a .md file, got: {self.filepath.suffix}")
+        if not self._check_suffix():
             return False
             
         try:
@@ -101,6 +187,13 @@ class PromptValidator:
             self.errors.append(f"Failed to read file: {e}")
             return False
     
+    def _check_suffix(self) -> bool:
+        """Check the file is a markdown file, whether or not it was loaded here"""
+        if self.filepath.suffix != ".md":
+            self.errors.append(f"File must be a .md file, got: {self.filepath.suffix}")
+            return False
+        return True
+    
     def _check_filename(self):
         """Validate filename follows kebab-case convention"""
         filename = self.filepath.stem
@@ -112,110 +205,116 @@ class PromptValidator:
             )
         
         # Check length
-        if len(filename) > 50:
+        if len(filename) > self.rules.limits["filename_max_length"]:
             self.warnings.append(f"Filename is quite long ({len(filename)} chars). Consider shortening.")
     
     def _check_required_sections(self):
         """Check that all required sections are present"""
-        for section in self.REQUIRED_SECTIONS:
-            if section not in self.content:
+        for section in self.rules.required_sections:
+            if not self.parsed.has_section(section):
                 self.errors.append(f"Missing required section: {section}")
     
     def _check_metadata(self):
         """Validate metadata section"""
+        metadata = self.parsed.metadata
+        
         # Check required fields
-        for field in self.REQUIRED_METADATA:
-            if field not in self.content:
-                self.errors.append(f"Missing required metadata field: {field}")
+        for field in self.rules.required_metadata:
+            if field not in metadata:
+                self.errors.append(f"Missing required metadata field: **{field}**:")
         
         # Extract and validate category
-        category_match = re.search(r'\*\*Category\*\*:\s*(.+)', self.content)
-        if category_match:
-            category = category_match.group(1).strip()
+        category = metadata.get("Category")
+        if category:
             # Remove brackets if present
             category = re.sub(r'[\[\]]', '', category)
             
             # Check if it's one of the valid categories
-            valid_found = any(cat in category for cat in self.VALID_CATEGORIES)
+            valid_found = any(cat in category for cat in self.rules.valid_categories)
             if not valid_found:
                 self.errors.append(
-                    f"Invalid category: {category}. Must be one of: {', '.join(self.VALID_CATEGORIES)}"
+                    f"Invalid category: {category}. Must be one of: {', '.join(self.rules.valid_categories)}"
                 )
         
         # Extract and validate difficulty
-        difficulty_match = re.search(r'\*\*Difficulty\*\*:\s*(.+)', self.content)
-        if difficulty_match:
-            difficulty = difficulty_match.group(1).strip()
+        difficulty = metadata.get("Difficulty")
+        if difficulty:
             difficulty = re.sub(r'[\[\]]', '', difficulty)
             
-            valid_found = any(diff in difficulty for diff in self.VALID_DIFFICULTIES)
+            valid_found = any(diff in difficulty for diff in self.rules.valid_difficulties)
             if not valid_found:
                 self.errors.append(
-                    f"Invalid difficulty: {difficulty}. Must be one of: {', '.join(self.VALID_DIFFICULTIES)}"
+                    f"Invalid difficulty: {difficulty}. Must be one of: {', '.join(self.rules.valid_difficulties)}"
                 )
         
         # Check version format
-        version_match = re.search(r'\*\*Version\*\*:\s*(.+)', self.content)
-        if version_match:
-            version = version_match.group(1).strip()
+        version = metadata.get("Version")
+        if version:
             if not re.match(r'^\d+\.\d+$', version):
                 self.warnings.append(f"Version format should be X.Y (e.g., 1.0): {version}")
         
         # Check date format
-        date_match = re.search(r'\*\*Date Added\*\*:\s*(.+)', self.content)
-        if date_match:
-            date = date_match.group(1).strip()
+        date = metadata.get("Date Added")
+        if date:
             if not re.match(r'^\d{4}-\d{2}-\d{2}$', date):
                 self.errors.append(f"Date must be in YYYY-MM-DD format: {date}")
     
     def _check_content_quality(self):
         """Check content quality indicators"""
+        limits = self.rules.limits
+        
         # Check description length
-        desc_match = re.search(r'## Description\s+(.+?)(?=##)', self.content, re.DOTALL)
-        if desc_match:
-            description = desc_match.group(1).strip()
-            if len(description) < 50:
-                self.warnings.append("Description seems too short (less than 50 characters)")
-            if len(description) > 500:
-                self.warnings.append("Description seems quite long (over 500 characters). Consider being more concise.")
+        description = self.parsed.section_body("## Description")
+        if description is not None:
+            description = description.strip()
+            if len(description) < limits["description_min_length"]:
+                self.warnings.append(
+                    f"Description seems too short (less than {limits['description_min_length']} characters)"
+                )
+            if len(description) > limits["description_max_length"]:
+                self.warnings.append(
+                    f"Description seems quite long (over {limits['description_max_length']} characters). "
+                    "Consider being more concise."
+                )
         
-        # Check for placeholder text
-        placeholders = [
-            "[Your text here]",
-            "[TODO]",
-            "[PLACEHOLDER]",
-            "[Enter",
-            "[Provide"
-        ]
-        for placeholder in placeholders:
-            if placeholder in self.content:
-                self.errors.append(f"Found placeholder text that needs to be filled: {placeholder}")
+        # Check for placeholder text and any other configured needles in one scan
+        for rule, text in self.rules.find_needles(self.content):
+            messages = self.errors if rule.level == "error" else self.warnings
+            messages.append(rule.message.replace("{match}", text))
         
         # Check for prompt content
-        prompt_section = re.search(r'## The Prompt\s+```(.+?)```', self.content, re.DOTALL)
-        if not prompt_section:
+        prompt_blocks = self.parsed.code_blocks_in("## The Prompt")
+        if not prompt_blocks:
             self.errors.append("The Prompt section must contain the prompt in a code block (```)")
         else:
-            prompt_text = prompt_section.group(1).strip()
-            if len(prompt_text) < 50:
+            prompt_text = prompt_blocks[0].text.strip()
+            if len(prompt_text) < limits["prompt_min_length"]:
                 self.warnings.append("The prompt seems very short. Is it complete?")
+            
+            # Check the prompt's estimated size against the token budget, if one is set
+            budget = limits["prompt_max_tokens"]
+            if budget:
+                tokens = cached_estimate(prompt_blocks[0].text)
+                if tokens > budget:
+                    self.warnings.append(
+                        f"The prompt is about {tokens} tokens, over the budget of {budget}. "
+                        "Consider trimming it."
+                    )
         
         # Check for variables documentation
         if "{" in self.content and "}" in self.content:
             # Has variables, should have documentation
-            if "## Variables to Customize" not in self.content:
+            if not self.parsed.has_section("## Variables to Customize"):
                 self.warnings.append("Prompt contains variables but 'Variables to Customize' section might be empty")
     
     def _check_examples(self):
         """Validate examples section"""
-        example_section = re.search(r'## Example Input/Output(.+?)(?=##)', self.content, re.DOTALL)
+        example_content = self.parsed.section_body("## Example Input/Output")
         
-        if not example_section:
+        if not example_content or not example_content.strip():
             self.warnings.append("Could not find Example Input/Output section content")
             return
         
-        example_content = example_section.group(1)
-        
         # Check for input and output
         if "**Input:**" not in example_content and "**Customized Prompt:**" not in example_content:
             self.warnings.append("Examples should show input or customized prompt")
@@ -224,54 +323,201 @@ class PromptValidator:
             self.warnings.append("Examples should show output")
         
         # Check for code blocks in examples
-        code_blocks = re.findall(r'```', example_content)
-        if len(code_blocks) < 2:
+        if not self.parsed.code_blocks_in("## Example Input/Output"):
             self.warnings.append("Examples should use code blocks (```) for better formatting")
 
 
-def validate_directory(directory: Path) -> List[ValidationResult]:
+def validate_file(filepath: Path, profile: bool = False) -> ValidationResult:
+    """Validate a single prompt file (module-level so worker processes can run it)"""
+    return PromptValidator(filepath, profile=profile).validate()
+
+
+def validate_parsed(filepath: Path, parsed: Optional[ParsedPrompt]) -> ValidationResult:
+    """Validate a prompt loaded by map_prompts (None lets the validator report the read error)"""
+    return PromptValidator(filepath, parsed=parsed).validate()
+
+
+def iter_validate(filepaths: List[Path], jobs: int = 1, profile: bool = False) -> Iterator[ValidationResult]:
+    """Validate files and yield each result as soon as it is ready
+    
+    With jobs > 1 the files are spread across a process pool and results are
+    yielded in completion order rather than input order.
+    """
+    if profile:
+        # Loading in the validator keeps read and parse times in the profile
+        return dispatch_timings(map_files(functools.partial(validate_file, profile=True), filepaths, jobs))
+    return map_prompts(validate_parsed, filepaths, jobs)
+
+
+def rules_fingerprint() -> str:
+    """Fingerprint of the validator rules, used to invalidate cached results"""
+    scripts_dir = Path(__file__).resolve().parent
+    return fingerprint(
+        DEFAULT_RULES_PATH,
+        scripts_dir / "validation_rules.py",
+        scripts_dir / "validate_prompt.py",
+        scripts_dir / "prompt_parser.py",
+        scripts_dir / "prompt_loader.py",
+        scripts_dir / "token_estimate.py"
+    )
+
+
+def open_validation_cache(cache_dir: Path = CACHE_DIR) -> FileCache:
+    """Load the on-disk validation cache"""
+    return FileCache(cache_dir / "validate.pickle", rules_fingerprint()).load()
+
+
+def result_to_record(result: ValidationResult) -> tuple:
+    """Convert a result to the compact form kept in the validation cache"""
+    return (result.is_valid, result.errors, result.warnings)
+
+
+def result_from_record(filepath: Path, record: tuple) -> ValidationResult:
+    """Rebuild a result from the validation cache"""
+    is_valid, errors, warnings = record
+    return ValidationResult(is_valid, list(errors), list(warnings), str(filepath))
+
+
+def iter_validate_cached(
+    filepaths: List[Path], cache: FileCache, jobs: int = 1
+) -> Iterator[ValidationResult]:
+    """Yield cached results for unchanged files, then validate the rest"""
+    pending = {}
+    for filepath in filepaths:
+        cached, state = cache.lookup(filepath)
+        if cached is None:
+            pending[str(filepath)] = state
+        else:
+            yield result_from_record(filepath, cached)
+    
+    for result in iter_validate([Path(p) for p in pending], jobs):
+        cache.store(pending[result.filepath], result_to_record(result))
+        yield result
+
+
+def find_corpus_warnings(
+    directory: Path,
+    filepaths: List[Path],
+    duplicate_threshold: Optional[float] = DEFAULT_THRESHOLD,
+    jobs: int = 1,
+    use_cache: bool = True,
+    cache_dir: Path = CACHE_DIR,
+    check_references: bool = True,
+    changes: Optional["PromptChanges"] = None,
+    signatures: Optional[Dict[str, bytes]] = None,
+    references: Optional[Dict[str, Tuple[str, List[str]]]] = None
+) -> Dict[str, List[str]]:
+    """Run the corpus-level checks (near-duplicate prompts, Related Prompts references) over a directory
+    
+    A check is skipped when duplicate_threshold is None or check_references is False.
+    With changes, files outside the diff use cached values unchecked (if the
+    cache was recorded from the ref's tree) and only warnings around the
+    changed and removed files are returned. signatures and references hold
+    the MinHash signatures and the (title, related items) of files the caller
+    already parsed (see near_duplicates.load_signatures and
+    cross_references.load_reference_records).
+    """
+    from cross_references import open_reference_cache, reference_warnings
+    from git_changes import worktree_tree
+    from near_duplicates import duplicate_warnings, open_signature_cache
+    
+    changed = changes.changed_keys if changes is not None else None
+    removed = changes.removed if changes is not None else []
+    checks = []
+    if duplicate_threshold is not None:
+        checks.append((
+            open_signature_cache,
+            lambda cache: duplicate_warnings(filepaths, duplicate_threshold, jobs, cache, changed, signatures)
+        ))
+    if check_references:
+        checks.append((
+            open_reference_cache,
+            lambda cache: reference_warnings(filepaths, jobs, cache, changed, removed, references)
+        ))
+    
+    # Every file is looked up by both checks, so afterwards the caches match the tree checked out now
+    tree = worktree_tree(directory) if use_cache and checks else None
+    warnings: Dict[str, List[str]] = {}
+    for open_cache, check in checks:
+        cache = open_cache(cache_dir) if use_cache else None
+        if cache is not None and changes is not None:
+            cache.expect_tree(changes.tree)
+        for path, messages in check(cache).items():
+            warnings.setdefault(path, []).extend(messages)
+        if cache is not None:
+            cache.prune(directory)
+            cache.record_tree(tree)
+            cache.save()
+    return warnings
+
+
+def files_to_report(
+    filepaths: List[Path], changes: "PromptChanges", corpus_warnings: Dict[str, List[str]]
+) -> List[Path]:
+    """The files a --changed-since run validates: the changed ones and those the change gave corpus warnings"""
+    changed = changes.changed_keys
+    return [
+        filepath for filepath in filepaths
+        if os.path.abspath(filepath) in changed or str(filepath) in corpus_warnings
+    ]
+
+
+def add_corpus_warnings(
+    results: Iterable[ValidationResult], corpus_warnings: Dict[str, List[str]]
+) -> Iterator[ValidationResult]:
+    """Attach corpus-level warnings to the per-file results"""
+    for result in results:
+        extra = corpus_warnings.get(result.filepath)
+        if extra:
+            # Copy rather than extend: the original list may be held by the cache
+            result.warnings = result.warnings + extra
+        yield result
+
+
+def validate_directory(directory: Path, jobs: int = 1) -> List[ValidationResult]:
     """Validate all .md files in a directory"""
-    results = []
+    return list(iter_validate(find_prompt_files(directory), jobs))
+
+
+def print_result(result: ValidationResult):
+    """Print a single validation result"""
+    status = "✓ PASS" if result.is_valid else "✗ FAIL"
+    color = "\033[92m" if result.is_valid else "\033[91m"
+    reset = "\033[0m"
     
-    for filepath in directory.rglob("*.md"):
-        # Skip README and other documentation files
-        if filepath.name.upper() in ["README.MD", "CONTRIBUTING.MD", "LICENSE.MD"]:
-            continue
-        
-        validator = PromptValidator(filepath)
-        result = validator.validate()
-        results.append(result)
+    print(f"{color}{status}{reset} {result.filepath}")
+    
+    if result.errors:
+        print(f"  Errors ({len(result.errors)}):")
+        for error in result.errors:
+            print(f"    ✗ {error}")
     
-    return results
+    if result.warnings:
+        print(f"  Warnings ({len(result.warnings)}):")
+        for warning in result.warnings:
+            print(f"    ⚠ {warning}")
+    
+    print(flush=True)
 
 
-def print_results(results: List[ValidationResult]):
-    """Print validation results in a readable format"""
-    total = len(results)
-    valid = sum(1 for r in results if r.is_valid)
+def print_results(results: Iterable[ValidationResult]) -> int:
+    """Print validation results as they arrive, followed by a summary
     
-    print(f"\n{'='*70}")
-    print(f"VALIDATION RESULTS: {valid}/{total} files passed")
-    print(f"{'='*70}\n")
+    Returns the process exit code: 0 if every file passed, 1 otherwise.
+    """
+    total = 0
+    valid = 0
     
+    print()
     for result in results:
-        status = "✓ PASS" if result.is_valid else "✗ FAIL"
-        color = "\033[92m" if result.is_valid else "\033[91m"
-        reset = "\033[0m"
-        
-        print(f"{color}{status}{reset} {result.filepath}")
-        
-        if result.errors:
-            print(f"  Errors ({len(result.errors)}):")
-            for error in result.errors:
-                print(f"    ✗ {error}")
-        
-        if result.warnings:
-            print(f"  Warnings ({len(result.warnings)}):")
-            for warning in result.warnings:
-                print(f"    ⚠ {warning}")
-        
-        print()
+        total += 1
+        if result.is_valid:
+            valid += 1
+        print_result(result)
+    
+    print(f"{'='*70}")
+    print(f"VALIDATION RESULTS: {valid}/{total} files passed")
+    print(f"{'='*70}\n")
     
     if valid == total:
         print("🎉 All prompts are valid!\n")
@@ -281,29 +527,310 @@ def print_results(results: List[ValidationResult]):
         return 1
 
 
-def main():
-    """Main entry point"""
-    if len(sys.argv) < 2:
-        print("Usage: python validate_prompt.py <path/to/prompt.md or directory>")
-        sys.exit(1)
+def result_to_dict(result: ValidationResult) -> dict:
+    """Convert a result to a JSON-serializable record"""
+    record = {
+        "filepath": result.filepath,
+        "is_valid": result.is_valid,
+        "errors": result.errors,
+        "warnings": result.warnings
+    }
+    if result.timings:
+        record["timings"] = result.timings
+    return record
+
+
+def summary_record(total: int, valid: int) -> dict:
+    """Build the summary record written after all results"""
+    return {
+        "total": total,
+        "valid": valid,
+        "invalid": total - valid,
+        "exit_code": 0 if valid == total else 1
+    }
+
+
+def write_ndjson(results: Iterable[ValidationResult], stream: TextIO = None) -> int:
+    """Write one JSON record per result as it arrives, then a summary record
+    
+    Memory use stays constant: nothing is kept once a record is written.
+    """
+    stream = stream or sys.stdout
+    total = 0
+    valid = 0
+    
+    for result in results:
+        total += 1
+        if result.is_valid:
+            valid += 1
+        record = {"type": "result"}
+        record.update(result_to_dict(result))
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        stream.flush()
+    
+    summary = {"type": "summary"}
+    summary.update(summary_record(total, valid))
+    stream.write(json.dumps(summary) + "\n")
+    stream.flush()
+    return summary["exit_code"]
+
+
+def write_json(results: Iterable[ValidationResult], stream: TextIO = None) -> int:
+    """Write a single JSON document, streaming each result into its results array"""
+    stream = stream or sys.stdout
+    total = 0
+    valid = 0
     
-    path = Path(sys.argv[1])
+    stream.write('{"results": [')
+    for result in results:
+        if total:
+            stream.write(",")
+        total += 1
+        if result.is_valid:
+            valid += 1
+        stream.write("\n  " + json.dumps(result_to_dict(result), ensure_ascii=False))
+        stream.flush()
+    
+    summary = summary_record(total, valid)
+    stream.write(f"\n], \"summary\": {json.dumps(summary)}}}\n")
+    stream.flush()
+    return summary["exit_code"]
+
+
+# Output formats: each consumes results as they arrive and returns the exit code
+REPORTERS = {
+    "text": print_results,
+    "ndjson": write_ndjson,
+    "json": write_json
+}
+
+
+@contextlib.contextmanager
+def diagnostics_to_stderr(output_format: str):
+    """Keep human-readable messages out of machine-readable output"""
+    if output_format == "text":
+        yield
+    else:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+
+
+def list_changes(changed_since: str, path: Path) -> Optional["PromptChanges"]:
+    """Prompts changed since the git ref, or None after printing why git cannot list them"""
+    from git_changes import changed_prompts
+    try:
+        return changed_prompts(changed_since, path)
+    except ValueError as e:
+        print(f"Error: Cannot list changes since {changed_since}: {e}")
+        return None
+
+
+def run_validation(
+    path: Path,
+    jobs: int = 1,
+    use_cache: bool = True,
+    cache_dir: Path = CACHE_DIR,
+    duplicate_threshold: Optional[float] = DEFAULT_THRESHOLD,
+    profile: bool = False,
+    profile_top: int = 10,
+    profile_output: Optional[Path] = None,
+    output_format: str = "text",
+    check_references: bool = True,
+    changed_since: Optional[str] = None,
+    fix: bool = False
+) -> int:
+    """Validate a file or directory, print the results and return the exit code
+    
+    Directories also get the corpus-level near-duplicate check unless
+    duplicate_threshold is None, and the Related Prompts reference check
+    unless check_references is False. With changed_since (a git ref), only
+    prompts changed since the ref, and those whose corpus-level warnings the
+    change affects, are validated. Profiling validates every file (bypassing
+    the cache) and reports the slowest checks and files; profile_output also
+    dumps cProfile statistics, which requires running in this process. With
+    fix, the mechanically fixable errors (see prompt_fixer) are fixed in place
+    first, in the files that would be validated.
+    output_format is one of REPORTERS; for machine-readable formats all other
+    messages go to stderr.
+    """
+    report = REPORTERS[output_format]
     
     if not path.exists():
         print(f"Error: Path does not exist: {path}")
-        sys.exit(1)
+        return 1
     
     if path.is_file():
-        validator = PromptValidator(path)
-        result = validator.validate()
-        results = [result]
+        filepaths = [path]
     elif path.is_dir():
-        results = validate_directory(path)
+        filepaths = find_prompt_files(path)
     else:
         print(f"Error: Path must be a file or directory: {path}")
-        sys.exit(1)
+        return 1
+    
+    changes = None
+    if changed_since is not None and path.is_dir():
+        changes = list_changes(changed_since, path)
+        if changes is None:
+            return 1
+        with diagnostics_to_stderr(output_format):
+            print(f"Prompts changed: {changes.summary()}")
+    
+    if fix:
+        from prompt_fixer import fix_prompts, print_fixes
+        to_fix = filepaths
+        if changes is not None:
+            changed = changes.changed_keys
+            to_fix = [filepath for filepath in filepaths if os.path.abspath(filepath) in changed]
+        with diagnostics_to_stderr(output_format):
+            fixes = fix_prompts(to_fix, PromptValidator.RULES, jobs)
+            print_fixes(fixes)
+        if any(result.renamed for result in fixes):
+            # Validate the files under their new names
+            if path.is_dir():
+                filepaths = find_prompt_files(path)
+                if changes is not None:
+                    changes = list_changes(changed_since, path)
+                    if changes is None:
+                        return 1
+            else:
+                path = fixes[0].path
+                filepaths = [path]
+    
+    corpus_warnings = {}
+    if path.is_dir():
+        corpus_warnings = find_corpus_warnings(
+            path, filepaths, duplicate_threshold, jobs, use_cache, cache_dir, check_references, changes
+        )
+    if changes is not None:
+        filepaths = files_to_report(filepaths, changes, corpus_warnings)
+    
+    if profile or profile_output:
+        if profile_output and jobs > 1:
+            print("Note: --profile-output runs in a single process; ignoring --jobs.", file=sys.stderr)
+            jobs = 1
+        from validation_profile import ValidationProfiler
+        profiler = ValidationProfiler()
+        add_timing_hook(profiler.record)
+        results = add_corpus_warnings(iter_validate(filepaths, jobs, profile=True), corpus_warnings)
+        try:
+            if profile_output:
+                with cProfile.Profile() as stats:
+                    exit_code = report(results)
+                stats.dump_stats(str(profile_output))
+            else:
+                exit_code = report(results)
+        finally:
+            remove_timing_hook(profiler.record)
+        with diagnostics_to_stderr(output_format):
+            profiler.print_report(profile_top)
+            if profile_output:
+                print(f"✓ cProfile statistics written to: {profile_output}\n")
+        return exit_code
+    
+    # Checking one file is cheaper than loading the cache of the whole tree
+    if not use_cache or path.is_file():
+        return report(add_corpus_warnings(iter_validate(filepaths, jobs), corpus_warnings))
+    
+    cache = open_validation_cache(cache_dir)
+    exit_code = report(
+        add_corpus_warnings(iter_validate_cached(filepaths, cache, jobs), corpus_warnings)
+    )
+    # A diff-scoped run does not look at every file, so it cannot tell which entries are stale
+    if path.is_dir() and changes is None:
+        cache.prune(path)
+    cache.save()
+    return exit_code
+
+
+def add_validation_arguments(parser: argparse.ArgumentParser):
+    """Add the options shared by every command that validates prompts"""
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of worker processes for directory validation (0 = one per CPU)"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Validate every file instead of reusing cached results"
+    )
+    parser.add_argument(
+        "--cache-dir", type=Path, default=CACHE_DIR,
+        help=f"Directory for the validation cache (default: {CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--format", dest="output_format", choices=sorted(REPORTERS), default="text",
+        help="Output format: colored text, streamed NDJSON records, or one JSON document (default: text)"
+    )
+    parser.add_argument(
+        "--duplicate-threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"Similarity above which prompts are reported as near-duplicates (default: {DEFAULT_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--no-duplicates", action="store_true",
+        help="Skip the corpus-level near-duplicate check"
+    )
+    parser.add_argument(
+        "--no-references", action="store_true",
+        help="Skip the corpus-level check of Related Prompts links"
+    )
+    parser.add_argument(
+        "--changed-since", metavar="REF",
+        help="Only validate prompts changed since this git ref (and those their changes affect)"
+    )
+    add_loader_arguments(parser)
+
+
+def add_fix_arguments(parser: argparse.ArgumentParser):
+    """Add the auto-fix option"""
+    parser.add_argument(
+        "--fix", action="store_true",
+        help="Fix missing Date Added/Version fields, missing sections, bracketed values "
+             "and non-kebab-case filenames in place before validating"
+    )
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """Add the profiling options"""
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Time every check and report the slowest checks and files (bypasses the cache)"
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=10,
+        help="Number of slowest files to report (default: 10)"
+    )
+    parser.add_argument(
+        "--profile-output", type=Path,
+        help="Also dump cProfile statistics to this file (readable with pstats)"
+    )
+
+
+def duplicate_threshold_from_args(args: argparse.Namespace) -> Optional[float]:
+    """Return the near-duplicate threshold, or None when the check is disabled"""
+    return None if args.no_duplicates else args.duplicate_threshold
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Translate a --jobs value into a worker count (0 = one per CPU)"""
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Validate PromptHub prompt files."
+    )
+    parser.add_argument("path", help="Prompt file or directory to validate")
+    add_validation_arguments(parser)
+    add_fix_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    set_read_ahead(args.read_ahead)
     
-    exit_code = print_results(results)
+    exit_code = run_validation(
+        Path(args.path), resolve_jobs(args.jobs), not args.no_cache, args.cache_dir,
+        duplicate_threshold_from_args(args), args.profile, args.profile_top, args.profile_output,
+        args.output_format, not args.no_references, args.changed_since, args.fix
+    )
     sys.exit(exit_code)
 
 
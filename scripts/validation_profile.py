@@ -0,0 +1,60 @@
+"""
+PromptHub Validation Profiling
+
+Aggregates the per-check timings recorded by PromptValidator when profiling is
+enabled and reports the slowest checks and files. ValidationProfiler.record
+has the timing-hook signature, so it is registered with
+validate_prompt.add_timing_hook like any other consumer (for example a
+metrics exporter).
+"""
+
+from typing import Dict, List, Tuple
+
+
+class ValidationProfiler:
+    """Collects wall time per check and per file"""
+
+    def __init__(self):
+        # check -> [total seconds, calls, max seconds]
+        self.checks: Dict[str, List[float]] = {}
+        self.files: Dict[str, float] = {}
+
+    def record(self, filepath: str, check: str, seconds: float):
+        """Timing hook: record one check run on one file"""
+        stats = self.checks.setdefault(check, [0.0, 0, 0.0])
+        stats[0] += seconds
+        stats[1] += 1
+        stats[2] = max(stats[2], seconds)
+        self.files[filepath] = self.files.get(filepath, 0.0) + seconds
+
+    def slowest_checks(self) -> List[Tuple[str, float, int, float]]:
+        """Return (check, total, calls, max) sorted by total time"""
+        return sorted(
+            ((check, total, int(calls), slowest) for check, (total, calls, slowest) in self.checks.items()),
+            key=lambda item: -item[1]
+        )
+
+    def slowest_files(self, top: int = 10) -> List[Tuple[str, float]]:
+        """Return the files with the largest total validation time"""
+        return sorted(self.files.items(), key=lambda item: -item[1])[:top]
+
+    def print_report(self, top: int = 10):
+        """Print the slowest checks and files"""
+        total = sum(self.files.values())
+        print(f"{'='*70}")
+        print(f"PROFILE: {len(self.files)} files, {total * 1000:.1f} ms in checks")
+        print(f"{'='*70}\n")
+
+        print("Slowest checks:")
+        print(f"  {'check':<28} {'total ms':>10} {'mean µs':>10} {'max ms':>9} {'share':>7}")
+        for check, check_total, calls, slowest in self.slowest_checks():
+            share = (check_total / total * 100) if total > 0 else 0
+            print(
+                f"  {check:<28} {check_total * 1000:>10.2f} {check_total / calls * 1e6:>10.1f} "
+                f"{slowest * 1000:>9.3f} {share:>6.1f}%"
+            )
+
+        print(f"\nSlowest files (top {top}):")
+        for filepath, seconds in self.slowest_files(top):
+            print(f"  {seconds * 1000:>9.3f} ms  {filepath}")
+        print()
@@ -0,0 +1,119 @@
+"""
+PromptHub Validation Rules
+
+Loads the declarative rule set used by PromptValidator from
+validation_rules.json: required sections and metadata fields, allowed
+categories and difficulties, length limits, an optional token budget for the
+prompt (prompt_max_tokens, 0 = off), and "needles" - literal strings or
+regular expressions that must not appear in a prompt.
+
+Sections and metadata fields are looked up in the single-pass parse from
+prompt_parser. All needles are compiled into one alternation regex, so a file
+is scanned once no matter how many needle rules are configured; it is compiled
+on the first scan, so commands that never scan pay nothing for it. When needles
+overlap at the same position, the one listed first is reported.
+
+Example needle rules:
+    {"literal": "[TODO]", "level": "error", "message": "Found placeholder text that needs to be filled: {match}"}
+    {"regex": "lorem ipsum", "ignore_case": true, "level": "warning", "message": "Filler text: {match}"}
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from lazy import LazyPattern, lazy_pattern
+
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "validation_rules.json"
+
+LEVELS = ["error", "warning"]
+
+# Used for any limit the rules file leaves out
+DEFAULT_LIMITS = {
+    "filename_max_length": 50,
+    "description_min_length": 50,
+    "description_max_length": 500,
+    "prompt_min_length": 50,
+    # Warn when the prompt's estimated tokens exceed this; 0 turns the check off
+    "prompt_max_tokens": 0
+}
+
+
+@dataclass
+class NeedleRule:
+    """A literal or pattern reported once per file when found"""
+    pattern: str
+    level: str
+    message: str
+
+
+@dataclass
+class RuleSet:
+    """Validation rules compiled from a rules file"""
+    required_sections: List[str]
+    required_metadata: List[str]
+    valid_categories: List[str]
+    valid_difficulties: List[str]
+    limits: Dict[str, int]
+    needles: List[NeedleRule] = field(default_factory=list)
+    # One named group per needle rule, in rule order
+    matcher: Optional[LazyPattern] = None
+
+    def find_needles(self, content: str) -> List[Tuple[NeedleRule, str]]:
+        """Return (rule, first matched text) for every needle found, in rule order"""
+        if self.matcher is None:
+            return []
+        found: Dict[int, str] = {}
+        for match in self.matcher.finditer(content):
+            index = int(match.lastgroup[1:])
+            if index not in found:
+                found[index] = match.group(0)
+                if len(found) == len(self.needles):
+                    break
+        return [(self.needles[index], found[index]) for index in sorted(found)]
+
+
+def compile_needle(rule: dict, path: Path) -> NeedleRule:
+    """Validate one needle rule from the rules file"""
+    level = rule.get("level", "error")
+    if level not in LEVELS:
+        raise ValueError(f"Invalid needle level in {path}: {level}. Must be one of: {', '.join(LEVELS)}")
+    if "literal" in rule:
+        pattern = re.escape(rule["literal"])
+    elif "regex" in rule:
+        pattern = rule["regex"]
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid needle regex in {path}: {pattern}: {e}")
+    else:
+        raise ValueError(f"Needle rule in {path} needs a 'literal' or 'regex': {rule}")
+    if rule.get("ignore_case"):
+        pattern = f"(?i:{pattern})"
+    return NeedleRule(pattern, level, rule.get("message", "Found forbidden text: {match}"))
+
+
+def load_rules(path: Path = DEFAULT_RULES_PATH) -> RuleSet:
+    """Read a rules file and compile its needles into a single matcher"""
+    try:
+        config = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not load validation rules from {path}: {e}")
+
+    needles = [compile_needle(rule, path) for rule in config.get("needles", [])]
+    matcher = None
+    if needles:
+        matcher = lazy_pattern("|".join(f"(?P<n{i}>{rule.pattern})" for i, rule in enumerate(needles)))
+
+    return RuleSet(
+        required_sections=config.get("required_sections", []),
+        required_metadata=config.get("required_metadata", []),
+        valid_categories=config.get("valid_categories", []),
+        valid_difficulties=config.get("valid_difficulties", []),
+        limits={**DEFAULT_LIMITS, **config.get("limits", {})},
+        needles=needles,
+        matcher=matcher
+    )
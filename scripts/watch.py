@@ -0,0 +1,605 @@
+"""
+PromptHub Watch Mode
+
+Long-running companion to `prompthub.py all` for authors editing prompts. The
+prompts directory is parsed once at startup and every prompt's parse,
+validation result and index metadata are kept in memory. The tree is then
+polled: every interval only the directories and the recently changed files
+are stat'ed, a directory whose mtime changed (a file was added, removed or
+saved by rename) is listed again, and every --rescan seconds the whole tree is
+stat'ed to catch in-place edits of other files. Changes are debounced so a
+burst of saves is handled once, and only the touched files are re-read and
+revalidated.
+
+INDEX.md is patched rather than rebuilt: touched prompts are moved between the
+category groups and the category, difficulty and tag counts, and only the
+category tables they belong to are re-rendered, from table rows cached per
+prompt. The "Referenced By" counts are kept up to date the same way: only the
+references a change can affect are resolved again, and only the rows whose
+counts moved are re-rendered. The index is rewritten only when its content
+(ignoring the "Last updated" line) changes.
+
+The corpus-level checks are not run in watch mode: neither the near-duplicate
+check nor the Related Prompts cross-reference check (dangling links and
+orphans). Both run with `prompthub.py validate` and `prompthub.py all`.
+
+Usage:
+    python scripts/prompthub.py watch prompts/
+    python scripts/prompthub.py watch prompts/ --interval 0.05 --debounce 0.1 --rescan 5
+"""
+
+import heapq
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from cross_references import ReferenceGraph, parse_item
+from file_cache import content_hash
+from generate_index import CATEGORIES, DIFFICULTY_ORDER, IndexGenerator, PromptMetadata, index_body
+from prompt_loader import SKIPPED_FILES, map_files
+from prompt_parser import ParsedPrompt, parse_prompt
+from validate_prompt import PromptValidator, ValidationResult, print_result
+
+
+DEFAULT_INTERVAL = 0.1
+DEFAULT_DEBOUNCE = 0.05
+DEFAULT_RESCAN = 2.0
+
+# Recently changed files, stat'ed on every poll
+HOT_FILES = 100
+
+# Prompts listed under Recently Added, as in IndexGenerator.generate_recent_section
+RECENT_LIMIT = 10
+TAG_LIMIT = 30
+
+# path -> (mtime_ns, size)
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+@dataclass
+class WatchedPrompt:
+    """In-memory state kept for one prompt file"""
+    digest: Optional[str]
+    parsed: Optional[ParsedPrompt]
+    result: ValidationResult
+    metadata: Optional[PromptMetadata]
+
+
+@dataclass
+class DirectoryState:
+    """One directory's listing, as of its mtime"""
+    mtime_ns: int
+    files: Snapshot
+    subdirectories: List[str]
+
+
+def scan_directory(path: str) -> Optional[DirectoryState]:
+    """Stat the prompt files directly in a directory and list its subdirectories (None if it is gone)"""
+    files: Snapshot = {}
+    subdirectories = []
+    try:
+        # Before listing, so a change made while listing shows up on the next poll
+        mtime_ns = os.stat(path).st_mtime_ns
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.name.endswith(".md") and entry.name.upper() not in SKIPPED_FILES:
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # Removed between listing and stat
+                        continue
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return DirectoryState(mtime_ns, files, subdirectories)
+
+
+def scan_tree(directory: Path, tree: Optional[Dict[str, DirectoryState]] = None) -> Snapshot:
+    """Stat every prompt file under a directory, recording each directory's listing in tree if given"""
+    snapshot: Snapshot = {}
+    stack = [str(directory)]
+    while stack:
+        path = stack.pop()
+        state = scan_directory(path)
+        if state is None:
+            continue
+        if tree is not None:
+            tree[path] = state
+        snapshot.update(state.files)
+        stack.extend(state.subdirectories)
+    return snapshot
+
+
+def drop_directory(tree: Dict[str, DirectoryState], snapshot: Snapshot, path: str):
+    """Forget a directory, its files and everything below it"""
+    state = tree.pop(path, None)
+    if state is None:
+        return
+    for filepath in state.files:
+        snapshot.pop(filepath, None)
+    for subdirectory in state.subdirectories:
+        drop_directory(tree, snapshot, subdirectory)
+
+
+def analyze_prompt(filepath: Path) -> Tuple[str, WatchedPrompt]:
+    """Read, parse, validate and extract metadata for one file"""
+    try:
+        data = filepath.read_bytes()
+        parsed = parse_prompt(data.decode('utf-8'))
+    except (OSError, UnicodeDecodeError):
+        # Let the validator report why the file could not be read
+        return str(filepath), WatchedPrompt(None, None, PromptValidator(filepath).validate(), None)
+
+    result = PromptValidator(filepath, parsed=parsed).validate()
+    try:
+        metadata = IndexGenerator().metadata_from_parsed(filepath, parsed)
+    except Exception as e:
+        print(f"Warning: Failed to process {filepath}: {e}", file=sys.stderr)
+        metadata = None
+    return str(filepath), WatchedPrompt(content_hash(data), parsed, result, metadata)
+
+
+def ordered_counts(
+    counts: Dict[str, int],
+    prompts: Iterable[PromptMetadata],
+    values: Callable[[PromptMetadata], List[str]],
+    text_key: Optional[Callable[[str], str]] = None
+) -> List[Tuple[str, int]]:
+    """(value, count) pairs, most common first, in the order IndexGenerator gives them
+
+    IndexGenerator counts while iterating the prompts sorted by title, so ties are
+    in the order of each value's first title; that is only looked up for ties.
+    """
+    keys = {value: (-count, text_key(value) if text_key else "") for value, count in counts.items()}
+    repeated = {key for key, number in Counter(keys.values()).items() if number > 1}
+    tied = {value for value, key in keys.items() if key in repeated}
+
+    first_titles: Dict[str, str] = {}
+    if tied:
+        for prompt in prompts:
+            title = prompt.title.lower()
+            for value in values(prompt):
+                if value in tied and (value not in first_titles or title < first_titles[value]):
+                    first_titles[value] = title
+    return sorted(counts.items(), key=lambda item: keys[item[0]] + (first_titles.get(item[0], ""),))
+
+
+class ReferenceCounts:
+    """The "Referenced By" counts of a changing set of prompts
+
+    References are resolved like ReferenceGraph does, but when a prompt is
+    added, removed or changed only the references that can resolve
+    differently are resolved again: the prompt's own, and those naming its
+    path or its old or new title.
+    """
+
+    def __init__(self):
+        # Path -> (title, related items)
+        self.records: Dict[str, Tuple[str, List[str]]] = {}
+        # Normalized path -> path, and lowercased title -> paths with that title
+        self.paths: Dict[str, str] = {}
+        self.titles: Dict[str, Set[str]] = {}
+        # Path -> the paths it references, and the ("link", normalized path) and
+        # ("title", lowercased title) keys it mentions, resolved or not
+        self.targets: Dict[str, List[str]] = {}
+        self.mentions: Dict[str, Set[Tuple[str, str]]] = {}
+        self.mentioned_by: Dict[Tuple[str, str], Set[str]] = {}
+        # Normalized path -> number of other prompts referencing it
+        self.counts: Dict[str, int] = {}
+
+    def resolve(self, source: str) -> Tuple[List[str], Set[Tuple[str, str]]]:
+        """Return the paths source references and the keys it mentions"""
+        targets: List[str] = []
+        mentions: Set[Tuple[str, str]] = set()
+        for item in self.records[source][1]:
+            for kind, value in parse_item(item):
+                if kind == "title":
+                    key = value.casefold()
+                    # The first path in sorted order, like ReferenceGraph.titles
+                    target = min(self.titles[key]) if key in self.titles else None
+                else:
+                    key = ReferenceGraph.link_target(source, value)
+                    target = self.paths.get(key) if key is not None else None
+                if key is not None:
+                    mentions.add((kind, key))
+                if target is not None and target != source and target not in targets:
+                    targets.append(target)
+        return targets, mentions
+
+    def update(self, path: str, title: Optional[str], items: List[str]) -> Set[str]:
+        """Replace a prompt's title and related items (None removes it); return the normalized paths whose counts moved"""
+        normalized = os.path.normpath(path)
+        previous = self.records.pop(path, None)
+        if previous is not None and title is not None and previous[0] == title:
+            stale = {path}
+        else:
+            # Adding or removing a path or changing a title can change what other references resolve to
+            stale = {path} | self.mentioned_by.get(("link", normalized), set())
+            for old_title in ([previous[0]] if previous is not None else []) + ([title] if title is not None else []):
+                stale |= self.mentioned_by.get(("title", old_title.casefold()), set())
+            if previous is not None:
+                self.paths.pop(normalized, None)
+                paths = self.titles[previous[0].casefold()]
+                paths.discard(path)
+                if not paths:
+                    del self.titles[previous[0].casefold()]
+            if title is not None:
+                self.paths[normalized] = path
+                self.titles.setdefault(title.casefold(), set()).add(path)
+        if title is not None:
+            self.records[path] = (title, items)
+
+        # Normalized path -> its count before the update
+        before: Dict[str, int] = {}
+
+        def adjust(target: str, step: int):
+            key = os.path.normpath(target)
+            before.setdefault(key, self.counts.get(key, 0))
+            count = self.counts.get(key, 0) + step
+            if count:
+                self.counts[key] = count
+            else:
+                del self.counts[key]
+
+        for source in stale:
+            for target in self.targets.pop(source, []):
+                adjust(target, -1)
+            for key in self.mentions.pop(source, ()):
+                sources = self.mentioned_by[key]
+                sources.discard(source)
+                if not sources:
+                    del self.mentioned_by[key]
+            if source not in self.records:
+                continue
+            targets, mentions = self.resolve(source)
+            self.targets[source], self.mentions[source] = targets, mentions
+            for target in targets:
+                adjust(target, 1)
+            for key in mentions:
+                self.mentioned_by.setdefault(key, set()).add(source)
+        return {key for key, count in before.items() if self.counts.get(key, 0) != count}
+
+
+class RowCachingGenerator(IndexGenerator):
+    """IndexGenerator that keeps each prompt's table row until it is invalidated"""
+
+    def __init__(self, prompts_dir: Path):
+        super().__init__(prompts_dir)
+        self.rows: Dict[str, str] = {}
+
+    def prompt_row(self, prompt: PromptMetadata, base_dir: Optional[Path] = None) -> str:
+        if base_dir is not None:
+            return super().prompt_row(prompt, base_dir)
+        key = os.path.normpath(prompt.filepath)
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = super().prompt_row(prompt)
+        return row
+
+
+class IndexSections:
+    """INDEX.md for a changing set of prompts, re-rendering only the sections a change touches
+
+    Renders the same markdown as IndexGenerator.render_index over the same
+    prompts. Prompts are keyed by normalized path.
+    """
+
+    def __init__(self, prompts_dir: Path):
+        self.generator = RowCachingGenerator(prompts_dir)
+        self.prompts: Dict[str, PromptMetadata] = {}
+        # Category section -> path -> metadata, as in IndexGenerator.group_by_category
+        self.groups: Dict[str, Dict[str, PromptMetadata]] = {category: {} for category in CATEGORIES}
+        self.sections: Dict[str, str] = {}
+        self.dirty: Set[str] = set(CATEGORIES)
+        # Category, difficulty and tag values -> number of prompts (tags: number of listings)
+        self.counts: Dict[str, Dict[str, int]] = {"category": {}, "difficulty": {}, "tag": {}}
+        self.references = ReferenceCounts()
+        self.recent: Optional[List[PromptMetadata]] = None
+
+    @staticmethod
+    def counted_values(metadata: PromptMetadata) -> List[Tuple[str, str]]:
+        return (
+            [("category", metadata.category), ("difficulty", metadata.difficulty)]
+            + [("tag", tag) for tag in metadata.tags]
+        )
+
+    def update(self, path: str, metadata: Optional[PromptMetadata]):
+        """Replace a prompt's metadata (None removes it)"""
+        path = os.path.normpath(path)
+        previous = self.prompts.pop(path, None)
+        if previous is None and metadata is None:
+            # Never indexed, e.g. a file that could not be read
+            return
+        for prompt, step in ((previous, -1), (metadata, 1)):
+            if prompt is None:
+                continue
+            self.generator.rows.pop(path, None)
+            for category in CATEGORIES:
+                if category in prompt.category:
+                    self.dirty.add(category)
+                    if step > 0:
+                        self.groups[category][path] = prompt
+                    else:
+                        del self.groups[category][path]
+            for field, value in self.counted_values(prompt):
+                counts = self.counts[field]
+                counts[value] = counts.get(value, 0) + step
+                if not counts[value]:
+                    del counts[value]
+            # Either side may enter or leave the Recently Added list
+            if self.recent is not None and prompt.date_added != "Unknown" and (
+                len(self.recent) < RECENT_LIMIT or prompt.date_added >= self.recent[-1].date_added
+            ):
+                self.recent = None
+        if metadata is not None:
+            self.prompts[path] = metadata
+
+        if previous is None or metadata is None or (previous.title, previous.related) != (metadata.title, metadata.related):
+            moved = self.references.update(
+                str((metadata or previous).filepath),
+                metadata.title if metadata is not None else None,
+                metadata.related if metadata is not None else []
+            )
+            # Rows showing a count that moved are rendered again
+            for moved_path in moved:
+                prompt = self.prompts.get(moved_path)
+                if prompt is None:
+                    continue
+                self.generator.rows.pop(moved_path, None)
+                self.dirty.update(category for category in CATEGORIES if category in prompt.category)
+
+    def recent_prompts(self) -> List[PromptMetadata]:
+        """The Recently Added list: newest first, ties in title order"""
+        if self.recent is None:
+            dated = [prompt for prompt in self.prompts.values() if prompt.date_added != "Unknown"]
+            newest = heapq.nlargest(RECENT_LIMIT, (prompt.date_added for prompt in dated))
+            candidates = sorted(
+                (prompt for prompt in dated if newest and prompt.date_added >= newest[-1]),
+                key=lambda p: p.title.lower()
+            )
+            candidates.sort(key=lambda p: p.date_added, reverse=True)
+            self.recent = candidates[:RECENT_LIMIT]
+        return self.recent
+
+    def render(self) -> str:
+        generator = self.generator
+        generator.reference_counts = self.references.counts
+        for category in self.dirty:
+            prompts = sorted(self.groups[category].values(), key=lambda p: p.title.lower())
+            prompts.sort(key=lambda p: DIFFICULTY_ORDER.get(p.difficulty, 999))
+            self.sections[category] = generator.generate_category_section(category, prompts)
+        self.dirty.clear()
+
+        prompts = self.prompts.values()
+        statistics = generator.format_statistics(
+            len(self.prompts),
+            ordered_counts(self.counts["category"], prompts, lambda p: [p.category]),
+            ordered_counts(self.counts["difficulty"], prompts, lambda p: [p.difficulty])
+        )
+        tags = ordered_counts(self.counts["tag"], prompts, lambda p: p.tags, str.lower)
+        return generator.assemble_index(
+            statistics,
+            generator.format_recent_section(self.recent_prompts()),
+            [self.sections[category] for category in CATEGORIES],
+            generator.format_tags_section(tags[:TAG_LIMIT])
+        )
+
+
+class PromptWatcher:
+    """Keeps validation results and index metadata of a prompts directory up to date"""
+
+    def __init__(
+        self,
+        prompts_dir: Path,
+        output_path: Path,
+        interval: float = DEFAULT_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+        rescan: float = DEFAULT_RESCAN
+    ):
+        self.prompts_dir = prompts_dir
+        self.output_path = output_path
+        self.interval = interval
+        self.debounce = debounce
+        self.rescan = rescan
+        self.prompts: Dict[str, WatchedPrompt] = {}
+        self.snapshot: Snapshot = {}
+        # Directory path -> its listing, to relist only directories whose mtime changed
+        self.tree: Dict[str, DirectoryState] = {}
+        # Most recently changed files last
+        self.hot: Dict[str, None] = {}
+        self.next_rescan = 0.0
+        self.index = IndexSections(prompts_dir)
+        # Last written index content without its timestamp
+        self.index_body: Optional[str] = None
+
+    def load(self, jobs: int = 1):
+        """Parse and validate every prompt once"""
+        self.snapshot = scan_tree(self.prompts_dir, self.tree)
+        self.next_rescan = time.monotonic() + self.rescan
+        for path, prompt in map_files(analyze_prompt, [Path(p) for p in self.snapshot], jobs):
+            self.prompts[path] = prompt
+            self.index.update(path, prompt.metadata)
+        if self.output_path.exists():
+            self.index_body = index_body(self.output_path.read_text(encoding='utf-8'))
+
+    def invalid_results(self) -> List[ValidationResult]:
+        return [prompt.result for prompt in self.prompts.values() if not prompt.result.is_valid]
+
+    def scan(
+        self, tree: Dict[str, DirectoryState], snapshot: Snapshot, full: bool
+    ) -> Tuple[Dict[str, DirectoryState], Snapshot]:
+        """Return the tree and snapshot brought up to date (the same objects if nothing changed)
+
+        A full scan stats every file. Otherwise only the directories and the
+        recently changed files are stat'ed, and changed directories relisted.
+        """
+        if full:
+            tree = {}
+            return tree, scan_tree(self.prompts_dir, tree)
+
+        updated_tree, updated = tree, snapshot
+        for path, state in tree.items():
+            try:
+                if os.stat(path).st_mtime_ns == state.mtime_ns:
+                    continue
+            except OSError:
+                pass
+            if updated is snapshot:
+                updated_tree, updated = dict(tree), dict(snapshot)
+            if path not in updated_tree:
+                # Below a directory that was already dropped
+                continue
+            listing = scan_directory(path)
+            if listing is None:
+                drop_directory(updated_tree, updated, path)
+                continue
+            for filepath in state.files:
+                updated.pop(filepath, None)
+            updated.update(listing.files)
+            updated_tree[path] = listing
+            for subdirectory in set(state.subdirectories).difference(listing.subdirectories):
+                drop_directory(updated_tree, updated, subdirectory)
+            for subdirectory in set(listing.subdirectories).difference(state.subdirectories):
+                updated.update(scan_tree(Path(subdirectory), updated_tree))
+
+        for path in self.hot:
+            try:
+                stat = os.stat(path)
+                stamp: Optional[Tuple[int, int]] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamp = None
+            if updated.get(path) == stamp:
+                continue
+            if updated is snapshot:
+                updated = dict(snapshot)
+            if stamp is None:
+                updated.pop(path, None)
+            else:
+                updated[path] = stamp
+        return updated_tree, updated
+
+    def poll(self) -> Tuple[List[str], List[str]]:
+        """Return the (changed, removed) files since the last poll, once the tree has settled"""
+        full = time.monotonic() >= self.next_rescan
+        if full:
+            self.next_rescan = time.monotonic() + self.rescan
+        tree, snapshot = self.scan(self.tree, self.snapshot, full)
+        if snapshot is self.snapshot or snapshot == self.snapshot:
+            self.tree = tree
+            return [], []
+
+        # Wait for the tree to stop changing so a burst of saves is handled once
+        while True:
+            for path, stamp in snapshot.items():
+                if self.snapshot.get(path) != stamp:
+                    self.hot.pop(path, None)
+                    self.hot[path] = None
+            while len(self.hot) > HOT_FILES:
+                del self.hot[next(iter(self.hot))]
+            time.sleep(self.debounce)
+            tree, settled = self.scan(tree, snapshot, False)
+            if settled is snapshot or settled == snapshot:
+                break
+            snapshot = settled
+
+        changed = [path for path, stamp in snapshot.items() if self.snapshot.get(path) != stamp]
+        removed = [path for path in self.snapshot if path not in snapshot]
+        self.tree, self.snapshot = tree, snapshot
+        return changed, removed
+
+    def apply(self, changed: List[str], removed: List[str]) -> List[ValidationResult]:
+        """Revalidate changed files and forget removed ones
+
+        Returns the results of files whose content actually changed.
+        """
+        for path in removed:
+            self.prompts.pop(path, None)
+            self.index.update(path, None)
+
+        results = []
+        for path in changed:
+            _, prompt = analyze_prompt(Path(path))
+            previous = self.prompts.get(path)
+            self.prompts[path] = prompt
+            # Saving without edits or touching a file changes only its stat info
+            if previous is None or prompt.digest is None or previous.digest != prompt.digest:
+                results.append(prompt.result)
+                self.index.update(path, prompt.metadata)
+        return results
+
+    def update_index(self) -> bool:
+        """Re-render the touched parts of the index and write it if its content changed; return whether it was written"""
+        content = self.index.render()
+        body = index_body(content)
+        if body == self.index_body:
+            return False
+        self.output_path.write_text(content, encoding='utf-8')
+        self.index_body = body
+        return True
+
+    def refresh_index(self):
+        """Update the index when every prompt is valid, like `prompthub.py all`"""
+        invalid = len(self.invalid_results())
+        if invalid:
+            print(f"Index not updated: {invalid} prompt(s) need attention.", flush=True)
+        elif self.update_index():
+            print(f"✓ {self.output_path} updated ({len(self.prompts)} prompts)", flush=True)
+
+    def run(self):
+        """Poll for changes until interrupted"""
+        while True:
+            changed, removed = self.poll()
+            if not changed and not removed:
+                time.sleep(self.interval)
+                continue
+
+            start = time.perf_counter()
+            results = self.apply(changed, removed)
+            stamp = time.strftime('%H:%M:%S')
+            for path in removed:
+                print(f"[{stamp}] removed {path}")
+            for result in results:
+                print(f"[{stamp}] ", end="")
+                print_result(result)
+            if results or removed:
+                self.refresh_index()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                print(f"[{stamp}] {len(results) + len(removed)} file(s) processed in {elapsed_ms:.0f} ms\n", flush=True)
+
+
+def run_watch(
+    prompts_dir: Path,
+    output_path: Path,
+    jobs: int = 1,
+    interval: float = DEFAULT_INTERVAL,
+    debounce: float = DEFAULT_DEBOUNCE,
+    rescan: float = DEFAULT_RESCAN
+) -> int:
+    """Validate and index a prompts directory, then keep both up to date until interrupted"""
+    if not prompts_dir.is_dir():
+        print(f"Error: Path must be a directory: {prompts_dir}")
+        return 1
+
+    watcher = PromptWatcher(prompts_dir, output_path, interval, debounce, rescan)
+    start = time.perf_counter()
+    watcher.load(jobs)
+    for result in watcher.invalid_results():
+        print_result(result)
+    print(
+        f"Loaded {len(watcher.prompts)} prompts in {time.perf_counter() - start:.2f}s "
+        f"({len(watcher.invalid_results())} need attention)"
+    )
+    watcher.refresh_index()
+    print(f"Watching {prompts_dir} for changes (Ctrl+C to stop)...\n", flush=True)
+
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    return 0
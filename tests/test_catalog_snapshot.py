@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from catalog_snapshot import load_snapshot
+from generate_index import IndexGenerator
+from prompthub import load_query_index
+
+
+PROMPT = """# {title}
+
+## Metadata
+- **Category**: Coding
+- **Difficulty**: Beginner
+- **Tags**: `#{tag}`
+"""
+
+INDEX_PATH = Path("cache/inverted-index.json")
+
+
+def write_prompt(path: Path, title: str, tag: str):
+    path.write_text(PROMPT.format(title=title, tag=tag), encoding='utf-8')
+
+
+@pytest.fixture
+def prompts_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    directory = Path("prompts")
+    (directory / "coding").mkdir(parents=True)
+    write_prompt(directory / "coding" / "first.md", "First", "python")
+    write_prompt(directory / "second.md", "Second", "rust")
+    (directory / "README.md").write_text("Not a prompt\n", encoding='utf-8')
+    generator = IndexGenerator(directory)
+    generator.collect_prompts()
+    generator.write_inverted_index(INDEX_PATH)
+    return directory
+
+
+def test_snapshot_is_current_until_the_tree_changes(prompts_dir):
+    assert load_snapshot(INDEX_PATH).is_current()
+    # Files that are not prompts are not part of the signature
+    readme = prompts_dir / "README.md"
+    readme.write_text("Still not a prompt, but longer\n", encoding='utf-8')
+    assert load_snapshot(INDEX_PATH).is_current()
+
+
+@pytest.mark.parametrize("change", ["edit", "same-size edit", "add", "remove", "rename", "new directory"])
+def test_tree_changes_invalidate_the_snapshot(prompts_dir, change):
+    snapshot = load_snapshot(INDEX_PATH)
+    first = prompts_dir / "coding" / "first.md"
+    if change == "edit":
+        write_prompt(first, "First", "golang")
+    elif change == "same-size edit":
+        stat = os.stat(first)
+        write_prompt(first, "First", "pythoN")
+        os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert os.stat(first).st_size == stat.st_size
+    elif change == "add":
+        write_prompt(prompts_dir / "coding" / "third.md", "Third", "python")
+    elif change == "remove":
+        first.unlink()
+    elif change == "rename":
+        first.rename(prompts_dir / "coding" / "renamed.md")
+    else:
+        (prompts_dir / "coding" / "nested").mkdir()
+    assert not snapshot.is_current()
+
+
+def test_query_picks_up_prompts_edited_in_place(prompts_dir, capsys):
+    assert [match["title"] for match in load_query_index(INDEX_PATH).query(tag=["golang"])] == []
+    write_prompt(prompts_dir / "coding" / "first.md", "First", "golang")
+    assert [match["title"] for match in load_query_index(INDEX_PATH).query(tag=["golang"])] == ["First"]
+    assert load_snapshot(INDEX_PATH).is_current()
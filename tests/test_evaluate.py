@@ -0,0 +1,235 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+import evaluate
+from evaluate import BACKOFF_MAX, TokenBucket, backoff_delay, run_evaluation
+
+
+PROMPT = """# Summarizer
+
+## The Prompt
+
+```
+Summarize {TEXT} in one sentence.
+```
+"""
+
+
+# Backoff base for the tests, so retries without Retry-After take milliseconds
+FAST_BACKOFF = 0.01
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append((time.monotonic(), request))
+            attempt = server.attempts[request["test"]] = server.attempts.get(request["test"], 0) + 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            status, headers, mode = server.respond(request, attempt)
+            body = json.dumps({"text": f"answer to {request['test']}"}).encode('utf-8')
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if mode == "chunked":
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for start in range(0, len(body), 7):
+                    piece = body[start:start + 7]
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+                self.wfile.write(b"0\r\n\r\n")
+            elif mode == "close":
+                # No Content-Length: the body ends when the connection closes
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(body)
+                self.close_connection = True
+            else:
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.attempts = {}
+    httpd.in_flight = httpd.max_in_flight = 0
+    httpd.delay = 0.0
+    httpd.respond = lambda request, attempt: (200, {}, "length")
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/generate"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.setattr(evaluate, "BACKOFF_BASE", FAST_BACKOFF)
+    (tmp_path / "summarizer.md").write_text(PROMPT, encoding='utf-8')
+    return tmp_path
+
+
+def evaluate_cases(workspace: Path, server, count: int, **options):
+    """Run the evaluation of count test cases; return the exit code and the records by test name"""
+    tests = workspace / "tests.jsonl"
+    tests.write_text(
+        "".join(json.dumps({"name": f"case-{i}", "input": {"TEXT": f"text {i}"}}) + "\n" for i in range(count)),
+        encoding='utf-8'
+    )
+    output = workspace / "results.jsonl"
+    options.setdefault("cache_path", workspace / "cache.sqlite")
+    exit_code = run_evaluation(workspace / "summarizer.md", tests, server.url, output_path=output, **options)
+    records = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    return exit_code, {record["test"]: record for record in records}
+
+
+def test_backoff_delay():
+    assert backoff_delay(0, {"retry-after": "3"}) == 3
+    assert backoff_delay(0, {"retry-after": "3600"}) == BACKOFF_MAX
+    for attempt in range(4):
+        delay = backoff_delay(attempt)
+        assert 0.5 * evaluate.BACKOFF_BASE * 2 ** attempt <= delay <= evaluate.BACKOFF_BASE * 2 ** attempt
+    assert backoff_delay(100) <= BACKOFF_MAX
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_until_the_endpoint_answers(workspace, server, status):
+    server.respond = lambda request, attempt: (status, {}, "length") if attempt < 3 else (200, {}, "length")
+    exit_code, records = evaluate_cases(workspace, server, 4, retries=3)
+    assert exit_code == 0
+    assert len(server.requests) == 12
+    for name, record in records.items():
+        assert record["status"] == 200
+        assert record["attempts"] == 3
+        assert record["response"] == {"text": f"answer to {name}"}
+
+
+def test_gives_up_after_the_retries(workspace, server):
+    server.respond = lambda request, attempt: (503, {}, "length")
+    exit_code, records = evaluate_cases(workspace, server, 2, retries=2)
+    assert exit_code == 1
+    assert len(server.requests) == 6
+    assert all(record["error"] == "HTTP 503" and record["attempts"] == 3 for record in records.values())
+
+
+def test_other_errors_are_not_retried(workspace, server):
+    server.respond = lambda request, attempt: (400, {}, "length")
+    exit_code, records = evaluate_cases(workspace, server, 2)
+    assert exit_code == 1
+    assert len(server.requests) == 2
+    assert all(record["status"] == 400 for record in records.values())
+
+
+def test_retry_after_is_honoured(workspace, server):
+    server.respond = lambda request, attempt: (429, {"Retry-After": "1"}, "length") if attempt == 1 else (200, {}, "length")
+    exit_code, _ = evaluate_cases(workspace, server, 1)
+    assert exit_code == 0
+    (first, _), (second, _) = server.requests
+    assert second - first >= 1.0
+
+
+def test_second_run_is_served_from_the_cache(workspace, server):
+    _, first = evaluate_cases(workspace, server, 5)
+    assert len(server.requests) == 5
+
+    exit_code, second = evaluate_cases(workspace, server, 5)
+    assert exit_code == 0
+    assert len(server.requests) == 5
+    assert all(record["cached"] for record in second.values())
+    assert {name: record["response"] for name, record in second.items()} == {
+        name: record["response"] for name, record in first.items()
+    }
+
+    # A changed prompt is sent again
+    prompt = workspace / "summarizer.md"
+    prompt.write_text(PROMPT.replace("one sentence", "two sentences"), encoding='utf-8')
+    evaluate_cases(workspace, server, 5)
+    assert len(server.requests) == 10
+
+
+def test_failures_are_not_cached(workspace, server):
+    server.respond = lambda request, attempt: (500, {}, "length")
+    evaluate_cases(workspace, server, 2, retries=0)
+    server.respond = lambda request, attempt: (200, {}, "length")
+    exit_code, records = evaluate_cases(workspace, server, 2, retries=0)
+    assert exit_code == 0
+    assert len(server.requests) == 4
+    assert not any(record.get("cached") for record in records.values())
+
+
+def test_concurrency_is_bounded(workspace, server):
+    server.delay = 0.05
+    exit_code, records = evaluate_cases(workspace, server, 12, concurrency=3, use_cache=False)
+    assert exit_code == 0
+    assert len(records) == 12
+    assert server.max_in_flight == 3
+
+
+def test_rate_is_limited():
+    async def acquire_all(bucket: TokenBucket, count: int) -> float:
+        start = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # The burst is free; the other 10 acquisitions come at 50 per second
+    assert asyncio.run(acquire_all(TokenBucket(50, burst=5), 5)) < 0.05
+    assert 0.19 <= asyncio.run(acquire_all(TokenBucket(50, burst=5), 15)) < 0.5
+
+
+def test_rate_limits_requests(workspace, server):
+    # Within the burst of 20 requests they go out at once
+    exit_code, _ = evaluate_cases(workspace, server, 15, rate=20, concurrency=8, use_cache=False)
+    assert exit_code == 0
+    times = sorted(at for at, _ in server.requests)
+    assert times[-1] - times[0] < 0.2
+    # Beyond it they are spaced out at 20 per second
+    exit_code, _ = evaluate_cases(workspace, server, 30, rate=20, concurrency=8, use_cache=False)
+    assert exit_code == 0
+    times = sorted(at for at, _ in server.requests[15:])
+    assert times[-1] - times[0] >= 0.45
+
+
+@pytest.mark.parametrize("mode", ["chunked", "close"])
+def test_chunked_and_connection_close_responses(workspace, server, mode):
+    server.respond = lambda request, attempt: (200, {}, mode)
+    exit_code, records = evaluate_cases(workspace, server, 6, concurrency=2, use_cache=False)
+    assert exit_code == 0
+    assert {name: record["response"]["text"] for name, record in records.items()} == {
+        f"case-{i}": f"answer to case-{i}" for i in range(6)
+    }
+    assert len(server.requests) == 6
+
+
+def test_missing_variables_are_skipped(workspace, server):
+    tests = workspace / "tests.jsonl"
+    tests.write_text(json.dumps({"name": "empty", "input": {}}) + "\n", encoding='utf-8')
+    output = workspace / "results.jsonl"
+    assert run_evaluation(workspace / "summarizer.md", tests, server.url, use_cache=False, output_path=output) == 0
+    [record] = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert record["error"] == "Missing variables: TEXT"
+    assert server.requests == []
@@ -0,0 +1,127 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from file_cache import FileCache, FileState
+from git_changes import PromptChanges, add_name_status, changed_prompts, worktree_tree
+
+
+needs_git = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def name_status(*entries):
+    return "".join(field + "\0" for entry in entries for field in entry)
+
+
+def test_name_status_sorts_prompt_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    changes = PromptChanges("HEAD")
+    add_name_status(changes, name_status(
+        ("A", "prompts/new.md"),
+        ("M", "prompts/sub/edited.md"),
+        ("D", "prompts/gone.md"),
+        ("T", "prompts/type.md"),
+        ("R100", "prompts/old.md", "prompts/renamed.md"),
+        # Renamed out of the prompts: a delete; into them: an add; copies: an add
+        ("R090", "prompts/moved-out.md", "archive/moved-out.md"),
+        ("R100", "notes/draft.md", "prompts/draft.md"),
+        ("C075", "prompts/base.md", "prompts/copy.md"),
+        # Not prompts
+        ("M", "README.md"),
+        ("M", "prompts/README.md"),
+        ("A", "prompts/image.png"),
+    ), str(tmp_path), Path("prompts"))
+    assert changes.added == [Path("prompts/new.md"), Path("prompts/draft.md"), Path("prompts/copy.md")]
+    assert changes.modified == [Path("prompts/sub/edited.md"), Path("prompts/type.md")]
+    assert changes.deleted == [Path("prompts/gone.md"), Path("prompts/moved-out.md")]
+    assert changes.renamed == [(Path("prompts/old.md"), Path("prompts/renamed.md"))]
+    assert changes.removed == changes.deleted + [Path("prompts/old.md")]
+
+
+def test_name_status_keeps_unusual_names(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    changes = PromptChanges("HEAD")
+    add_name_status(changes, name_status(
+        ("M", "prompts/tab\there.md"),
+        ("R100", "prompts/new\nline.md", "prompts/spaced name.md"),
+    ), str(tmp_path), Path("prompts"))
+    assert changes.modified == [Path("prompts/tab\there.md")]
+    assert changes.renamed == [(Path("prompts/new\nline.md"), Path("prompts/spaced name.md"))]
+
+
+def test_empty_diff(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    changes = PromptChanges("HEAD")
+    add_name_status(changes, "", str(tmp_path), Path("prompts"))
+    assert changes.changed == [] and changes.removed == []
+
+
+def git(directory, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=directory, check=True, capture_output=True
+    )
+
+
+@needs_git
+def test_changed_prompts_against_a_ref(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    prompts = tmp_path / "prompts"
+    prompts.mkdir()
+    (prompts / "kept.md").write_text("# Kept\n" + "unchanged text\n" * 20)
+    (prompts / "edited.md").write_text("# Edited\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "base")
+    base_tree = worktree_tree(prompts)
+    assert base_tree
+
+    (prompts / "edited.md").write_text("# Edited again\n")
+    (prompts / "kept.md").rename(prompts / "renamed.md")
+    (prompts / "untracked.md").write_text("# New\n")
+    # A dirty working tree matches no tree
+    assert worktree_tree(prompts) is None
+
+    changes = changed_prompts("HEAD", Path("prompts"))
+    assert changes.tree == base_tree
+    assert changes.modified == [Path("prompts/edited.md")]
+    assert changes.deleted == [Path("prompts/kept.md")]
+    # The rename target is untracked too, so it shows up as an add
+    assert sorted(changes.added) == [Path("prompts/renamed.md"), Path("prompts/untracked.md")]
+
+    # Once staged, git pairs the delete and add up as a rename
+    git(tmp_path, "add", "-A")
+    changes = changed_prompts("HEAD", Path("prompts"))
+    assert changes.added == [Path("prompts/untracked.md")]
+    assert changes.renamed == [(Path("prompts/kept.md"), Path("prompts/renamed.md"))]
+
+    with pytest.raises(ValueError):
+        changed_prompts("no-such-ref", Path("prompts"))
+
+
+def test_cache_is_only_trusted_for_its_recorded_tree(tmp_path):
+    prompt = tmp_path / "a.md"
+    prompt.write_text("# A\n")
+    cache = FileCache(tmp_path / "cache.pickle", "v1")
+    stat = prompt.stat()
+    cache.store(FileState(cache.key_for(prompt), stat.st_mtime_ns, stat.st_size), "value")
+    cache.record_tree("tree-1")
+    cache.save()
+
+    loaded = FileCache(tmp_path / "cache.pickle", "v1").load()
+    assert loaded.cached(prompt) is None
+    loaded.expect_tree("tree-2")
+    assert loaded.cached(prompt) is None
+    loaded.expect_tree(None)
+    assert loaded.cached(prompt) is None
+    loaded.expect_tree("tree-1")
+    assert loaded.cached(prompt) == "value"
+
+    # Storing anything drops the recorded tree until it is recorded again
+    loaded.store(FileState(loaded.key_for(prompt), stat.st_mtime_ns, stat.st_size), "other")
+    loaded.save()
+    reloaded = FileCache(tmp_path / "cache.pickle", "v1").load()
+    reloaded.expect_tree("tree-1")
+    assert reloaded.cached(prompt) is None
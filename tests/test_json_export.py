@@ -0,0 +1,88 @@
+import gzip
+import json
+
+from file_cache import content_hash
+from json_export import COMPRESSORS, EXPORT_VERSION, JsonExport, encode
+
+
+PROMPT = """# Sample
+
+## The Prompt
+
+```
+Summarize {TEXT}.
+```
+"""
+
+
+def row(title, body="prompts/x.json"):
+    return [title, f"{title}.md", "Coding", "Beginner", [], [], "", "", "", 10, 0, body]
+
+
+def test_shard_names_follow_content(tmp_path):
+    export = JsonExport(tmp_path, page_size=2)
+    rows = [row("a"), row("b"), row("c")]
+    names = export.add_shards(rows)
+    assert len(names) == 2
+    assert all(name.startswith("shards/") and name.endswith(".json") for name in names)
+
+    # The same rows, in a shard shared by a category and a tag, are stored once
+    assert export.add_shards(rows[:2]) == names[:1]
+    assert len(export.files) == 2
+
+    changed = export.add_shards([row("a"), row("b2")])
+    assert changed != names[:1]
+
+
+def test_save_writes_compressed_copies_and_manifest(tmp_path):
+    export = JsonExport(tmp_path, page_size=10)
+    [name] = export.add_shards([row("a")])
+    manifest = {"version": EXPORT_VERSION, "categories": [{"name": "Coding", "shards": [name]}]}
+    written, total, removed = export.save(manifest)
+    assert (written, total, removed) == (2, 2, 0)
+
+    shard = tmp_path / name
+    assert json.loads(shard.read_bytes())["rows"] == [row("a")]
+    assert gzip.decompress(shard.with_name(shard.name + ".gz").read_bytes()) == shard.read_bytes()
+    assert (tmp_path / "manifest.json").read_bytes() == encode(manifest)
+
+    # Nothing changed: nothing is written again
+    again = JsonExport(tmp_path, page_size=10)
+    again.add_shards([row("a")])
+    assert again.save(manifest) == (0, 2, 0)
+
+
+def test_save_removes_unreferenced_files(tmp_path):
+    export = JsonExport(tmp_path, page_size=10)
+    [old] = export.add_shards([row("a")])
+    export.save({})
+
+    export = JsonExport(tmp_path, page_size=10)
+    [new] = export.add_shards([row("b")])
+    written, total, removed = export.save({})
+    assert removed == 1
+    assert not (tmp_path / old).exists()
+    assert not any((tmp_path / (old + suffix)).exists() for suffix in COMPRESSORS)
+    assert (tmp_path / new).exists()
+
+
+def test_prompt_bodies_are_named_after_the_source_hash(tmp_path):
+    source = tmp_path / "sample.md"
+    source.write_text(PROMPT, encoding='utf-8')
+    export = JsonExport(tmp_path / "api")
+    name = export.add_body(source)
+    assert name.startswith("prompts/")
+    body = json.loads(export.files[name])
+    assert body["title"] == "Sample"
+    assert body["prompt"] == "Summarize {TEXT}.\n"
+    assert body["markdown"] == PROMPT
+
+    export.save({})
+    # Already written for this content: the source is not read again
+    source.unlink()
+    later = JsonExport(tmp_path / "api")
+    assert later.add_body(source, content_hash(PROMPT.encode('utf-8'))) == name
+    assert name not in later.files
+
+    source.write_text(PROMPT + "\nMore.\n", encoding='utf-8')
+    assert JsonExport(tmp_path / "api").add_body(source) != name
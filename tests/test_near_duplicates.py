@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from near_duplicates import NUM_PERM, choose_bands, find_near_duplicates, minhash, similarity
+
+
+WORDS = [f"word{i}" for i in range(500)]
+
+
+def text(seed: int, length: int = 200) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 0.8, 0.9, 0.95])
+def test_band_choice_puts_the_s_curve_below_the_threshold(threshold):
+    bands, rows = choose_bands(threshold)
+    assert bands * rows == NUM_PERM
+    # The 50% candidate point sits below the threshold, so pairs right at it are usually compared
+    assert (1 / bands) ** (1 / rows) <= threshold * 0.9
+    assert 1 - (1 - threshold ** rows) ** bands > 0.85
+
+
+def test_higher_thresholds_use_longer_bands():
+    assert choose_bands(0.5)[1] <= choose_bands(0.8)[1] <= choose_bands(0.95)[1]
+
+
+def test_identical_and_unrelated_texts():
+    a, b = minhash(text(1)), minhash(text(2))
+    assert similarity(a, minhash(text(1))) == 1.0
+    assert similarity(a, b) < 0.2
+    # Case and punctuation do not matter
+    assert similarity(minhash("Hello, World again"), minhash("hello world AGAIN")) == 1.0
+
+
+def test_empty_and_short_texts():
+    assert minhash("") is None
+    assert minhash("!!! ---") is None
+    # Fewer words than a shingle still give a (densified) signature
+    signature = minhash("two words")
+    assert len(signature) == NUM_PERM
+    assert similarity(signature, minhash("two words")) == 1.0
+
+
+def test_near_copies_are_found_and_distinct_texts_are_not():
+    base = text(3).split()
+    edited = base[:]
+    edited[100] = "changed"
+    signatures = {
+        "a.md": minhash(" ".join(base)),
+        "b.md": minhash(" ".join(edited)),
+        "c.md": minhash(text(4)),
+    }
+    pairs = list(find_near_duplicates(signatures, 0.8))
+    assert [(first, second) for first, second, _ in pairs] == [("a.md", "b.md")]
+    assert pairs[0][2] >= 0.8
+
+
+def test_involving_limits_pairs_to_changed_files():
+    signatures = {name: minhash(text(5)) for name in ("a.md", "b.md", "c.md")}
+    pairs = {(first, second) for first, second, _ in find_near_duplicates(signatures, 0.8, involving={"c.md"})}
+    assert pairs == {("a.md", "c.md"), ("b.md", "c.md")}
@@ -0,0 +1,141 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from prompt_fixer import FixResult, apply_edits, fix_content, fix_prompts, kebab_case, rename_prompt
+from validation_rules import load_rules
+
+
+PROMPT = """# Sample
+
+## Metadata
+- **Category**: [coding]
+- **Difficulty**: [Beginner | Advanced]
+- **Model Compatibility**: All Models
+- **Tags**: `#x`
+- **Author**: @me
+
+## Description
+Does things.
+
+## Use Case
+Things.
+
+## The Prompt
+
+```
+Do {X}.
+```
+
+## Variables to Customize
+- `{X}`: x
+
+## Example Input/Output
+In, out.
+
+## Related Prompts
+None.
+
+## Version History
+### v1.2 (2024-05-01)
+- Tweaked
+### v1.0 (2024-01-15)
+- Initial
+"""
+
+FIXED = PROMPT.replace("[coding]", "Coding").replace(
+    "- **Author**: @me\n", "- **Author**: @me\n- **Date Added**: 2024-01-15\n- **Version**: 1.2\n"
+).replace("## Related Prompts", "## Performance Notes\n\n## Related Prompts")
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("already-kebab", "already-kebab"),
+    ("My Prompt_v2", "my-prompt-v2"),
+    ("camelCaseName", "camel-case-name"),
+    ("Café Crème", "cafe-creme"),
+    ("___", ""),
+])
+def test_kebab_case(name, expected):
+    assert kebab_case(name) == expected
+
+
+def test_apply_edits_in_position_order():
+    content = "0123456789"
+    edits = [(8, 9, "X"), (2, 2, "a"), (2, 2, "b"), (0, 1, "")]
+    assert apply_edits(content, edits) == "1ab234567X9"
+
+
+def test_fix_content():
+    fixed, fixes = fix_content(PROMPT, Path("sample.md"), load_rules())
+    assert fixed == FIXED
+    assert fixes == [
+        "Category: [coding] -> Coding",
+        "Added **Date Added**: 2024-01-15",
+        "Added **Version**: 1.2",
+        "Added section: ## Performance Notes",
+    ]
+
+
+def test_fix_content_keeps_crlf_line_endings():
+    fixed, _ = fix_content(PROMPT.replace("\n", "\r\n"), Path("sample.md"), load_rules())
+    assert fixed == FIXED.replace("\n", "\r\n")
+
+
+def test_fixed_content_is_left_alone():
+    assert fix_content(FIXED, Path("sample.md"), load_rules()) == (FIXED, [])
+
+
+def test_missing_title_and_sections_at_end():
+    content = "## Metadata\n- **Date Added**: 2024-01-01\n- **Version**: 1.0\n"
+    fixed, fixes = fix_content(content, Path("quickSort.md"), load_rules())
+    assert fixed.startswith("# Quick Sort\n\n## Metadata\n")
+    assert fixed.endswith("\n\n## Related Prompts\n\n## Version History\n\n")
+    assert "Added title: # Quick Sort" in fixes
+
+
+def test_fix_prompts_writes_and_renames(tmp_path):
+    source = tmp_path / "Sample Prompt.md"
+    source.write_text(PROMPT, encoding='utf-8')
+    [result] = fix_prompts([source], load_rules())
+    assert result.error is None
+    assert result.renamed
+    assert result.path == tmp_path / "sample-prompt.md"
+    assert result.path.read_text(encoding='utf-8') == FIXED
+    assert not source.exists()
+
+
+def test_rename_never_replaces_an_existing_file(tmp_path):
+    source = tmp_path / "Sample.md"
+    target = tmp_path / "sample.md"
+    source.write_text("source", encoding='utf-8')
+    target.write_text("target", encoding='utf-8')
+    if os.path.samefile(source, target):
+        pytest.skip("case-insensitive file system")
+
+    result = FixResult(str(source), rename_to="sample.md")
+    assert not rename_prompt(result)
+    assert "a file with that name exists" in result.error
+    assert source.read_text(encoding='utf-8') == "source"
+    assert target.read_text(encoding='utf-8') == "target"
+
+
+def test_rename_without_hard_links(tmp_path, monkeypatch):
+    def no_link(source, target):
+        raise PermissionError("hard links not supported")
+    monkeypatch.setattr(os, "link", no_link)
+
+    source = tmp_path / "Other Name.md"
+    source.write_text("source", encoding='utf-8')
+    result = FixResult(str(source), rename_to="other-name.md")
+    assert rename_prompt(result)
+    assert (tmp_path / "other-name.md").read_text(encoding='utf-8') == "source"
+    assert not source.exists()
+
+    taken = tmp_path / "Taken.md"
+    taken.write_text("source", encoding='utf-8')
+    (tmp_path / "taken-name.md").write_text("target", encoding='utf-8')
+    result = FixResult(str(taken), rename_to="taken-name.md")
+    assert not rename_prompt(result)
+    assert (tmp_path / "taken-name.md").read_text(encoding='utf-8') == "target"
+    assert taken.exists()
@@ -0,0 +1,76 @@
+from prompt_parser import parse_prompt
+
+
+PROMPT = """# Code Reviewer
+
+## Metadata
+- **Category**: Coding
+- **Tags**:   `#python`  
+- **Category**: Writing
+
+## The Prompt
+
+```text
+# Not a heading
+**Not**: metadata
+```
+
+### Notes
+More text.
+
+## Description
+Reviews code.
+"""
+
+
+def test_sections_and_bodies():
+    parsed = parse_prompt(PROMPT)
+    assert parsed.title == "Code Reviewer"
+    assert list(parsed.sections) == ["# Code Reviewer", "## Metadata", "## The Prompt", "### Notes", "## Description"]
+    assert parsed.section_body("## Description") == "Reviews code.\n"
+    # A level-2 section runs over its subsections up to the next level-2 heading
+    assert "More text." in parsed.section_body("## The Prompt")
+    assert parsed.section_body("## Missing") is None
+
+
+def test_metadata_keeps_first_value_and_its_span():
+    parsed = parse_prompt(PROMPT)
+    assert parsed.metadata == {"Category": "Coding", "Tags": "`#python`"}
+    start, end = parsed.metadata_spans["Tags"]
+    assert PROMPT[start:end] == "`#python`"
+
+
+def test_code_block_contents_are_not_parsed():
+    parsed = parse_prompt(PROMPT)
+    assert "## Not a heading" not in parsed.sections
+    assert "Not" not in parsed.metadata
+    (block,) = parsed.code_blocks_in("## The Prompt")
+    assert block.info == "text"
+    assert block.text == "# Not a heading\n**Not**: metadata\n"
+    assert block.section == "## The Prompt"
+
+
+def test_unterminated_fence_runs_to_end_of_file():
+    parsed = parse_prompt("# T\n\n## The Prompt\n```\nopen\n## Inside\n")
+    (block,) = parsed.code_blocks
+    assert block.text == "open\n## Inside\n"
+    assert "## Inside" not in parsed.sections
+
+
+def test_crlf_and_trailing_hashes():
+    parsed = parse_prompt("# Title ##\r\n\r\n## Description\r\nBody\r\n")
+    assert parsed.title == "Title"
+    assert parsed.section_body("## Description") == "Body\r\n"
+
+
+def test_headings_need_a_space_and_title_is_first_h1():
+    parsed = parse_prompt("#hashtag\n# First\n# Second\n")
+    assert parsed.title == "First"
+    assert parsed.has_section("#")
+    assert not parsed.has_section("## Description")
+
+
+def test_empty_file():
+    parsed = parse_prompt("")
+    assert parsed.title is None
+    assert parsed.sections == {} and parsed.code_blocks == []
@@ -0,0 +1,68 @@
+import io
+import json
+
+from prompt_parser import parse_prompt
+from prompt_template import compile_template, read_variable_sets, render_batch, write_results
+
+
+PROMPT = """# Formatter
+
+## The Prompt
+
+```
+Format {CODE} as JSON like {"key": [1, 2]} and keep { spaced } and {not-a-var}.
+Again: {CODE} in {LANGUAGE}.
+```
+
+## Variables to Customize
+- `{CODE}`: the code
+- `{UNUSED}`: never used
+"""
+
+
+def template():
+    return compile_template(parse_prompt(PROMPT))
+
+
+def test_variables_and_documentation():
+    compiled = template()
+    assert compiled.variables == ["CODE", "LANGUAGE"]
+    assert compiled.undocumented == ["LANGUAGE"]
+    assert compiled.unused == ["UNUSED"]
+
+
+def test_other_braces_are_kept_verbatim():
+    rendered = template().render({"CODE": "x = {1}", "LANGUAGE": "Python"})
+    assert rendered == (
+        'Format x = {1} as JSON like {"key": [1, 2]} and keep { spaced } and {not-a-var}.\n'
+        "Again: x = {1} in Python.\n"
+    )
+
+
+def test_partial_render_keeps_missing_placeholders():
+    assert template().render_partial({"CODE": "y"}).endswith("Again: y in {LANGUAGE}.\n")
+
+
+def test_batch_reports_missing_and_extra_variables():
+    results = list(render_batch(template(), [{"CODE": "a"}, {"CODE": "b", "LANGUAGE": "Go", "EXTRA": 1}]))
+    assert (results[0].prompt, results[0].missing) == (None, ["LANGUAGE"])
+    assert results[1].prompt.endswith("b in Go.\n") and results[1].extra == ["EXTRA"]
+
+
+def test_csv_short_and_long_rows():
+    stream = io.StringIO("CODE,LANGUAGE\na,Go\nb\nc,Rust,surplus\nd,\n")
+    results = list(render_batch(template(), read_variable_sets(stream, "csv")))
+    assert [result.prompt is not None for result in results] == [True, False, False, True]
+    # A short row is missing the columns it does not reach; an empty cell is a value
+    assert results[1].missing == ["LANGUAGE"]
+    assert results[2].error == "1 more field(s) than the header" and results[2].extra == []
+    assert results[3].prompt.endswith("d in .\n")
+
+
+def test_ndjson_output_and_exit_code():
+    stream = io.StringIO()
+    results = render_batch(template(), [{"CODE": "a", "LANGUAGE": "Go"}, {"CODE": "b"}])
+    assert write_results(results, "ndjson", stream) == 1
+    rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [row["row"] for row in rows] == [1, 2]
+    assert rows[1] == {"row": 2, "prompt": None, "missing": ["LANGUAGE"], "extra": [], "error": None}
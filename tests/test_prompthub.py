@@ -0,0 +1,84 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+import cross_references
+import near_duplicates
+from prompt_parser import parse_prompt
+from prompthub import run_all
+
+
+REPO = Path(__file__).resolve().parent.parent
+PROMPT = REPO / "prompts" / "by-category" / "coding" / "python-code-debugger-pro.md"
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    coding = tmp_path / "prompts" / "coding"
+    coding.mkdir(parents=True)
+    content = PROMPT.read_text(encoding='utf-8')
+    (coding / "debugger.md").write_text(content, encoding='utf-8')
+    (coding / "debugger-copy.md").write_text(content.replace("# ", "# Copied ", 1), encoding='utf-8')
+    block = parse_prompt(content).code_blocks_in("## The Prompt")[0].text
+    other = content.replace(block, "Write a limerick about {TOPIC} for a {AUDIENCE} audience.\n")
+    (coding / "other.md").write_text(other.replace("# ", "# Other ", 1), encoding='utf-8')
+    return tmp_path
+
+
+def run(workspace: Path, capsys, **options) -> dict:
+    exit_code = run_all(
+        Path("prompts"), Path("INDEX.md"),
+        cache_dir=Path("cache"), inverted_index_path=Path("cache/inverted.json"),
+        search_index_path=Path("cache/search.sqlite"), output_format="json", **options
+    )
+    assert exit_code == 0
+    report = json.loads(capsys.readouterr().out)
+    return {Path(result["filepath"]).name: result["warnings"] for result in report["results"]}
+
+
+def duplicate_warnings(warnings: dict) -> dict:
+    return {
+        name: [warning for warning in messages if "near-duplicate" in warning]
+        for name, messages in warnings.items()
+    }
+
+
+@pytest.mark.parametrize("module", [near_duplicates, cross_references])
+def test_corpus_checks_reuse_the_scan(workspace, capsys, monkeypatch, module):
+    def no_parsing(func, filepaths, jobs=1):
+        assert not filepaths, f"{module.__name__} parsed files the scan already parsed"
+        return iter(())
+    monkeypatch.setattr(module, "map_prompts", no_parsing)
+
+    cold = run(workspace, capsys)
+    duplicates = duplicate_warnings(cold)
+    assert duplicates["debugger.md"] and duplicates["debugger-copy.md"]
+    assert not duplicates["other.md"]
+    assert any("Related Prompts" in warning for warning in cold["other.md"])
+    # Served from the caches, and without them
+    assert run(workspace, capsys) == cold
+    assert run(workspace, capsys, use_cache=False) == cold
+
+
+def test_cold_all_parses_each_prompt_once(workspace, capsys, monkeypatch):
+    parsed = []
+    original = parse_prompt
+
+    def counting_parse(content):
+        parsed.append(content)
+        return original(content)
+    # Every module that imported parse_prompt by name
+    for module in list(sys.modules.values()):
+        if getattr(module, "parse_prompt", None) is original:
+            monkeypatch.setattr(module, "parse_prompt", counting_parse)
+
+    run(workspace, capsys)
+    assert len(parsed) == 3
+    assert Path("cache/search.sqlite").exists()
+
+    parsed.clear()
+    run(workspace, capsys)
+    assert parsed == []
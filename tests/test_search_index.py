@@ -0,0 +1,66 @@
+import math
+
+from search_index import B, K1, SearchIndex, tokenize
+
+
+def write_prompt(path, title, description, prompt):
+    path.write_text(
+        f"# {title}\n\n## Description\n{description}\n\n## The Prompt\n```\n{prompt}\n```\n",
+        encoding='utf-8'
+    )
+    return path
+
+
+def build(tmp_path):
+    prompts = tmp_path / "prompts"
+    prompts.mkdir()
+    files = [
+        write_prompt(prompts / "debug.md", "Python Debugger", "Find bugs in python code.", "Debug this python traceback."),
+        write_prompt(prompts / "essay.md", "Essay Writer", "Write essays.", "Write an essay about the topic."),
+        write_prompt(prompts / "sql.md", "SQL Tuner", "Speed up queries.", "Explain this query plan."),
+    ]
+    index = SearchIndex(tmp_path / "search.sqlite")
+    assert index.update(files, prompts) == 3
+    return index, prompts, files
+
+
+def test_tokenize_drops_stopwords_and_single_characters():
+    assert tokenize("How do I debug a Python-3 error?") == ["do", "debug", "python", "error"]
+
+
+def test_bm25_ranks_and_scores(tmp_path):
+    index, _, _ = build(tmp_path)
+    results = index.search("python traceback")
+    assert [title for _, _, title in results] == ["Python Debugger"]
+
+    # "traceback" occurs once in one of three documents
+    lengths = index.lengths
+    avg_length = sum(lengths) / 3
+    doc_length = max(lengths)
+    score, _, _ = index.search("traceback")[0]
+    idf = math.log(1 + (3 - 1 + 0.5) / (1 + 0.5))
+    assert doc_length == len(tokenize("Python Debugger\nFind bugs in python code.\n\nDebug this python traceback.\n"))
+    expected = idf * (K1 + 1) / (1 + K1 * (1 - B + B * doc_length / avg_length))
+    assert math.isclose(score, expected)
+    index.close()
+
+
+def test_unknown_terms_and_empty_index(tmp_path):
+    index, _, _ = build(tmp_path)
+    assert index.search("kubernetes") == []
+    assert SearchIndex(tmp_path / "empty.sqlite").search("python") == []
+    index.close()
+
+
+def test_incremental_update_rewrites_only_changed_documents(tmp_path):
+    index, prompts, files = build(tmp_path)
+    assert index.update(files, prompts) == 0
+
+    write_prompt(files[2], "SQL Tuner", "Speed up queries.", "Explain this python query plan.")
+    assert index.update(files, prompts) == 1
+    assert {title for _, _, title in index.search("python")} == {"Python Debugger", "SQL Tuner"}
+
+    files[1].unlink()
+    assert index.update(files[::2], prompts) == 1
+    assert index.search("essay") == []
+    index.close()
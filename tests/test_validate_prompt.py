@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import pytest
+
+import git_changes
+from git_changes import PromptChanges
+from validate_prompt import iter_validate, run_validation
+
+
+REPO = Path(__file__).resolve().parent.parent
+PROMPT = REPO / "prompts" / "by-category" / "coding" / "python-code-debugger-pro.md"
+
+
+@pytest.fixture
+def not_markdown(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(PROMPT.read_bytes())
+    return path
+
+
+def test_loaded_prompts_must_be_markdown(not_markdown):
+    [result] = iter_validate([not_markdown])
+    assert not result.is_valid
+    assert result.errors == ["File must be a .md file, got: .txt"]
+
+
+@pytest.mark.parametrize("profile", [False, True])
+def test_run_validation_rejects_other_files(not_markdown, tmp_path, capsys, profile):
+    assert run_validation(not_markdown, cache_dir=tmp_path / "cache", profile=profile) == 1
+    assert "File must be a .md file" in capsys.readouterr().out
+
+
+def test_run_validation_accepts_markdown(tmp_path):
+    assert run_validation(PROMPT, cache_dir=tmp_path / "cache") == 0
+
+
+def test_git_failure_after_fix_renames_is_reported(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    prompts_dir = Path("prompts")
+    prompts_dir.mkdir()
+    misnamed = prompts_dir / "Python Code Debugger.md"
+    misnamed.write_bytes(PROMPT.read_bytes())
+    calls = []
+    
+    def changed_prompts(ref, directory):
+        calls.append(ref)
+        if len(calls) > 1:
+            raise ValueError("git is gone")
+        return PromptChanges(ref, added=[misnamed])
+    
+    monkeypatch.setattr(git_changes, "changed_prompts", changed_prompts)
+    assert run_validation(prompts_dir, cache_dir=tmp_path / "cache", changed_since="HEAD", fix=True) == 1
+    assert len(calls) == 2
+    assert (prompts_dir / "python-code-debugger.md").exists()
+    assert "Error: Cannot list changes since HEAD: git is gone" in capsys.readouterr().out
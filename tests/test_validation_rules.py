@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from validation_rules import DEFAULT_LIMITS, load_rules
+
+
+def write_rules(tmp_path, needles, **config):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"needles": needles, **config}), encoding='utf-8')
+    return path
+
+
+def test_needles_are_reported_once_in_rule_order(tmp_path):
+    rules = load_rules(write_rules(tmp_path, [
+        {"literal": "[TODO]"},
+        {"regex": "lorem\\s+ipsum", "ignore_case": True, "level": "warning", "message": "Filler: {match}"},
+        {"literal": "a.b"},
+    ]))
+    found = rules.find_needles("Lorem  Ipsum [TODO] axb [TODO] lorem ipsum")
+    assert [(rule.level, text) for rule, text in found] == [("error", "[TODO]"), ("warning", "Lorem  Ipsum")]
+    # Literals are escaped, so "." only matches itself
+    assert [text for _, text in rules.find_needles("a.b")] == ["a.b"]
+
+
+def test_overlapping_needles_report_the_first_listed(tmp_path):
+    rules = load_rules(write_rules(tmp_path, [{"literal": "[Enter"}, {"literal": "[Enter your name]"}]))
+    assert [text for _, text in rules.find_needles("Name: [Enter your name]")] == ["[Enter"]
+
+
+def test_no_needles_and_default_limits(tmp_path):
+    rules = load_rules(write_rules(tmp_path, [], limits={"prompt_min_length": 10}))
+    assert rules.find_needles("[TODO]") == []
+    assert rules.limits == {**DEFAULT_LIMITS, "prompt_min_length": 10}
+
+
+@pytest.mark.parametrize("needle", [
+    {"literal": "x", "level": "fatal"},
+    {"regex": "("},
+    {"message": "no pattern"},
+])
+def test_invalid_needles_are_rejected(tmp_path, needle):
+    with pytest.raises(ValueError):
+        load_rules(write_rules(tmp_path, [needle]))
+
+
+def test_unreadable_rules_file(tmp_path):
+    (tmp_path / "broken.json").write_text("{", encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_rules(tmp_path / "broken.json")
+    with pytest.raises(ValueError):
+        load_rules(tmp_path / "missing.json")
+
+
+def test_shipped_rules_load():
+    rules = load_rules()
+    assert "## The Prompt" in [name.strip() for name in rules.required_sections]
+    assert rules.find_needles("Fill in [TODO] here")
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+from generate_index import IndexGenerator, index_body
+from watch import PromptWatcher
+
+
+PROMPT = """# {title}
+
+## Metadata
+- **Category**: Coding
+- **Difficulty**: Beginner
+- **Tags**: `#{tag}`
+- **Date Added**: 2024-01-15
+
+## Description
+Does things.
+
+## Related Prompts
+{related}
+"""
+
+
+def write_prompt(path: Path, title: str, tag: str = "python", related: str = "None"):
+    path.write_text(PROMPT.format(title=title, tag=tag, related=related), encoding='utf-8')
+
+
+def full_render(prompts_dir: Path) -> str:
+    generator = IndexGenerator(prompts_dir)
+    generator.collect_prompts()
+    return index_body(generator.render_index())
+
+
+def watcher(tmp_path: Path) -> PromptWatcher:
+    prompts_dir = tmp_path / "prompts"
+    prompts_dir.mkdir()
+    return PromptWatcher(prompts_dir, tmp_path / "INDEX.md")
+
+
+def test_unreadable_file_at_startup(tmp_path):
+    watch = watcher(tmp_path)
+    write_prompt(watch.prompts_dir / "good.md", "Good")
+    (watch.prompts_dir / "bad.md").write_bytes(b"# Bad\n\xff\xfe\n")
+    watch.load()
+
+    bad = str(watch.prompts_dir / "bad.md")
+    assert bad in [result.filepath for result in watch.invalid_results()]
+    assert "Good" in watch.index.render()
+
+    # Removing a file that was never indexed is harmless too
+    watch.apply([], [bad])
+    assert bad not in [result.filepath for result in watch.invalid_results()]
+
+
+def test_file_deleted_before_it_is_read(tmp_path):
+    watch = watcher(tmp_path)
+    write_prompt(watch.prompts_dir / "good.md", "Good")
+    watch.load()
+
+    results = watch.apply([str(watch.prompts_dir / "gone.md")], [])
+    assert len(results) == 1 and not results[0].is_valid
+    assert "Good" in watch.index.render()
+
+
+def test_incremental_index_matches_full_render(tmp_path):
+    watch = watcher(tmp_path)
+    prompts_dir = watch.prompts_dir
+    write_prompt(prompts_dir / "a.md", "Alpha", related="- Beta")
+    write_prompt(prompts_dir / "b.md", "Beta")
+    watch.load()
+    assert index_body(watch.index.render()) == full_render(prompts_dir)
+
+    write_prompt(prompts_dir / "b.md", "Beta", tag="rust")
+    write_prompt(prompts_dir / "c.md", "Gamma", related="- [Alpha](a.md)")
+    (prompts_dir / "a.md").unlink()
+    watch.apply([str(prompts_dir / "b.md"), str(prompts_dir / "c.md")], [str(prompts_dir / "a.md")])
+    assert index_body(watch.index.render()) == full_render(prompts_dir)